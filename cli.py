@@ -0,0 +1,420 @@
+"""
+Command Line Interface for PyCraftHub
+Scriptable entry point for automation - every menu answer is a flag,
+nothing ever waits on stdin.
+
+    python cli.py create survival creative --type paper --version 1.21.4 --ram 4G
+    python cli.py create --spec servers.json
+    python cli.py start survival creative --json
+    python cli.py status
+    python cli.py install-mod survival --mod luckperms --mod chunky
+    python cli.py backup survival --output backups
+    python cli.py benchmark survival creative --seed 1234 --runs 5
+    python cli.py stop survival --profile-actions
+    python cli.py trace summary --days 7
+
+Several server names run concurrently, each as a background job whose
+output is kept apart from the others.
+
+Exit codes:
+    0  every server succeeded
+    1  at least one server failed
+    2  bad arguments or spec file
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import builtins
+
+EXIT_OK = 0
+EXIT_FAILED = 1
+EXIT_USAGE = 2
+
+
+class UsageError(Exception):
+    """Bad arguments or spec - exit code 2"""
+
+
+def _no_input(prompt=""):
+    # Anything still asking a question would hang an automation run
+    raise RuntimeError(f"Needs an answer that wasn't given as a flag: {prompt.strip()}")
+
+
+# -------------------- Actions --------------------
+# Each runs for one server inside a job and returns extra result fields
+
+def do_create(name, args, spec):
+    from core.server_manager import create_server_from_spec
+
+    server = create_server_from_spec(dict(spec, name=name))
+    return {"type": server["type"], "version": server["version"], "port": server["port"]}
+
+
+def do_start(name, args, spec):
+    from core.server_manager import load_data, start_server, is_server_running, get_server_pid
+    from core.readiness import require_ready
+
+    _require_server(name, load_data())
+    if is_server_running(name):
+        raise RuntimeError("Server is already running")
+    return dict(require_ready(start_server(name, wait_ready=True)), pid=get_server_pid(name))
+
+
+def do_stop(name, args, spec):
+    from core.server_manager import load_data, stop_server, force_stop_server, is_server_running
+
+    _require_server(name, load_data())
+    if not is_server_running(name):
+        raise RuntimeError("Server is not running")
+    if args.force:
+        force_stop_server(name)
+    else:
+        stop_server(name)
+    if is_server_running(name):
+        raise RuntimeError("Server is still running")
+    return {}
+
+
+def do_restart(name, args, spec):
+    from core.server_manager import load_data, restart_server, get_server_pid
+    from core.readiness import require_ready
+
+    _require_server(name, load_data())
+    return dict(require_ready(restart_server(name, wait_ready=True)), pid=get_server_pid(name))
+
+
+def do_install_mod(name, args, spec):
+    from core.server_manager import load_data, download_modrinth_plugin, get_mods_folder
+
+    server = _require_server(name, load_data())
+    target = get_mods_folder(name, server)
+    if not target:
+        raise RuntimeError("Vanilla servers can't have mods or plugins")
+
+    failed = [slug for slug in args.mod
+              if not download_modrinth_plugin(slug, server["version"], server["type"], target)]
+    if failed:
+        raise RuntimeError(f"No compatible version of: {', '.join(failed)}")
+    return {"installed": args.mod}
+
+
+def do_backup(name, args, spec):
+    from core.server_manager import load_data
+    from core.server_package import export_server, HAS_ZSTD
+
+    _require_server(name, load_data())
+    os.makedirs(args.output, exist_ok=True)
+    ext = ".pchub.tar.zst" if HAS_ZSTD else ".pchub.tar.gz"
+    output = os.path.join(args.output, f"{name}-{time.strftime('%Y%m%d-%H%M%S')}{ext}")
+    export_server(name, output, exclude_logs=not args.keep_logs, exclude_caches=True,
+                  refetch_jars=not args.ship_jars)
+    return {"package": output, "size": os.path.getsize(output)}
+
+
+ACTIONS = {
+    "create": (do_create, "create"),
+    "start": (do_start, "server"),
+    "stop": (do_stop, "server"),
+    "restart": (do_restart, "server"),
+    "install-mod": (do_install_mod, "download"),
+    "backup": (do_backup, "export"),
+}
+
+
+def _require_server(name, data):
+    if name not in data:
+        raise RuntimeError("Server not found")
+    return data[name]
+
+
+# -------------------- Spec --------------------
+
+def ensure_catalog():
+    """
+    create resolves "latest" and checks versions against the version
+    catalog. The menu refreshes it in the background, the CLI has to wait.
+    """
+    from core.version_catalog import catalog_age, refresh_catalog, CATALOG_MAX_AGE
+
+    age = catalog_age()
+    if age is not None and age < CATALOG_MAX_AGE:
+        return
+    print("🔄 Loading the version catalog...", file=sys.stderr)
+    for source, error in refresh_catalog().items():
+        print(f"⚠ {source} versions unavailable: {error}", file=sys.stderr)
+
+
+SPEC_FLAGS = ("type", "version", "ram", "description", "render_distance", "difficulty",
+              "world_type", "seed", "world", "storage_root")
+
+
+def load_spec(args):
+    """
+    Wizard answers for create: the --spec file overlaid with flags.
+    A spec file holds one answer set, or {"servers": [{"name": ...}, ...]}
+    for several differently configured servers.
+    """
+    specs = [{}]
+    if args.spec:
+        try:
+            with open(args.spec, "r") as f:
+                loaded = json.load(f)
+        except (OSError, ValueError) as e:
+            raise UsageError(f"Can't read spec file: {e}")
+        specs = loaded.get("servers", [loaded]) if isinstance(loaded, dict) else loaded
+
+    flags = {key: getattr(args, key) for key in SPEC_FLAGS if getattr(args, key) is not None}
+    for key in ("cracked", "geyser"):
+        if getattr(args, key):
+            flags[key] = True
+    if args.no_fabric_api:
+        flags["fabric_api"] = False
+    if args.mod:
+        flags["mods"] = args.mod
+
+    specs = [dict(spec, **flags) for spec in specs]
+    if args.servers:
+        if len(specs) != 1:
+            raise UsageError("Give server names either on the command line or in the spec file")
+        targets = [(name, specs[0]) for name in args.servers]
+    else:
+        if not all(spec.get("name") for spec in specs):
+            raise UsageError("No server names given")
+        targets = [(spec["name"], spec) for spec in specs]
+
+    # A bad answer is a usage error, found before any server is created
+    from core.server_manager import validate_spec
+
+    for name, spec in targets:
+        try:
+            validate_spec(dict(spec, name=name))
+        except ValueError as e:
+            raise UsageError(f"{name}: {e}")
+    return targets
+
+
+# -------------------- Running --------------------
+
+def run_action(command, targets, args):
+    """Run one action for every server concurrently, returns the result list"""
+    from concurrent.futures import wait
+    from core.jobs import run_in_background
+
+    from utils.action_profile import profiled
+
+    func, job_type = ACTIONS[command]
+    jobs = [(name, run_in_background(f"{command} {name}", profiled, f"{command} {name}", func, name, args, spec,
+                                     job_type=job_type))
+            for name, spec in targets]
+    wait([job.future for _, job in jobs])
+
+    results = []
+    for name, job in jobs:
+        result = {"server": name, "ok": job.error is None, "seconds": round(job.elapsed, 2)}
+        if job.error is None:
+            result.update(job.result())
+        else:
+            result["error"] = str(job.error)
+        result["output"] = job.lines()
+        results.append(result)
+    return results
+
+
+def print_results(command, results, as_json):
+    if as_json:
+        json.dump({"command": command, "ok": all(r["ok"] for r in results), "results": results},
+                  sys.stdout, indent=2, default=str)
+        sys.stdout.write("\n")
+        return
+
+    for r in results:
+        if command == "status" and not r["ok"]:
+            print(f"{r['server']:<20} ❌ {r['error']}")
+            continue
+        if command == "status":
+            state = f"running (PID {r['pid']})" if r["running"] else "stopped"
+            print(f"{r['server']:<20} {state:<22} {r['type'] or '?':<8} {r['version'] or '?':<10} "
+                  f"port {r['port']}  {r['ram']}")
+            continue
+        for line in r.get("output", []):
+            print(f"   {line}")
+        if r["ok"]:
+            print(f"✔ {command} {r['server']} ({r['seconds']:.1f}s)")
+        else:
+            print(f"❌ {command} {r['server']}: {r['error']}")
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="python cli.py", description="PyCraftHub command line")
+    parser.add_argument("--json", action="store_true", help="Machine-readable output on stdout")
+    # --json is accepted after the subcommand too
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument("--json", action="store_true", default=argparse.SUPPRESS)
+    for p in (parser, common):
+        p.add_argument("--profile-actions", dest="profile_actions", nargs="?", const="cprofile",
+                       choices=("cprofile", "sample"), help="Profile each action into profiles/",
+                       **({"default": argparse.SUPPRESS} if p is common else {}))
+    sub = parser.add_subparsers(dest="command", required=True)
+    sub.add_parser = _with_parents(sub.add_parser, [common])
+
+    create = sub.add_parser("create", help="Create servers")
+    create.add_argument("servers", nargs="*", help="Server names (or names in --spec)")
+    create.add_argument("--spec", help="JSON file with wizard answers")
+    create.add_argument("--type", choices=("paper", "purpur", "vanilla", "fabric", "forge"))
+    create.add_argument("--version", help="Minecraft version (default: latest)")
+    create.add_argument("--ram", help="e.g. 4G or 4096M")
+    create.add_argument("--description")
+    create.add_argument("--render-distance", dest="render_distance", type=int)
+    create.add_argument("--difficulty", choices=("peaceful", "easy", "normal", "hard", "hardcore"))
+    create.add_argument("--world-type", dest="world_type", choices=("default", "flat", "large_biomes", "amplified"))
+    create.add_argument("--seed")
+    create.add_argument("--world", help="Singleplayer world folder to import")
+    create.add_argument("--storage-root", dest="storage_root")
+    create.add_argument("--cracked", action="store_true", help="online-mode=false")
+    create.add_argument("--geyser", action="store_true", help="Install Geyser + Floodgate (Paper/Purpur)")
+    create.add_argument("--no-fabric-api", action="store_true")
+    create.add_argument("--mod", action="append", help="Modrinth slug to install (repeatable)")
+
+    for name, help_text in (("start", "Start servers"), ("restart", "Restart servers")):
+        p = sub.add_parser(name, help=help_text)
+        p.add_argument("servers", nargs="+")
+
+    stop = sub.add_parser("stop", help="Stop servers")
+    stop.add_argument("servers", nargs="+")
+    stop.add_argument("--force", action="store_true", help="Kill instead of a clean shutdown")
+
+    status = sub.add_parser("status", help="Show servers (all when none given)")
+    status.add_argument("servers", nargs="*")
+
+    mod = sub.add_parser("install-mod", help="Install Modrinth mods/plugins")
+    mod.add_argument("servers", nargs="+")
+    mod.add_argument("--mod", action="append", required=True, help="Modrinth slug (repeatable)")
+
+    backup = sub.add_parser("backup", help="Back up servers as packages")
+    backup.add_argument("servers", nargs="+")
+    backup.add_argument("--output", default="backups", help="Folder for the packages")
+    backup.add_argument("--keep-logs", action="store_true")
+    backup.add_argument("--ship-jars", action="store_true", help="Ship JARs instead of re-downloading them")
+
+    bench = sub.add_parser("benchmark", help="Compare boot time, memory and MSPT of servers / JVM profiles")
+    bench.add_argument("servers", nargs="+")
+    bench.add_argument("--seed", required=True, help="World seed every boot generates")
+    bench.add_argument("--runs", type=int, default=3, help="Boots per variant and cache state")
+    bench.add_argument("--profile", action="append", choices=("auto", "aikar", "zgc", "small", "none"),
+                       help="JVM profile to compare (repeatable, default: the server's own)")
+    bench.add_argument("--cache", action="append", choices=("cold", "warm"), help="Page cache states (default: both)")
+    bench.add_argument("--radius", type=int, default=12, help="Chunks force-loaded around 0,0 during the workload")
+    bench.add_argument("--workload-seconds", dest="workload_seconds", type=int, default=60)
+    bench.add_argument("--output", default="benchmarks", help="Folder for the reports")
+    bench.add_argument("--keep", action="store_true", help="Keep the server copies")
+
+    trace = sub.add_parser("trace", help="Timing of recorded lifecycle / install spans")
+    trace_sub = trace.add_subparsers(dest="trace_command", required=True)
+    trace_sub.add_parser = _with_parents(trace_sub.add_parser, [common])
+    summary = trace_sub.add_parser("summary", help="p50/p95 duration per phase")
+    summary.add_argument("--days", type=float, help="Only spans from the last N days")
+    summary.add_argument("--name", help="Only phases starting with this, e.g. download.")
+    return parser
+
+
+def print_trace_summary(rows):
+    if not rows:
+        print("No spans recorded yet")
+        return
+    print(f"{'Phase':<28} {'count':>6} {'err':>4} {'p50 s':>8} {'p95 s':>8} {'max s':>8} {'total s':>9}  share")
+    for r in rows:
+        share = f"{r['share_of_root'] * 100:.0f}% of {r['root']}" if r["share_of_root"] is not None else ""
+        print(f"{r['name']:<28} {r['count']:>6} {r['errors']:>4} {r['p50']:>8.2f} {r['p95']:>8.2f} "
+              f"{r['max']:>8.2f} {r['total']:>9.1f}  {share}")
+
+
+def run_benchmark_command(args):
+    """Benchmark report, UsageError for unknown servers"""
+    from contextlib import redirect_stdout
+    from core.server_manager import load_data
+    from core.benchmark import run_benchmark, CACHE_STATES
+    from utils.action_profile import profile_action
+
+    data = load_data()
+    missing = [n for n in args.servers if n not in data]
+    if missing:
+        raise UsageError(f"Server not found: {', '.join(missing)}")
+    if args.runs < 1:
+        raise UsageError("--runs must be at least 1")
+
+    # Progress lines would break the JSON on stdout
+    with redirect_stdout(sys.stderr if args.json else sys.stdout), profile_action("benchmark"):
+        return run_benchmark({n: data[n] for n in args.servers}, args.seed, runs=args.runs,
+                             profiles=args.profile, caches=args.cache or CACHE_STATES,
+                             radius=args.radius, workload_seconds=args.workload_seconds,
+                             output=args.output, keep=args.keep)
+
+
+def _with_parents(add_parser, parents):
+    def add(*args, **kwargs):
+        return add_parser(*args, parents=parents, **kwargs)
+    return add
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    builtins.input = _no_input
+
+    from contextlib import redirect_stdout
+    from utils.action_profile import enable, enable_from_env, profile_action
+    enable_from_env()
+    if args.profile_actions:
+        enable(args.profile_actions)
+
+    from core.server_manager import load_data, get_server_status
+
+    try:
+        if args.command == "status":
+            from core.disk_usage import refresh_all
+
+            data = load_data()
+            names = args.servers or list(data)
+            missing = [n for n in names if n not in data]
+            # A profile report would break the JSON on stdout
+            with redirect_stdout(sys.stderr if args.json else sys.stdout), profile_action("status"):
+                refresh_all([n for n in names if n in data])
+                results = [get_server_status(n, data[n]) for n in names if n in data]
+            results += [{"server": n, "ok": False, "error": "Server not found"} for n in missing]
+        elif args.command == "trace":
+            from utils.tracing import read_spans, summarize
+
+            since = time.time() - args.days * 86400 if args.days else None
+            rows = summarize(read_spans(since), args.name)
+            if args.json:
+                json.dump({"command": "trace summary", "ok": True, "phases": rows}, sys.stdout, indent=2)
+                sys.stdout.write("\n")
+            else:
+                print_trace_summary(rows)
+            return EXIT_OK
+        elif args.command == "benchmark":
+            report = run_benchmark_command(args)
+            if args.json:
+                json.dump(report, sys.stdout, indent=2, default=str)
+                sys.stdout.write("\n")
+            return EXIT_OK if report["boots"] and all(b["ok"] for b in report["boots"]) else EXIT_FAILED
+        elif args.command == "create":
+            ensure_catalog()
+            results = run_action("create", load_spec(args), args)
+        else:
+            results = run_action(args.command, [(name, {}) for name in args.servers], args)
+    except UsageError as e:
+        if args.json:
+            json.dump({"command": args.command, "ok": False, "error": str(e)}, sys.stdout)
+            sys.stdout.write("\n")
+        else:
+            print(f"❌ {e}", file=sys.stderr)
+        return EXIT_USAGE
+
+    print_results(args.command, results, args.json)
+    return EXIT_OK if all(r["ok"] for r in results) else EXIT_FAILED
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,664 @@
+"""
+Control API for PyCraftHub
+Local HTTP/JSON API so dashboards, bots and scripts can drive the fleet
+without the menu. One asyncio loop serves every client; anything that
+blocks (process scans, disk, RCON) runs on a small thread pool, and long
+operations run as background jobs that the caller polls.
+
+Listens on 127.0.0.1 (settings "api_host" / "api_port") or on a Unix
+socket ("api_socket"). Every request needs the token from settings
+"api_token" (generated on first start):
+
+    Authorization: Bearer <token>
+
+    GET    /servers                       status of every server
+    POST   /servers                       create from a spec (as cli.py --spec)
+    GET    /servers/{name}                status of one server
+    POST   /servers/{name}/start          -> job, done once players can join
+    POST   /servers/{name}/stop           -> job   {"force": true} to kill
+    POST   /servers/{name}/restart        -> job, done once players can join
+    POST   /servers/{name}/command        {"command": "say hi"}, runs over RCON
+    GET    /servers/{name}/mods           installed mod/plugin JARs
+    POST   /servers/{name}/mods           {"slug": "lithium"} or {"slugs": [...]} -> job
+    DELETE /servers/{name}/mods/{file}    remove one JAR
+    POST   /servers/{name}/backup         {"output", "keep_logs", "ship_jars"} -> job
+    GET    /jobs                          every job
+    GET    /jobs/{id}                     one job with progress and output
+    DELETE /jobs/{id}                     cancel a job
+    GET    /servers/{name}/events         live metrics + console lines
+    GET    /events?servers=a,b            the same for several servers (all by default)
+
+Job handles come back as 202 {"job": id, "url": "/jobs/id"}.
+
+The event endpoints stream Server-Sent Events, or WebSocket text frames
+(one JSON event each) when the request asks for a WebSocket upgrade. As
+browsers can't set headers there, the token may also be given as
+?token=. See core/streams.py for how clients share the sampling.
+
+    python -m core.api_server [--host 127.0.0.1] [--port 8765] [--socket path] [--show-token]
+"""
+import os
+import re
+import sys
+import json
+import hmac
+import time
+import base64
+import struct
+import hashlib
+import asyncio
+import secrets
+import argparse
+import threading
+from urllib.parse import unquote, urlsplit, parse_qsl
+from concurrent.futures import ThreadPoolExecutor
+
+from settings_module import load_settings, save_settings
+from core.jobs import run_in_background, list_jobs, get_job, cancel_job
+from core.streams import Subscription, Dropped, RECENT_LINES
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+
+MAX_BODY = 1024 * 1024
+MAX_HEADERS = 100
+IDLE_TIMEOUT = 30
+# Threads for short blocking calls - long work goes to jobs instead
+BLOCKING_WORKERS = 8
+# Event streams: keep-alive after this much silence, drop a client whose
+# socket stays full this long
+KEEPALIVE_INTERVAL = 15
+SEND_TIMEOUT = 10
+WS_GUID = "258EAFA5-E914-47DA-95CA-C5AB0DC11B65"
+
+REASONS = {
+    200: "OK", 202: "Accepted", 400: "Bad Request", 401: "Unauthorized",
+    404: "Not Found", 405: "Method Not Allowed", 409: "Conflict",
+    413: "Payload Too Large", 500: "Internal Server Error", 502: "Bad Gateway",
+}
+
+_executor = ThreadPoolExecutor(max_workers=BLOCKING_WORKERS, thread_name_prefix="api")
+_routes = []
+
+
+class ApiError(Exception):
+    """Ends a request with an HTTP error status and message"""
+
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+class Stream:
+    """Handler result that takes the connection over (event streams)"""
+
+    def __init__(self, run):
+        self.run = run
+
+
+class Request:
+    def __init__(self, method, path, query, headers, body):
+        self.method = method
+        self.path = path
+        self.query = query
+        self.headers = headers
+        self.body = body
+
+    def json(self):
+        if not self.body:
+            return {}
+        try:
+            data = json.loads(self.body)
+        except ValueError as e:
+            raise ApiError(400, f"Invalid JSON: {e}")
+        if not isinstance(data, dict):
+            raise ApiError(400, "Expected a JSON object")
+        return data
+
+
+# -------------------- Token --------------------
+
+def get_token():
+    """The API token, generated and saved on first use"""
+    settings = load_settings()
+    token = settings.get("api_token")
+    if not token:
+        token = settings["api_token"] = secrets.token_urlsafe(32)
+        save_settings(settings)
+    return token
+
+
+def _authorized(request, token):
+    header = request.headers.get("authorization", "")
+    given = (header[7:].strip() if header.lower().startswith("bearer ")
+             else request.headers.get("x-api-token") or request.query.get("token", ""))
+    return hmac.compare_digest(given.encode(), token.encode())
+
+
+# -------------------- Helpers --------------------
+
+def route(method, pattern):
+    """Register an async handler for a method and a path regex"""
+    def register(handler):
+        _routes.append((method, re.compile(f"^{pattern}$"), handler))
+        return handler
+    return register
+
+
+async def blocking(func, *args):
+    """Run a blocking call off the event loop"""
+    return await asyncio.get_running_loop().run_in_executor(_executor, func, *args)
+
+
+def job_info(job, output_lines=20):
+    info = {
+        "id": job.id,
+        "name": job.name,
+        "type": job.type,
+        "status": job.status,
+        "percent": job.percent,
+        "done_bytes": job.done_bytes,
+        "total_bytes": job.total_bytes,
+        "done_files": job.done_files,
+        "total_files": job.total_files,
+        "rate": job.rate,
+        "eta": job.eta,
+        "elapsed": round(job.elapsed, 2),
+        "error": str(job.error) if job.error else None,
+        "output": job.lines(output_lines),
+    }
+    if job.status == "done":
+        info["result"] = job.result()
+    return info
+
+
+def accepted(job):
+    return 202, {"job": job.id, "url": f"/jobs/{job.id}"}
+
+
+def _server(name):
+    from core.server_manager import load_data
+
+    data = load_data() or {}
+    if name not in data:
+        raise ApiError(404, f"Server '{name}' not found")
+    return data[name]
+
+
+# -------------------- Job bodies --------------------
+# Same checks as cli.py, run inside jobs so their output is kept per job
+
+def _start(name):
+    from core.server_manager import start_server, is_server_running, get_server_pid
+    from core.readiness import require_ready
+
+    if is_server_running(name):
+        raise RuntimeError("Server is already running")
+    return dict(require_ready(start_server(name, wait_ready=True)), pid=get_server_pid(name))
+
+
+def _stop(name, force):
+    from core.server_manager import stop_server, force_stop_server, is_server_running
+
+    if not is_server_running(name):
+        raise RuntimeError("Server is not running")
+    if force:
+        force_stop_server(name)
+    else:
+        stop_server(name)
+    if is_server_running(name):
+        raise RuntimeError("Server is still running")
+    return {}
+
+
+def _restart(name):
+    from core.server_manager import restart_server, get_server_pid
+    from core.readiness import require_ready
+
+    return dict(require_ready(restart_server(name, wait_ready=True)), pid=get_server_pid(name))
+
+
+def _install_mods(name, server, slugs):
+    from core.server_manager import install_modrinth_projects, get_mods_folder
+
+    failed = install_modrinth_projects([(slug, slug) for slug in slugs], server["version"],
+                                       server["type"], get_mods_folder(name, server))
+    if failed:
+        raise RuntimeError(f"No compatible version of: {', '.join(failed)}")
+    return {"installed": slugs}
+
+
+def _backup(name, output_dir, keep_logs, ship_jars):
+    from core.server_package import export_server, HAS_ZSTD
+
+    os.makedirs(output_dir, exist_ok=True)
+    ext = ".pchub.tar.zst" if HAS_ZSTD else ".pchub.tar.gz"
+    output = os.path.join(output_dir, f"{name}-{time.strftime('%Y%m%d-%H%M%S')}{ext}")
+    export_server(name, output, exclude_logs=not keep_logs, exclude_caches=True,
+                  refetch_jars=not ship_jars)
+    return {"package": output, "size": os.path.getsize(output)}
+
+
+def _create(spec):
+    from core.server_manager import create_server_from_spec
+
+    server = create_server_from_spec(spec)
+    return {"server": spec["name"], "type": server["type"], "version": server["version"],
+            "port": server["port"]}
+
+
+# -------------------- Routes --------------------
+
+@route("GET", "/servers")
+async def list_servers(request):
+    from core.server_manager import load_data, get_server_status
+
+    data = await blocking(load_data) or {}
+    statuses = await asyncio.gather(*(blocking(get_server_status, n, s) for n, s in data.items()))
+    return 200, {"servers": statuses}
+
+
+@route("POST", "/servers")
+async def create(request):
+    spec = request.json()
+    if not spec.get("name"):
+        raise ApiError(400, "Spec needs a name")
+    from core.server_manager import load_data, validate_spec
+
+    try:
+        # Names come from the network - nothing is written before they're checked
+        spec = await blocking(validate_spec, spec)
+    except ValueError as e:
+        raise ApiError(400, str(e))
+    if spec["name"] in (await blocking(load_data) or {}):
+        raise ApiError(409, f"Server '{spec['name']}' already exists")
+    return accepted(run_in_background(f"create {spec['name']}", _create, spec, job_type="create"))
+
+
+@route("GET", "/servers/(?P<name>[^/]+)")
+async def server_status(request, name):
+    from core.server_manager import get_server_status
+
+    server = await blocking(_server, name)
+    return 200, await blocking(get_server_status, name, server)
+
+
+@route("POST", "/servers/(?P<name>[^/]+)/(?P<action>start|stop|restart)")
+async def power(request, name, action):
+    await blocking(_server, name)
+    body = request.json()
+    if action == "start":
+        job = run_in_background(f"start {name}", _start, name, job_type="server")
+    elif action == "stop":
+        job = run_in_background(f"stop {name}", _stop, name, bool(body.get("force")), job_type="server")
+    else:
+        job = run_in_background(f"restart {name}", _restart, name, job_type="server")
+    return accepted(job)
+
+
+@route("POST", "/servers/(?P<name>[^/]+)/command")
+async def console_command(request, name):
+    from core.server_manager import send_console_command
+
+    command = str(request.json().get("command", "")).strip()
+    if not command:
+        raise ApiError(400, "No command given")
+    await blocking(_server, name)
+    try:
+        response = await blocking(send_console_command, name, command.lstrip("/"))
+    except RuntimeError as e:
+        raise ApiError(409, str(e))
+    except OSError as e:
+        raise ApiError(502, f"RCON: {e}")
+    return 200, {"server": name, "command": command, "response": response}
+
+
+@route("GET", "/servers/(?P<name>[^/]+)/mods")
+async def list_mods(request, name):
+    from core.server_manager import get_mods_folder
+
+    server = await blocking(_server, name)
+    folder = get_mods_folder(name, server)
+    if not folder:
+        raise ApiError(409, "Vanilla servers can't have mods or plugins")
+    files = await blocking(lambda: sorted(f for f in os.listdir(folder) if f.endswith(".jar"))
+                           if os.path.isdir(folder) else [])
+    return 200, {"server": name, "folder": os.path.basename(folder), "files": files}
+
+
+@route("POST", "/servers/(?P<name>[^/]+)/mods")
+async def install_mods(request, name):
+    from core.server_manager import get_mods_folder
+
+    body = request.json()
+    slugs = body.get("slugs") or ([body["slug"]] if body.get("slug") else [])
+    if not slugs or not all(isinstance(s, str) for s in slugs):
+        raise ApiError(400, "Give a Modrinth \"slug\" or a list of \"slugs\"")
+    server = await blocking(_server, name)
+    if not get_mods_folder(name, server):
+        raise ApiError(409, "Vanilla servers can't have mods or plugins")
+    return accepted(run_in_background(f"install {', '.join(slugs)} on {name}", _install_mods,
+                                      name, server, slugs, job_type="download"))
+
+
+@route("DELETE", "/servers/(?P<name>[^/]+)/mods/(?P<filename>[^/]+)")
+async def remove_mod(request, name, filename):
+    from core.server_manager import remove_mod_file
+
+    server = await blocking(_server, name)
+    if not await blocking(remove_mod_file, name, server, filename):
+        raise ApiError(404, f"'{filename}' is not installed")
+    return 200, {"server": name, "removed": filename}
+
+
+@route("POST", "/servers/(?P<name>[^/]+)/backup")
+async def backup(request, name):
+    body = request.json()
+    await blocking(_server, name)
+    job = run_in_background(f"backup {name}", _backup, name, body.get("output") or "backups",
+                            bool(body.get("keep_logs")), bool(body.get("ship_jars")), job_type="export")
+    return accepted(job)
+
+
+@route("GET", "/jobs")
+async def jobs(request):
+    active = request.query.get("active") in ("1", "true")
+    return 200, {"jobs": [job_info(j, output_lines=0) for j in list_jobs(active_only=active)]}
+
+
+@route("GET", "/jobs/(?P<job_id>\\d+)")
+async def job(request, job_id):
+    found = get_job(int(job_id))
+    if not found:
+        raise ApiError(404, f"No job {job_id}")
+    return 200, job_info(found, output_lines=None)
+
+
+@route("DELETE", "/jobs/(?P<job_id>\\d+)")
+async def cancel(request, job_id):
+    if not get_job(int(job_id)):
+        raise ApiError(404, f"No job {job_id}")
+    if not cancel_job(int(job_id)):
+        raise ApiError(409, f"Job {job_id} already ended")
+    return 200, {"job": int(job_id), "cancelled": True}
+
+
+@route("GET", "/events")
+async def fleet_events(request):
+    from core.server_manager import load_data
+
+    data = await blocking(load_data) or {}
+    names = [n for n in request.query.get("servers", "").split(",") if n] or list(data)
+    missing = [n for n in names if n not in data]
+    if missing:
+        raise ApiError(404, f"Unknown servers: {', '.join(missing)}")
+    return _event_stream(request, names)
+
+
+@route("GET", "/servers/(?P<name>[^/]+)/events")
+async def server_events(request, name):
+    await blocking(_server, name)
+    return _event_stream(request, [name])
+
+
+# -------------------- Event streams --------------------
+
+def _event_stream(request, names):
+    try:
+        recent = int(request.query.get("recent", RECENT_LINES))
+    except ValueError:
+        raise ApiError(400, "recent must be a number")
+
+    if request.headers.get("upgrade", "").lower() == "websocket":
+        key = request.headers.get("sec-websocket-key")
+        if not key:
+            raise ApiError(400, "Missing Sec-WebSocket-Key")
+        return Stream(lambda reader, writer: _websocket(reader, writer, key, names, recent))
+    return Stream(lambda reader, writer: _sse(writer, names, recent))
+
+
+async def _pump(subscription, writer, send, send_keepalive):
+    """Copy events to the client until it leaves or falls behind"""
+    while not writer.is_closing():
+        try:
+            events = await subscription.next(KEEPALIVE_INTERVAL)
+        except Dropped as e:
+            send([{"type": "dropped", "reason": str(e)}])
+            await writer.drain()
+            return
+        if events:
+            send(events)
+        else:
+            send_keepalive()
+        # A client that can't keep up is cut off here or by Dropped
+        await asyncio.wait_for(writer.drain(), SEND_TIMEOUT)
+
+
+async def _sse(writer, names, recent):
+    writer.write(b"HTTP/1.1 200 OK\r\nContent-Type: text/event-stream\r\n"
+                 b"Cache-Control: no-cache\r\nConnection: close\r\n\r\n")
+
+    def send(events):
+        writer.write("".join(
+            (f"id: {e['seq']}\n" if "seq" in e else "") + f"event: {e['type']}\ndata: {json.dumps(e)}\n\n"
+            for e in events
+        ).encode("utf-8"))
+
+    subscription = await blocking(Subscription, names, recent)
+    try:
+        await _pump(subscription, writer, send, lambda: writer.write(b": keep-alive\n\n"))
+    except (asyncio.TimeoutError, ConnectionError):
+        pass
+    finally:
+        subscription.close()
+
+
+def _ws_frame(opcode, payload=b""):
+    size = len(payload)
+    if size < 126:
+        head = struct.pack("!BB", 0x80 | opcode, size)
+    elif size < 65536:
+        head = struct.pack("!BBH", 0x80 | opcode, 126, size)
+    else:
+        head = struct.pack("!BBQ", 0x80 | opcode, 127, size)
+    return head + payload
+
+
+async def _ws_read(reader, writer):
+    """Answer pings and return once the client closes (its messages are ignored)"""
+    while True:
+        first, second = await reader.readexactly(2)
+        opcode, size = first & 0x0F, second & 0x7F
+        if size == 126:
+            size = struct.unpack("!H", await reader.readexactly(2))[0]
+        elif size == 127:
+            size = struct.unpack("!Q", await reader.readexactly(8))[0]
+        if size > MAX_BODY:
+            return
+        mask = await reader.readexactly(4) if second & 0x80 else b"\0\0\0\0"
+        payload = bytes(b ^ mask[i % 4] for i, b in enumerate(await reader.readexactly(size)))
+        if opcode == 0x8:
+            writer.write(_ws_frame(0x8, payload[:2]))
+            return
+        if opcode == 0x9:
+            writer.write(_ws_frame(0xA, payload))
+
+
+async def _websocket(reader, writer, key, names, recent):
+    accept = base64.b64encode(hashlib.sha1((key + WS_GUID).encode()).digest()).decode()
+    writer.write(("HTTP/1.1 101 Switching Protocols\r\nUpgrade: websocket\r\nConnection: Upgrade\r\n"
+                  f"Sec-WebSocket-Accept: {accept}\r\n\r\n").encode("latin-1"))
+
+    def send(events):
+        writer.write(b"".join(_ws_frame(0x1, json.dumps(e).encode("utf-8")) for e in events))
+
+    subscription = await blocking(Subscription, names, recent)
+    pump = asyncio.ensure_future(_pump(subscription, writer, send, lambda: writer.write(_ws_frame(0x9))))
+    listen = asyncio.ensure_future(_ws_read(reader, writer))
+    try:
+        await asyncio.wait([pump, listen], return_when=asyncio.FIRST_COMPLETED)
+    finally:
+        for task in (pump, listen):
+            task.cancel()
+        await asyncio.gather(pump, listen, return_exceptions=True)
+        subscription.close()
+        try:
+            writer.write(_ws_frame(0x8, struct.pack("!H", 1000)))
+        except Exception:
+            pass
+
+
+# -------------------- HTTP --------------------
+
+async def _read_request(reader):
+    """Next request on the connection, None when the client is done"""
+    line = await asyncio.wait_for(reader.readline(), IDLE_TIMEOUT)
+    if not line:
+        return None
+    try:
+        method, target, _ = line.decode("latin-1").split(" ", 2)
+    except ValueError:
+        raise ApiError(400, "Malformed request line")
+
+    headers = {}
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b"\n", b""):
+            break
+        if len(headers) >= MAX_HEADERS:
+            raise ApiError(400, "Too many headers")
+        key, _, value = line.decode("latin-1").partition(":")
+        headers[key.strip().lower()] = value.strip()
+
+    length = int(headers.get("content-length") or 0)
+    if length > MAX_BODY:
+        raise ApiError(413, "Body too large")
+    body = await reader.readexactly(length) if length else b""
+
+    url = urlsplit(target)
+    query = dict(parse_qsl(url.query))
+    return Request(method.upper(), url.path.rstrip("/") or "/", query, headers, body)
+
+
+async def _dispatch(request):
+    allowed = False
+    for method, pattern, handler in _routes:
+        match = pattern.match(request.path)
+        if not match:
+            continue
+        if method != request.method:
+            allowed = True
+            continue
+        params = {k: unquote(v) for k, v in match.groupdict().items()}
+        return await handler(request, **params)
+    if allowed:
+        raise ApiError(405, f"{request.method} not allowed on {request.path}")
+    raise ApiError(404, f"No such endpoint: {request.path}")
+
+
+def _response(status, body, keep_alive):
+    payload = json.dumps(body, default=str).encode("utf-8")
+    head = (f"HTTP/1.1 {status} {REASONS.get(status, '')}\r\n"
+            f"Content-Type: application/json\r\n"
+            f"Content-Length: {len(payload)}\r\n"
+            f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n")
+    return head.encode("latin-1") + payload
+
+
+async def _handle_client(reader, writer, token):
+    try:
+        while True:
+            keep_alive = False
+            try:
+                request = await _read_request(reader)
+                if request is None:
+                    break
+                keep_alive = request.headers.get("connection", "").lower() != "close"
+                if not _authorized(request, token):
+                    raise ApiError(401, "Missing or wrong API token")
+                result = await _dispatch(request)
+                if isinstance(result, Stream):
+                    await result.run(reader, writer)
+                    break
+                status, body = result
+            except ApiError as e:
+                status, body = e.status, {"error": str(e)}
+            except (asyncio.TimeoutError, asyncio.IncompleteReadError, ConnectionError):
+                break
+            except Exception as e:
+                status, body = 500, {"error": f"{type(e).__name__}: {e}"}
+
+            writer.write(_response(status, body, keep_alive))
+            await writer.drain()
+            if not keep_alive:
+                break
+    except ConnectionError:
+        pass
+    finally:
+        writer.close()
+
+
+async def serve(host=None, port=None, socket_path=None, ready=None):
+    """Run the API until cancelled"""
+    settings = load_settings()
+    token = get_token()
+    socket_path = socket_path if socket_path is not None else settings.get("api_socket")
+
+    def handler(reader, writer):
+        return _handle_client(reader, writer, token)
+
+    if socket_path:
+        if os.path.exists(socket_path):
+            os.remove(socket_path)
+        server = await asyncio.start_unix_server(handler, path=socket_path)
+        os.chmod(socket_path, 0o600)
+        where = socket_path
+    else:
+        host = host or settings.get("api_host") or DEFAULT_HOST
+        port = port if port is not None else settings.get("api_port") or DEFAULT_PORT
+        server = await asyncio.start_server(handler, host, port)
+        where = f"http://{host}:{server.sockets[0].getsockname()[1]}"
+
+    print(f"✔ Control API listening on {where}")
+    if ready:
+        ready(where)
+    async with server:
+        await server.serve_forever()
+
+
+def start_api_in_background():
+    """Serve the API from a daemon thread (used by the menu when api_enabled)"""
+    def run():
+        try:
+            asyncio.run(serve())
+        except Exception as e:
+            print(f"⚠ Control API could not start: {e}")
+
+    thread = threading.Thread(target=run, name="control-api", daemon=True)
+    thread.start()
+    return thread
+
+
+def main():
+    parser = argparse.ArgumentParser(prog="python -m core.api_server")
+    parser.add_argument("--host", help=f"Address to bind (default {DEFAULT_HOST})")
+    parser.add_argument("--port", type=int, help=f"Port (default {DEFAULT_PORT})")
+    parser.add_argument("--socket", help="Listen on a Unix socket instead")
+    parser.add_argument("--show-token", action="store_true", help="Print the API token and exit")
+    args = parser.parse_args()
+
+    if args.show_token:
+        print(get_token())
+        return
+
+    try:
+        asyncio.run(serve(args.host, args.port, args.socket))
+    except KeyboardInterrupt:
+        pass
+    except OSError as e:
+        print(f"❌ {e}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
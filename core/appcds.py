@@ -0,0 +1,170 @@
+"""
+AppCDS Archives for PyCraftHub
+Loading tens of thousands of classes is a big part of every boot. Java 13+
+can dump the classes a run loaded into a dynamic CDS archive when it exits
+(-XX:ArchiveClassesAtExit) and map it straight back in on the next launch
+(-XX:SharedArchiveFile).
+
+- One archive per server, keyed by (server JAR hash, Java version, folder);
+  a new JAR, a Java upgrade or a migration invalidates it automatically
+- The archive is written when a clean run shuts down, so the first boot
+  after a change runs without one
+- Boot times are recorded with the mode they ran in, so the gain is visible
+"""
+import os
+import re
+import glob
+import json
+import time
+import hashlib
+import threading
+from statistics import median
+
+from core.jvm_profiles import detect_java_version
+from settings_module import load_settings
+from utils.helpers import hash_file
+
+CDS_DIR = ".cds"
+STATE_FILE = "cds.json"
+BOOT_HISTORY_FILE = os.path.join("data", "boot_times.json")
+BOOT_HISTORY_KEEP = 50
+
+# First Java with -XX:ArchiveClassesAtExit
+MIN_JAVA = 13
+BOOT_TIMEOUT = 600
+
+DONE_RE = re.compile(r'Done \((\d+(?:[.,]\d+)?)s\)!')
+
+_history_lock = threading.Lock()
+
+
+# -------------------- Archive key --------------------
+
+def launch_fingerprint(server_path, server):
+    """
+    Hash of what defines the classpath: the server JAR, or for Forge
+    the argument files run.bat/run.sh hand to java. None if not installed.
+    """
+    if server.get("type") == "forge":
+        files = sorted(glob.glob(os.path.join(
+            server_path, "libraries", "net", "minecraftforge", "forge", "*", "*_args.txt"
+        )))
+    else:
+        files = [os.path.join(server_path, server.get("jar", "server.jar"))]
+
+    files = [f for f in files if os.path.isfile(f)]
+    if not files:
+        return None
+    if len(files) == 1:
+        return hash_file(files[0])
+    return hashlib.sha256("".join(hash_file(f) for f in files).encode()).hexdigest()
+
+
+def _load_state(server_path):
+    try:
+        with open(os.path.join(server_path, CDS_DIR, STATE_FILE), "r") as f:
+            return json.load(f)
+    except:
+        return {}
+
+
+def _save_state(server_path, state):
+    folder = os.path.join(server_path, CDS_DIR)
+    os.makedirs(folder, exist_ok=True)
+    with open(os.path.join(folder, STATE_FILE), "w") as f:
+        json.dump(state, f, indent=4)
+
+
+def _invalidate(server_path, keep=None):
+    """Remove every archive except keep"""
+    for path in glob.glob(os.path.join(server_path, CDS_DIR, "*.jsa")):
+        if os.path.basename(path) != keep:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+
+# -------------------- Launch --------------------
+
+def prepare_launch(server_path, server):
+    """
+    JVM flags for this launch plus the mode it runs in.
+
+    Returns (flags, mode): mode is "cds" when an archive is used, "dump"
+    when this run will write one, or "off".
+    """
+    if not load_settings().get("appcds", True) or server.get("appcds") is False:
+        return [], "off"
+
+    java_version = detect_java_version()
+    if not java_version or java_version < MIN_JAVA:
+        return [], "off"
+
+    fingerprint = launch_fingerprint(server_path, server)
+    if not fingerprint:
+        return [], "off"
+
+    abs_path = os.path.abspath(server_path)
+    key = f"{fingerprint[:16]}-java{java_version}"
+    archive_name = f"{key}.jsa"
+    archive = os.path.join(abs_path, CDS_DIR, archive_name)
+    # The JVM runs in the server folder; a relative path survives spaces in
+    # user_jvm_args.txt, which Java splits on whitespace
+    flag_path = os.path.join(CDS_DIR, archive_name)
+
+    state = _load_state(server_path)
+    if state.get("key") != key or state.get("path") != abs_path:
+        # New JAR, new Java or the server moved - old archives are useless
+        _invalidate(server_path)
+        state = {"key": key, "path": abs_path, "created": None}
+        _save_state(server_path, state)
+    else:
+        _invalidate(server_path, keep=archive_name)
+
+    if os.path.isfile(archive) and os.path.getsize(archive) > 0:
+        if not state.get("created"):
+            state["created"] = time.strftime("%Y-%m-%d %H:%M:%S")
+            _save_state(server_path, state)
+        return [f"-XX:SharedArchiveFile={flag_path}"], "cds"
+
+    os.makedirs(os.path.dirname(archive), exist_ok=True)
+    return [f"-XX:ArchiveClassesAtExit={flag_path}"], "dump"
+
+
+# -------------------- Boot times --------------------
+
+def load_boot_history():
+    try:
+        with open(BOOT_HISTORY_FILE, "r") as f:
+            return json.load(f)
+    except:
+        return {}
+
+
+def record_boot(server_name, seconds, reported=None, mode="off", details=None):
+    """Append one boot to data/boot_times.json (details: what it ran with, see core/readiness.py)"""
+    with _history_lock:
+        history = load_boot_history()
+        boots = history.setdefault(server_name, [])
+        boots.append({
+            "time": time.strftime("%Y-%m-%d %H:%M:%S"),
+            "seconds": round(seconds, 2),
+            "reported": reported,
+            "mode": mode,
+            **(details or {}),
+        })
+        del boots[:-BOOT_HISTORY_KEEP]
+        os.makedirs("data", exist_ok=True)
+        with open(BOOT_HISTORY_FILE, "w") as f:
+            json.dump(history, f, indent=4)
+
+
+def boot_summary(server_name):
+    """Median boot time without an archive vs with one (None when no data)"""
+    boots = load_boot_history().get(server_name, [])
+    without = [b["seconds"] for b in boots if b["mode"] in ("off", "dump")]
+    with_cds = [b["seconds"] for b in boots if b["mode"] == "cds"]
+    return {"without": median(without) if without else None,
+            "with": median(with_cds) if with_cds else None,
+            "boots": len(boots)}
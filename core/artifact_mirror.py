@@ -0,0 +1,509 @@
+"""
+LAN Artifact Mirror for PyCraftHub
+Hosts on one network download each server JAR, installer and mod once:
+the host with "mirror_serve" on keeps what it downloads and serves it to
+the others, whose "mirror_peers" are asked first - by content hash where
+upstream publishes one (Paper sha256, Purpur md5, Mojang sha1, Modrinth
+sha1/sha512), by URL for immutable ones without (Fabric launcher, Forge
+installer). A miss, a wrong hash or a peer that's down falls back to the
+upstream download, so a mirror can only save bandwidth.
+
+    GET/HEAD /artifacts/<md5|sha1|sha256|sha512>/<hex>
+    GET/HEAD /artifacts/url/<sha256 of the download URL>
+
+Files are sent with sendfile() (zero-copy) and honour single byte
+ranges, which peers use to resume an interrupted transfer.
+
+    python -m core.artifact_mirror serve
+    python -m core.artifact_mirror add servers/survival/server.jar
+    python -m core.artifact_mirror list
+
+Kept files live in data/artifacts/store/<sha256>, hardlinked to the
+download when they can be; data/artifacts/index.json maps every hash and
+URL to them. The cleaner drops those no peer asked for in
+"mirror_keep_days".
+"""
+import os
+import sys
+import json
+import time
+import shutil
+import hashlib
+import argparse
+import threading
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+from utils.lazy import lazy_import
+from utils.helpers import format_bytes
+from utils.tracing import annotate
+from core.jobs import copy_stream
+from settings_module import load_settings
+
+requests = lazy_import("requests")
+
+ARTIFACT_DIR = os.path.join("data", "artifacts")
+STORE_DIR = os.path.join(ARTIFACT_DIR, "store")
+INDEX_FILE = os.path.join(ARTIFACT_DIR, "index.json")
+
+DEFAULT_HOST = "0.0.0.0"
+DEFAULT_PORT = 8766
+HASH_ALGOS = ("md5", "sha1", "sha256", "sha512")
+CHUNK_SIZE = 1024 * 1024
+
+# A peer on the LAN answers fast or not at all
+PEER_CONNECT_TIMEOUT = 2
+PEER_READ_TIMEOUT = 30
+# A peer that didn't answer isn't asked again for this long
+PEER_RETRY_AFTER = 60
+# Leftovers of an interrupted add are only removed once this old
+STALE_TMP_AGE = 3600
+
+_index_lock = threading.Lock()
+_down_peers = {}  # peer -> time it may be asked again
+
+
+class HashMismatch(Exception):
+    """A downloaded file doesn't have the hash it was published with"""
+
+
+# -------------------- Hashes --------------------
+
+def hash_file(path, algos=HASH_ALGOS):
+    """{algo: hex digest} of a file, read once for all algorithms"""
+    digests = {algo: hashlib.new(algo) for algo in algos}
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(CHUNK_SIZE), b""):
+            for digest in digests.values():
+                digest.update(chunk)
+    return {algo: digest.hexdigest() for algo, digest in digests.items()}
+
+
+def url_key(url):
+    return hashlib.sha256(url.encode("utf-8")).hexdigest()
+
+
+def _clean_hashes(hashes):
+    """Known algorithms only, lower-case hex"""
+    return {algo: value.lower() for algo, value in (hashes or {}).items() if algo in HASH_ALGOS and value}
+
+
+def verify(path, hashes):
+    """Raise HashMismatch unless path has every given hash"""
+    hashes = _clean_hashes(hashes)
+    if not hashes:
+        return
+    actual = hash_file(path, tuple(hashes))
+    for algo, expected in hashes.items():
+        if actual[algo] != expected:
+            raise HashMismatch(f"{os.path.basename(path)}: {algo} is {actual[algo][:12]}..., expected {expected[:12]}...")
+
+
+# -------------------- Store --------------------
+
+def _load_index():
+    try:
+        with open(INDEX_FILE, "r") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {"keys": {}, "files": {}}
+
+
+def _save_index(index):
+    os.makedirs(ARTIFACT_DIR, exist_ok=True)
+    tmp = INDEX_FILE + ".tmp"
+    with open(tmp, "w") as f:
+        json.dump(index, f, indent=4)
+    os.replace(tmp, INDEX_FILE)
+
+
+def serving_enabled():
+    return bool(load_settings().get("mirror_serve"))
+
+
+def add_artifact(path, url=None):
+    """
+    Keep a file in the store and index it by all its hashes (and by url).
+    Returns its sha256.
+    """
+    digests = hash_file(path)
+    sha256 = digests["sha256"]
+    stored = os.path.join(STORE_DIR, sha256)
+    os.makedirs(STORE_DIR, exist_ok=True)
+    if not os.path.exists(stored):
+        tmp = f"{stored}.{os.getpid()}.tmp"
+        try:
+            os.link(path, tmp)
+        except OSError:
+            # Another volume - the mirror needs its own copy
+            shutil.copyfile(path, tmp)
+        os.replace(tmp, stored)
+
+    st = os.stat(stored)
+    with _index_lock:
+        index = _load_index()
+        index["files"][sha256] = {"size": st.st_size, "mtime_ns": st.st_mtime_ns,
+                                  "name": os.path.basename(path), "added": time.time()}
+        for algo, value in digests.items():
+            index["keys"][f"{algo}:{value}"] = sha256
+        if url:
+            index["keys"][f"url:{url_key(url)}"] = sha256
+        _save_index(index)
+    return sha256
+
+
+def remember(path, url=None):
+    """add_artifact() for a fresh upstream download when this host serves a mirror"""
+    if not serving_enabled():
+        return
+    try:
+        add_artifact(path, url)
+    except OSError as e:
+        print(f"⚠ Could not add {os.path.basename(path)} to the LAN mirror: {e}")
+
+
+def lookup(key):
+    """
+    Path of the stored file for "<algo>:<hex>" or "url:<hex>", None when
+    unknown. A file changed since it was indexed (the hardlinked server
+    copy got rewritten) is dropped from the index instead of served.
+    """
+    with _index_lock:
+        index = _load_index()
+        sha256 = index["keys"].get(key)
+        entry = index["files"].get(sha256) if sha256 else None
+        if not entry:
+            return None
+        path = os.path.join(STORE_DIR, sha256)
+        try:
+            st = os.stat(path)
+            if st.st_size == entry["size"] and st.st_mtime_ns == entry["mtime_ns"]:
+                entry["used"] = time.time()
+                _save_index(index)
+                return path
+        except OSError:
+            pass
+        index["files"].pop(sha256, None)
+        index["keys"] = {k: v for k, v in index["keys"].items() if v != sha256}
+        _save_index(index)
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+    return None
+
+
+def store_inodes():
+    """(st_dev, st_ino) of every stored file - their links aren't servers using a build"""
+    inodes = set()
+    try:
+        names = os.listdir(STORE_DIR)
+    except OSError:
+        return inodes
+    for name in names:
+        try:
+            st = os.stat(os.path.join(STORE_DIR, name))
+        except OSError:
+            continue
+        inodes.add((st.st_dev, st.st_ino))
+    return inodes
+
+
+def prune_store(keep_days, dry_run=False):
+    """
+    Drop artifacts neither added nor served in keep_days (0 keeps
+    everything), plus files the index doesn't know. Returns (files
+    removed, bytes freed) - bytes only count files with no other link.
+    """
+    if not keep_days or not os.path.isdir(STORE_DIR):
+        return 0, 0
+    cutoff = time.time() - keep_days * 86400
+    removed, freed = 0, 0
+    with _index_lock:
+        index = _load_index()
+        expired = {sha256 for sha256, entry in index["files"].items()
+                   if max(entry.get("added", 0), entry.get("used", 0)) < cutoff}
+        for name in os.listdir(STORE_DIR):
+            path = os.path.join(STORE_DIR, name)
+            try:
+                st = os.stat(path)
+            except OSError:
+                continue
+            unknown = name not in index["files"] and st.st_mtime < time.time() - STALE_TMP_AGE
+            if name not in expired and not unknown:
+                continue
+            removed += 1
+            if st.st_nlink == 1:
+                freed += st.st_size
+            if not dry_run:
+                try:
+                    os.remove(path)
+                except OSError:
+                    continue
+        if expired and not dry_run:
+            for sha256 in expired:
+                index["files"].pop(sha256, None)
+            index["keys"] = {k: v for k, v in index["keys"].items() if v not in expired}
+            _save_index(index)
+    return removed, freed
+
+
+# -------------------- Serving --------------------
+
+def parse_range(header, size):
+    """
+    (start, end) of a "bytes=a-b" Range header, inclusive. None when the
+    range can't be satisfied. Multi-range requests aren't supported.
+    """
+    unit, _, spec = header.partition("=")
+    if unit.strip().lower() != "bytes" or "," in spec:
+        return None
+    first, _, last = spec.strip().partition("-")
+    try:
+        if not first:
+            # Suffix range: the last N bytes
+            length = int(last)
+            if length <= 0:
+                return None
+            return max(0, size - length), size - 1
+        start = int(first)
+        end = min(int(last), size - 1) if last else size - 1
+    except ValueError:
+        return None
+    if start > end or start >= size:
+        return None
+    return start, end
+
+
+class MirrorHandler(BaseHTTPRequestHandler):
+    server_version = "PyCraftHub-Mirror"
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        self._serve(body=True)
+
+    def do_HEAD(self):
+        self._serve(body=False)
+
+    def _send_empty(self, status, headers=None):
+        self.send_response(status)
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def _serve(self, body):
+        parts = self.path.split("?", 1)[0].strip("/").split("/")
+        if len(parts) != 3 or parts[0] != "artifacts" or parts[1] not in HASH_ALGOS + ("url",):
+            return self._send_empty(404)
+        path = lookup(f"{parts[1]}:{parts[2].lower()}")
+        if not path:
+            return self._send_empty(404)
+
+        try:
+            f = open(path, "rb")
+        except OSError:
+            return self._send_empty(404)
+        with f:
+            size = os.fstat(f.fileno()).st_size
+            start, end, status = 0, size - 1, 200
+            requested = self.headers.get("Range")
+            if requested:
+                byte_range = parse_range(requested, size)
+                if byte_range is None:
+                    return self._send_empty(416, {"Content-Range": f"bytes */{size}"})
+                (start, end), status = byte_range, 206
+
+            self.send_response(status)
+            self.send_header("Content-Type", "application/octet-stream")
+            self.send_header("Content-Length", str(end - start + 1))
+            self.send_header("Accept-Ranges", "bytes")
+            self.send_header("ETag", f'"{os.path.basename(path)}"')
+            if status == 206:
+                self.send_header("Content-Range", f"bytes {start}-{end}/{size}")
+            self.end_headers()
+            if body and size:
+                # Kernel to socket, no copies through Python
+                self.connection.sendfile(f, start, end - start + 1)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def serve(host=None, port=None):
+    """Serve the store until interrupted"""
+    settings = load_settings()
+    host = host or settings.get("mirror_host") or DEFAULT_HOST
+    port = port or settings.get("mirror_port") or DEFAULT_PORT
+    server = ThreadingHTTPServer((host, int(port)), MirrorHandler)
+    server.daemon_threads = True
+    print(f"📦 LAN mirror serving {len(_load_index()['files'])} artifact(s) on http://{host}:{port}")
+    try:
+        server.serve_forever()
+    finally:
+        server.server_close()
+
+
+def start_mirror_in_background():
+    """Serve the mirror from a daemon thread (used by the menu when mirror_serve)"""
+    def run():
+        try:
+            serve()
+        except Exception as e:
+            print(f"⚠ LAN mirror could not start: {e}")
+
+    thread = threading.Thread(target=run, name="artifact-mirror", daemon=True)
+    thread.start()
+    return thread
+
+
+# -------------------- Fetching --------------------
+
+def mirror_peers():
+    """Base URLs of the peers to ask, e.g. http://192.168.1.20:8766"""
+    peers = []
+    for peer in load_settings().get("mirror_peers") or []:
+        peer = str(peer).strip().rstrip("/")
+        if peer:
+            peers.append(peer if "://" in peer else f"http://{peer}")
+    return peers
+
+
+def _fetch(url, dest, hashes):
+    """One peer URL into dest, resuming dest.part. False on a miss."""
+    part = dest + ".part"
+    offset = os.path.getsize(part) if os.path.exists(part) else 0
+    headers = {"Range": f"bytes={offset}-"} if offset else {}
+
+    with requests.get(url, headers=headers, stream=True,
+                      timeout=(PEER_CONNECT_TIMEOUT, PEER_READ_TIMEOUT)) as r:
+        if r.status_code == 404:
+            return False
+        if r.status_code == 416:
+            # Nothing left past the partial file: it's complete, or not this artifact
+            if r.headers.get("Content-Range") != f"bytes */{offset}":
+                os.remove(part)
+                return _fetch(url, dest, hashes)
+        else:
+            r.raise_for_status()
+            with open(part, "ab" if r.status_code == 206 else "wb") as f:
+                copy_stream(r, f)
+        # Without a published hash the peer's own sha256 still catches a bad transfer
+        if not hashes and r.headers.get("ETag"):
+            hashes = {"sha256": r.headers["ETag"].strip('"')}
+
+    try:
+        verify(part, hashes)
+    except HashMismatch:
+        os.remove(part)
+        raise
+    os.replace(part, dest)
+    return True
+
+
+def fetch_from_peers(dest, hashes=None, url=None):
+    """
+    Download an artifact from a LAN peer into dest, by hash first, then by
+    url. True when a peer had it and it checked out.
+    """
+    hashes = _clean_hashes(hashes)
+    keys = [(algo, value) for algo, value in hashes.items()]
+    if url:
+        keys.append(("url", url_key(url)))
+    if not keys:
+        return False
+
+    for peer in mirror_peers():
+        if _down_peers.get(peer, 0) > time.time():
+            continue
+        for kind, value in keys:
+            try:
+                if _fetch(f"{peer}/artifacts/{kind}/{value}", dest, hashes):
+                    annotate(source="peer", peer=peer)
+                    print(f"📦 {os.path.basename(dest)} from LAN mirror {peer}")
+                    return True
+            except (requests.ConnectionError, requests.Timeout):
+                # Down or dropped mid-transfer: what arrived stays in .part for the next try
+                _down_peers[peer] = time.time() + PEER_RETRY_AFTER
+                break
+            except (requests.RequestException, HashMismatch, OSError) as e:
+                print(f"⚠ LAN mirror {peer}: {e}")
+                break
+    return False
+
+
+def download_artifact(url, dest, hashes=None, timeout=30, label=None):
+    """
+    Download url into dest - from a LAN peer when one has it, otherwise
+    from upstream (checked against hashes when given, then kept for peers
+    when this host serves a mirror).
+    """
+    if fetch_from_peers(dest, hashes, url):
+        return dest
+
+    with requests.get(url, stream=True, timeout=timeout) as r:
+        r.raise_for_status()
+        with open(dest, "wb") as f:
+            copy_stream(r, f, label=label)
+    annotate(source="upstream")
+    verify(dest, hashes)
+    try:
+        # A peer's partial copy isn't needed any more
+        os.remove(dest + ".part")
+    except OSError:
+        pass
+    remember(dest, url)
+    return dest
+
+
+# -------------------- CLI --------------------
+
+def print_artifacts():
+    index = _load_index()
+    if not index["files"]:
+        print("No artifacts in the LAN mirror yet")
+        return
+    urls = {}
+    for key, sha256 in index["keys"].items():
+        if key.startswith("url:"):
+            urls[sha256] = urls.get(sha256, 0) + 1
+    total = 0
+    for sha256, entry in sorted(index["files"].items(), key=lambda item: item[1].get("name", "")):
+        total += entry["size"]
+        print(f"{sha256[:16]}  {format_bytes(entry['size']):>10}  {entry.get('name', '?')}"
+              + ("  (by URL too)" if urls.get(sha256) else ""))
+    print(f"\n{len(index['files'])} artifact(s), {format_bytes(total)}")
+
+
+def main():
+    parser = argparse.ArgumentParser(prog="python -m core.artifact_mirror")
+    sub = parser.add_subparsers(dest="command", required=True)
+    p = sub.add_parser("serve", help="Serve kept artifacts to LAN peers")
+    p.add_argument("--host", help=f"Address to bind (default {DEFAULT_HOST})")
+    p.add_argument("--port", type=int, help=f"Port (default {DEFAULT_PORT})")
+    p = sub.add_parser("add", help="Keep existing files (e.g. server JARs) for peers")
+    p.add_argument("files", nargs="+")
+    p.add_argument("--url", help="Also index the file under this download URL")
+    sub.add_parser("list", help="Show kept artifacts")
+    args = parser.parse_args()
+
+    if args.command == "serve":
+        try:
+            serve(args.host, args.port)
+        except KeyboardInterrupt:
+            pass
+        except OSError as e:
+            print(f"❌ {e}")
+            sys.exit(1)
+    elif args.command == "add":
+        for path in args.files:
+            try:
+                sha256 = add_artifact(path, args.url)
+                print(f"✔ {path} ({sha256[:16]})")
+            except OSError as e:
+                print(f"❌ {path}: {e}")
+    else:
+        print_artifacts()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,399 @@
+"""
+Server Benchmarks for PyCraftHub
+Boots disposable copies of servers from servers.json side by side so
+server types (Paper, Purpur, Fabric + performance mods, Forge) and JVM
+profiles can be compared on numbers instead of gut feeling.
+
+    python cli.py benchmark smp-paper smp-fabric --seed 1234 --runs 5
+    python cli.py benchmark smp-paper --profile aikar --profile zgc
+
+Every variant (server x JVM profile) is copied without its world into
+benchmarks/<run>/, then booted `runs` times with a cold and a warm page
+cache. Each boot starts from a fresh world generated from the same seed
+and records:
+    - time until the "Done" line (or the first answered ping)
+    - RSS of the JVM right after boot
+    - MSPT while a fixed square of chunks around 0,0 is force-loaded,
+      which generates them - the same workload on every server type
+The report (JSON and CSV) holds every boot plus median / min / max /
+stdev per variant and cache state.
+
+Nothing is downloaded: the copies reuse the JARs, libraries and Paperclip
+caches already in the server folders, so a server that booted once can be
+benchmarked offline.
+"""
+import os
+import re
+import csv
+import sys
+import json
+import glob
+import time
+import shutil
+import subprocess
+from statistics import median, stdev
+
+from utils.lazy import lazy_import
+from utils.helpers import format_bytes
+from core.storage import get_server_path
+from core.jvm_profiles import build_jvm_args, PROFILES
+from core.rcon import read_properties, set_properties, send_command
+from core.server_manager import get_free_port
+from core.readiness import wait_until_ready, log_marker, BootWatch
+
+psutil = lazy_import("psutil")
+
+BENCHMARK_DIR = "benchmarks"
+CACHE_STATES = ("cold", "warm")
+
+BOOT_TIMEOUT = 600
+STOP_TIMEOUT = 60
+# Chunks force-loaded per command - forceload refuses more than 256
+FORCELOAD_TILE = 16
+MSPT_INTERVAL = 5.0
+
+# Runtime state and anything the benchmark regenerates itself
+SKIP_NAMES = {"logs", "crash-reports", "running.txt", "command.txt", "session.lock",
+              ".cds", "backups", "start_forge.bat", "run_server.bat"}
+
+MSPT_QUERIES = (
+    # Vanilla 1.20.3+ (and every loader built on it)
+    ("tick query", re.compile(r"Average time per tick:\s*([\d.,]+)\s*ms")),
+    # Paper / Purpur: avg/min/max over the last 5s first
+    ("mspt", re.compile(r"([\d.,]+)/[\d.,]+/[\d.,]+")),
+    # Forge
+    ("forge tps", re.compile(r"Mean tick time:\s*([\d.,]+)\s*ms")),
+)
+
+_COLOR_CODE = re.compile("§.")
+
+
+# -------------------- Provisioning --------------------
+
+def _world_folders(path):
+    level = read_properties(path).get("level-name") or "world"
+    return {level, f"{level}_nether", f"{level}_the_end"}
+
+
+def provision(server_name, server, dest, seed):
+    """Copy a server without its world or runtime files and point it at the seed"""
+    src = get_server_path(server_name)
+    if not os.path.isdir(src):
+        raise RuntimeError(f"Server folder of '{server_name}' not found")
+
+    skip = SKIP_NAMES | _world_folders(src)
+    shutil.copytree(src, dest, ignore=lambda folder, names: [n for n in names if folder == src and n in skip])
+
+    port, rcon_port = get_free_port(), get_free_port()
+    set_properties(dest, {
+        "server-port": port,
+        "level-seed": seed,
+        "level-name": "world",
+        "enable-rcon": "true",
+        "rcon.port": rcon_port,
+        "rcon.password": os.urandom(12).hex(),
+        "broadcast-rcon-to-ops": "false",
+    })
+    with open(os.path.join(dest, "eula.txt"), "w") as f:
+        f.write("eula=true")
+    return port
+
+
+def reset_world(path):
+    """Delete the generated world so every boot generates the same one"""
+    for folder in _world_folders(path) | {"logs"}:
+        shutil.rmtree(os.path.join(path, folder), ignore_errors=True)
+
+
+def launch_command(server, path, jvm_args):
+    """java command line for a server folder (no console window, no wrapper script)"""
+    if server.get("type") == "forge":
+        name = "win_args.txt" if os.name == "nt" else "unix_args.txt"
+        found = glob.glob(os.path.join(path, "libraries", "net", "minecraftforge", "forge", "*", name))
+        if not found:
+            raise RuntimeError("Forge server not installed")
+        return ["java", *jvm_args, f"@{os.path.relpath(found[0], path)}", "nogui"]
+    jar = server.get("jar", "server.jar")
+    if not os.path.exists(os.path.join(path, jar)):
+        raise RuntimeError(f"JAR file not found: {jar}")
+    return ["java", *jvm_args, "-jar", jar, "nogui"]
+
+
+# -------------------- Page cache --------------------
+
+def _java_home():
+    java = shutil.which("java")
+    return os.path.dirname(os.path.dirname(os.path.realpath(java))) if java else None
+
+
+def _files_under(paths):
+    for root in paths:
+        for folder, _, names in os.walk(root):
+            for name in names:
+                yield os.path.join(folder, name)
+
+
+def eviction_method():
+    """How the page cache can be emptied here: "drop_caches" (root), "fadvise" or None"""
+    if not sys.platform.startswith("linux"):
+        return None
+    if os.access("/proc/sys/vm/drop_caches", os.W_OK):
+        return "drop_caches"
+    return "fadvise" if hasattr(os, "posix_fadvise") else None
+
+
+def evict_page_cache(paths):
+    """Push the server's and Java's files out of the page cache"""
+    method = eviction_method()
+    if method is None:
+        return
+    os.sync()
+    if method == "drop_caches":
+        with open("/proc/sys/vm/drop_caches", "w") as f:
+            f.write("1")
+        return
+    for file in _files_under(paths):
+        try:
+            fd = os.open(file, os.O_RDONLY)
+        except OSError:
+            continue
+        try:
+            os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_DONTNEED)
+        except OSError:
+            pass
+        finally:
+            os.close(fd)
+
+
+def warm_page_cache(paths):
+    """Read every file once so the boot finds them in memory"""
+    for file in _files_under(paths):
+        try:
+            with open(file, "rb") as f:
+                while f.read(1024 * 1024):
+                    pass
+        except OSError:
+            pass
+
+
+# -------------------- One boot --------------------
+
+def query_mspt(path, query=None):
+    """(milliseconds per tick, the command that worked) - (None, None) if none did"""
+    for command, pattern in MSPT_QUERIES:
+        if query and command != query:
+            continue
+        try:
+            reply = _COLOR_CODE.sub("", send_command(path, command))
+        except (OSError, RuntimeError):
+            continue
+        match = pattern.search(reply)
+        if match:
+            return float(match.group(1).replace(",", ".")), command
+    return None, None
+
+
+def run_workload(path, radius, seconds):
+    """Force-load a (2*radius+1)² chunk square around 0,0 and sample MSPT meanwhile"""
+    query = query_mspt(path)[1]
+    low, high = -radius * 16, radius * 16 + 15
+    step = FORCELOAD_TILE * 16
+    for x in range(low, high + 1, step):
+        for z in range(low, high + 1, step):
+            send_command(path, f"forceload add {x} {z} {min(x + step - 1, high)} {min(z + step - 1, high)}")
+
+    samples = []
+    end = time.time() + seconds
+    while time.time() < end:
+        time.sleep(MSPT_INTERVAL)
+        if query:
+            value, _ = query_mspt(path, query)
+            if value is not None:
+                samples.append(value)
+    return samples, query
+
+
+def stop_process(process, path):
+    """Clean stop over stdin (RCON as a fallback), kill after STOP_TIMEOUT"""
+    try:
+        process.stdin.write(b"stop\n")
+        process.stdin.flush()
+    except OSError:
+        try:
+            send_command(path, "stop")
+        except (OSError, RuntimeError):
+            pass
+    try:
+        process.wait(STOP_TIMEOUT)
+    except subprocess.TimeoutExpired:
+        process.kill()
+        process.wait()
+
+
+def boot_once(server, path, port, jvm_args, radius, workload_seconds):
+    """Boot from a fresh world, run the workload and stop - returns the measurements"""
+    reset_world(path)
+    command = launch_command(server, path, jvm_args)
+    launched_at = time.time()
+    marker = log_marker(path)
+    with open(os.path.join(path, "benchmark-console.log"), "ab") as console:
+        process = subprocess.Popen(command, cwd=path, stdin=subprocess.PIPE,
+                                   stdout=console, stderr=subprocess.STDOUT)
+    watch = BootWatch(None, launched_at)
+    watch.pid = process.pid
+    try:
+        result = wait_until_ready(path, port, launched_at, marker, watch, timeout=BOOT_TIMEOUT)
+        if not result["ready"]:
+            raise RuntimeError("exited during startup" if result.get("exited")
+                               else f"not ready after {result['seconds']:.0f}s")
+
+        measured = {"boot_seconds": round(result["seconds"], 3), "reported_seconds": result["reported"],
+                    "rss_bytes": psutil.Process(process.pid).memory_info().rss}
+        samples, query = run_workload(path, radius, workload_seconds)
+        measured.update(
+            mspt_median=round(median(samples), 2) if samples else None,
+            mspt_max=round(max(samples), 2) if samples else None,
+            mspt_source=query,
+            rss_after_workload_bytes=psutil.Process(process.pid).memory_info().rss,
+        )
+        return measured
+    finally:
+        if process.poll() is None:
+            stop_process(process, path)
+
+
+# -------------------- Report --------------------
+
+METRICS = ("boot_seconds", "rss_bytes", "mspt_median", "rss_after_workload_bytes")
+CSV_FIELDS = ("variant", "server", "type", "version", "profile", "cache", "run", "ok",
+              "boot_seconds", "reported_seconds", "rss_bytes", "mspt_median", "mspt_max",
+              "mspt_source", "rss_after_workload_bytes", "error")
+
+
+def summarize(boots):
+    """median / min / max / stdev of every metric per (variant, cache)"""
+    groups = {}
+    for boot in boots:
+        if boot["ok"]:
+            groups.setdefault((boot["variant"], boot["cache"]), []).append(boot)
+
+    summary = []
+    for (variant, cache), group in groups.items():
+        row = {"variant": variant, "cache": cache, "boots": len(group)}
+        for metric in METRICS:
+            values = [b[metric] for b in group if b.get(metric) is not None]
+            if values:
+                row[metric] = {"median": round(median(values), 3), "min": min(values), "max": max(values),
+                               "stdev": round(stdev(values), 3) if len(values) > 1 else 0.0}
+        summary.append(row)
+    return summary
+
+
+def write_report(report, folder):
+    """report.json and boots.csv in folder, returns their paths"""
+    json_path = os.path.join(folder, "report.json")
+    with open(json_path, "w") as f:
+        json.dump(report, f, indent=4)
+
+    csv_path = os.path.join(folder, "boots.csv")
+    with open(csv_path, "w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=CSV_FIELDS, extrasaction="ignore")
+        writer.writeheader()
+        writer.writerows(report["boots"])
+    return json_path, csv_path
+
+
+def _spread(stats, fmt):
+    if not stats:
+        return "-"
+    return f"{fmt(stats['median'])} ({fmt(stats['min'])}-{fmt(stats['max'])})"
+
+
+def print_summary(summary):
+    print(f"\n{'Variant':<28} {'cache':<6} {'boots':>5} {'boot s':>18} {'RSS':>10} {'MSPT':>18}")
+    for row in summary:
+        seconds = _spread(row.get("boot_seconds"), lambda v: f"{v:.1f}")
+        rss = format_bytes(row["rss_bytes"]["median"]) if row.get("rss_bytes") else "-"
+        mspt = _spread(row.get("mspt_median"), lambda v: f"{v:.1f}")
+        print(f"{row['variant']:<28} {row['cache']:<6} {row['boots']:>5} {seconds:>18} {rss:>10} {mspt:>18}")
+
+
+# -------------------- Running --------------------
+
+def run_benchmark(servers, seed, runs=3, profiles=None, caches=CACHE_STATES,
+                  radius=12, workload_seconds=60, output=BENCHMARK_DIR, keep=False):
+    """
+    Benchmark every server (name -> servers.json entry) with every JVM
+    profile. Variants are interleaved run by run so a slow minute on the
+    host doesn't land on one variant only. Returns the report dict.
+    """
+    for profile in profiles or ():
+        if profile != "auto" and profile not in PROFILES:
+            raise ValueError(f"Unknown JVM profile: {profile}")
+
+    folder = os.path.join(output, time.strftime("%Y%m%d-%H%M%S"))
+    os.makedirs(folder)
+    java_home = _java_home()
+
+    variants = []
+    for name, server in servers.items():
+        for profile in profiles or [server.get("jvm_profile", "auto")]:
+            label = f"{name}:{profile}" if profiles and len(profiles) > 1 else name
+            path = os.path.abspath(os.path.join(folder, label.replace(":", "-")))
+            print(f"📦 Copying '{name}' for {label}...")
+            port = provision(name, server, path, seed)
+            used, jvm_args = build_jvm_args(dict(server, jvm_profile=profile))
+            variants.append({"variant": label, "server": name, "type": server.get("type", "vanilla"),
+                             "version": server.get("version"), "profile": used,
+                             "path": path, "port": port, "jvm_args": jvm_args})
+
+    evicted = eviction_method()
+    if "cold" in caches and evicted is None:
+        print("⚠ This OS can't empty the page cache - cold boots skipped")
+        caches = [c for c in caches if c != "cold"]
+
+    boots = []
+    for run in range(1, runs + 1):
+        for variant in variants:
+            for cache in caches:
+                cached_paths = [variant["path"]] + ([java_home] if java_home else [])
+                if cache == "cold":
+                    evict_page_cache(cached_paths)
+                else:
+                    warm_page_cache(cached_paths)
+
+                print(f"⏳ Run {run}/{runs} - {variant['variant']} ({cache} cache)...")
+                boot = {key: variant[key] for key in ("variant", "server", "type", "version", "profile")}
+                boot.update(cache=cache, run=run)
+                try:
+                    server = servers[variant["server"]]
+                    boot.update(boot_once(server, variant["path"], variant["port"],
+                                          variant["jvm_args"], radius, workload_seconds), ok=True)
+                    mspt = f", MSPT {boot['mspt_median']:.1f}" if boot["mspt_median"] is not None else ""
+                    print(f"✔ Ready after {boot['boot_seconds']:.1f}s, {format_bytes(boot['rss_bytes'])} RSS{mspt}")
+                except Exception as e:
+                    boot.update(ok=False, error=str(e))
+                    print(f"❌ {e}")
+                boots.append(boot)
+
+    report = {
+        "created": time.time(),
+        "seed": seed,
+        "runs": runs,
+        "workload": {"forceload_radius_chunks": radius, "seconds": workload_seconds},
+        "page_cache_eviction": evicted,
+        "host": {"cpus": os.cpu_count(), "memory_bytes": psutil.virtual_memory().total,
+                 "platform": sys.platform},
+        "variants": [{k: v for k, v in variant.items() if k not in ("path", "port")} for variant in variants],
+        "boots": boots,
+        "summary": summarize(boots),
+    }
+    json_path, csv_path = write_report(report, folder)
+
+    if not keep:
+        for variant in variants:
+            shutil.rmtree(variant["path"], ignore_errors=True)
+
+    print_summary(report["summary"])
+    print(f"\n✔ Report: {json_path}\n✔ Boots: {csv_path}")
+    return report
@@ -0,0 +1,216 @@
+"""
+Shared Build Cache for PyCraftHub
+Paperclip (Paper/Purpur) and the Vanilla bundler unpack and patch the
+server into cache/, versions/ and libraries/ on first boot. Doing that once
+per build and hardlinking the result into every server saves the CPU time
+and the disk space of repeating it for each one.
+
+Builds live in <storage root>/.builds/<key>/ so hardlinks stay on one
+volume (a copy is made when they can't). Files inside the shared folders
+are made read-only: a server that wanted to rewrite one would otherwise
+change it for every server on that build.
+"""
+import os
+import stat
+import shutil
+import zipfile
+import subprocess
+
+from core.fast_copy import sync_tree
+from core.storage import get_roots
+from utils.helpers import remove_readonly
+
+BUILDS_DIR = ".builds"
+READY_MARKER = ".ready"
+
+# What a patched Paperclip/bundler build leaves behind that servers can share
+PATCH_OUTPUTS = ("server.jar", "cache", "versions", "libraries")
+
+PATCH_TIMEOUT = 600
+
+
+def cache_root(server_path):
+    """
+    Storage root a folder lives under. Staging folders (imports, refetches)
+    sit deeper than a server does, so walk up to the registered root.
+    """
+    path = os.path.abspath(server_path)
+    roots = sorted((os.path.abspath(p) for p in get_roots().values()), key=len, reverse=True)
+    for root in roots:
+        if path.startswith(root.rstrip(os.sep) + os.sep):
+            return root
+    return os.path.dirname(path)
+
+
+def build_path(server_path, key):
+    """Cache folder for a build, on the same root as the server"""
+    return os.path.join(cache_root(server_path), BUILDS_DIR, key)
+
+
+def is_ready(build):
+    return os.path.exists(os.path.join(build, READY_MARKER))
+
+
+def link_build(build, server_path):
+    """Hardlink a finished build into a server folder (copies across volumes)"""
+    stats = sync_tree(build, server_path, link=True, delete_extra=False,
+                      skip_names=(READY_MARKER,), quiet=True)
+    return stats
+
+
+def link_cached_build(key, server_path):
+    """Link a build into the server if it is already cached, returns True if it was"""
+    build = build_path(server_path, key)
+    if not is_ready(build):
+        return False
+    link_build(build, server_path)
+    return True
+
+
+def _protect(build):
+    """Make files in the shared sub folders read-only (top-level files stay editable)"""
+    for entry in os.listdir(build):
+        sub = os.path.join(build, entry)
+        if not os.path.isdir(sub):
+            continue
+        for dirpath, _, files in os.walk(sub):
+            for name in files:
+                path = os.path.join(dirpath, name)
+                mode = os.stat(path).st_mode
+                os.chmod(path, mode & ~(stat.S_IWUSR | stat.S_IWGRP | stat.S_IWOTH))
+
+
+def create_build(server_path, key, populate, keep=None):
+    """
+    Build once into the shared cache and link the result into the server.
+
+    Args:
+        server_path: Server that needs the build
+        key: Cache key (e.g. paper-1.21.4-231)
+        populate: Function filling a fresh folder with the build
+        keep: Only keep these top-level names from what populate produced
+
+    Returns the build folder.
+    """
+    build = build_path(server_path, key)
+    if is_ready(build):
+        link_build(build, server_path)
+        return build
+
+    tmp = f"{build}.tmp-{os.getpid()}"
+    if os.path.exists(tmp):
+        shutil.rmtree(tmp, onerror=remove_readonly)
+    os.makedirs(tmp)
+
+    try:
+        populate(tmp)
+        if keep is not None:
+            for entry in os.listdir(tmp):
+                if entry not in keep:
+                    path = os.path.join(tmp, entry)
+                    if os.path.isdir(path):
+                        shutil.rmtree(path, onerror=remove_readonly)
+                    else:
+                        os.remove(path)
+        _protect(tmp)
+        open(os.path.join(tmp, READY_MARKER), "w").close()
+
+        try:
+            os.rename(tmp, build)
+        except OSError:
+            # Someone else finished the same build first - use theirs
+            if not is_ready(build):
+                raise
+    finally:
+        if os.path.exists(tmp):
+            shutil.rmtree(tmp, onerror=remove_readonly)
+
+    link_build(build, server_path)
+    return build
+
+
+# -------------------- Paperclip / bundler --------------------
+
+def _is_bundled(jar_path):
+    """True for Paperclip jars and the 1.18+ Vanilla bundler"""
+    try:
+        with zipfile.ZipFile(jar_path) as z:
+            names = set(z.namelist())
+    except (OSError, zipfile.BadZipFile):
+        return False
+    return "META-INF/versions.list" in names or "META-INF/patches.list" in names
+
+
+def patch_server_jar(jar_path, key, server_type):
+    """
+    Run the patch/unpack step once per build in the shared cache, then
+    hardlink server.jar, cache/, versions/ and libraries/ into the server.
+    Any failure leaves the server as it was - it will patch on first boot.
+    """
+    server_path = os.path.dirname(os.path.abspath(jar_path))
+
+    def populate(tmp):
+        target = os.path.join(tmp, "server.jar")
+        try:
+            os.link(jar_path, target)
+        except OSError:
+            shutil.copy2(jar_path, target)
+
+        if server_type in ("paper", "purpur"):
+            # Paperclip patches and exits without starting the server
+            cmd = ["java", "-Dpaperclip.patchonly=true", "-jar", "server.jar"]
+        elif _is_bundled(target):
+            # The bundler unpacks first, then Main just prints its options
+            cmd = ["java", "-jar", "server.jar", "--help"]
+        else:
+            return
+
+        result = subprocess.run(cmd, cwd=tmp, capture_output=True, text=True, timeout=PATCH_TIMEOUT)
+        if result.returncode != 0:
+            raise RuntimeError(result.stderr.strip()[-500:] or "patch step failed")
+
+    try:
+        print("🔧 Preparing shared build (patching once for every server on it)...")
+        create_build(server_path, key, populate, keep=PATCH_OUTPUTS)
+        print("✔ Build linked from shared cache")
+    except (OSError, RuntimeError, subprocess.SubprocessError) as e:
+        print(f"⚠ Shared build unavailable, server will patch on first boot: {e}")
+
+
+def _in_use(build, mirrored):
+    """True while any file of the build is still linked from a server"""
+    for dirpath, _, files in os.walk(build):
+        for name in files:
+            try:
+                st = os.stat(os.path.join(dirpath, name))
+            except OSError:
+                continue
+            links = st.st_nlink - (1 if (st.st_dev, st.st_ino) in mirrored else 0)
+            if links > 1:
+                return True
+    return False
+
+
+def prune_unused_builds(roots, dry_run=False, mirrored=()):
+    """
+    Remove cached builds no server links to any more (none of their files
+    has another link - Forge installs have no server.jar to go by).
+    mirrored holds the (st_dev, st_ino) of files the LAN mirror store
+    links to - that link doesn't count as a server.
+    Returns (builds removed, bytes freed).
+    """
+    removed, freed = 0, 0
+    for root in roots:
+        cache = os.path.join(root, BUILDS_DIR)
+        if not os.path.isdir(cache):
+            continue
+        for key in os.listdir(cache):
+            build = os.path.join(cache, key)
+            if not is_ready(build) or _in_use(build, mirrored):
+                continue
+            for dirpath, _, files in os.walk(build):
+                freed += sum(os.path.getsize(os.path.join(dirpath, f)) for f in files)
+            if not dry_run:
+                shutil.rmtree(build, onerror=remove_readonly)
+            removed += 1
+    return removed, freed
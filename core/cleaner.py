@@ -0,0 +1,335 @@
+"""
+Log & Cache Cleaner for PyCraftHub
+Applies retention policies to logs/ and crash-reports/ of every server,
+compresses old .log files in the background and clears rebuildable caches.
+
+Policies come from settings["cleanup_policy"] and can be overridden per
+server with a "cleanup_policy" block in its servers.json entry.
+"""
+import os
+import gzip
+import time
+import shutil
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from core.server_manager import load_data, is_server_running, get_server_pid
+from core.storage import get_server_path, get_roots
+from core.build_cache import prune_unused_builds
+from core.artifact_mirror import store_inodes, prune_store
+from core.jobs import run_in_background, current_job
+from settings_module import load_settings, DEFAULT_SETTINGS
+from utils.helpers import format_bytes, lower_thread_io_priority, remove_readonly
+from utils.lazy import lazy_import
+
+psutil = lazy_import("psutil")
+
+# Written by a running server - never deleted or compressed while it is up
+LIVE_LOGS = {"latest.log", "debug.log"}
+
+# folder -> file suffixes covered by the retention policy
+RETENTION_DIRS = {
+    "logs": (".log", ".log.gz"),
+    "crash-reports": (".txt",),
+}
+
+# Rebuilt by the server on next boot (only cleared while it is stopped)
+CACHE_DIRS = (
+    "cache",
+    os.path.join("plugins", ".paper-remapped"),
+    os.path.join(".fabric", "processedMods"),
+    os.path.join(".fabric", "remappedJars"),
+)
+
+# A file touched this recently might still be in use by a server we can't see into
+RECENT_WRITE_GRACE = 300
+
+# Background compression progress, shown by the cleaner menu
+compression_state = {"pending": 0, "done": 0, "saved": 0, "errors": 0}
+_state_lock = threading.Lock()
+
+
+def get_policy(server):
+    """Global cleanup policy with this server's overrides applied"""
+    policy = dict(DEFAULT_SETTINGS["cleanup_policy"])
+    policy.update(load_settings().get("cleanup_policy", {}))
+    policy.update(server.get("cleanup_policy", {}))
+    return policy
+
+
+def _open_files(server_name):
+    """
+    Absolute paths a running server's JVM has open.
+    Returns None when its files can't be inspected.
+    """
+    pid = get_server_pid(server_name)
+    if not pid:
+        return None
+
+    try:
+        proc = psutil.Process(pid)
+        paths = {os.path.normcase(f.path) for f in proc.open_files()}
+        for child in proc.children(recursive=True):
+            paths.update(os.path.normcase(f.path) for f in child.open_files())
+        return paths
+    except (psutil.NoSuchProcess, psutil.AccessDenied):
+        return None
+
+
+def _dir_size(path):
+    total = 0
+    try:
+        with os.scandir(path) as it:
+            for entry in it:
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        total += _dir_size(entry.path)
+                    else:
+                        total += entry.stat(follow_symlinks=False).st_size
+                except OSError:
+                    continue
+    except OSError:
+        pass
+    return total
+
+
+def _scan_folder(folder, suffixes):
+    """List (entry_path, name, size, mtime) for policy-managed files, newest first"""
+    files = []
+    try:
+        with os.scandir(folder) as it:
+            for entry in it:
+                if not entry.is_file(follow_symlinks=False):
+                    continue
+                if not entry.name.endswith(suffixes):
+                    continue
+                st = entry.stat(follow_symlinks=False)
+                files.append((entry.path, entry.name, st.st_size, st.st_mtime))
+    except FileNotFoundError:
+        return []
+    files.sort(key=lambda f: f[3], reverse=True)
+    return files
+
+
+def _apply_retention(files, policy, now):
+    """Split files into (keep, delete) following keep_last / max age / max total size"""
+    keep_last = policy["keep_last_logs"]
+    max_age = policy["max_log_age_days"] * 86400
+    max_total = policy["max_log_total_mb"] * 1024 * 1024
+
+    keep, delete = [], []
+    total = 0
+    for i, f in enumerate(files):
+        protected = i < keep_last
+        too_old = max_age and now - f[3] > max_age
+        too_big = max_total and total + f[2] > max_total
+        if not protected and (too_old or too_big):
+            delete.append(f)
+        else:
+            keep.append(f)
+            total += f[2]
+    return keep, delete
+
+
+def _compress_log(path):
+    """gzip one log file next to itself, keeping its mtime"""
+    try:
+        st = os.stat(path)
+        target = path + ".gz"
+        with open(path, "rb") as src, gzip.open(target + ".tmp", "wb", compresslevel=6) as dst:
+            shutil.copyfileobj(src, dst, 1024 * 1024)
+        os.replace(target + ".tmp", target)
+        os.utime(target, (st.st_atime, st.st_mtime))
+        saved = st.st_size - os.path.getsize(target)
+        os.remove(path)
+        with _state_lock:
+            compression_state["done"] += 1
+            compression_state["saved"] += saved
+    except Exception:
+        with _state_lock:
+            compression_state["errors"] += 1
+        try:
+            os.remove(path + ".gz.tmp")
+        except OSError:
+            pass
+
+
+def _compress_logs(paths, left):
+    """Job compressing one server's old logs at idle I/O priority"""
+    lower_thread_io_priority()
+    job = current_job()
+    job.update(total_files=len(paths))
+    for i, path in enumerate(paths):
+        job.check_cancelled()
+        _compress_log(path)
+        with _state_lock:
+            compression_state["pending"] -= 1
+            left[0] -= 1
+        job.update(done_files=i + 1)
+
+
+def _queue_compression(server_name, paths):
+    """
+    Start a compression job. Its files count as pending until the job
+    ends - however it ends, even cancelled before it ever ran.
+    """
+    left = [len(paths)]
+    with _state_lock:
+        compression_state["pending"] += len(paths)
+
+    def settle(_future):
+        with _state_lock:
+            compression_state["pending"] -= left[0]
+            left[0] = 0
+
+    job = run_in_background(f"Compress logs ({server_name})", _compress_logs,
+                            paths, left, job_type="compress")
+    job.future.add_done_callback(settle)
+
+
+def _is_shared(path):
+    """True if anything in the folder is hardlinked elsewhere (a shared build)"""
+    for dirpath, _, files in os.walk(path):
+        for name in files:
+            try:
+                if os.stat(os.path.join(dirpath, name)).st_nlink > 1:
+                    return True
+            except OSError:
+                continue
+    return False
+
+
+def clean_server(server_name, server, dry_run=False):
+    """
+    Apply the cleanup policy to one server.
+
+    Returns a report dict: deleted file count, bytes reclaimed,
+    caches cleared, logs queued for compression and anything skipped.
+    """
+    path = get_server_path(server_name)
+    policy = get_policy(server)
+    now = time.time()
+
+    report = {
+        "server": server_name,
+        "deleted": 0,
+        "reclaimed": 0,
+        "caches": 0,
+        "compressing": 0,
+        "skipped": [],
+    }
+
+    if not os.path.isdir(path):
+        report["skipped"].append("server folder missing")
+        return report
+
+    running = is_server_running(server_name)
+    open_files = _open_files(server_name) if running else set()
+
+    def in_use(file_path, name, mtime):
+        if running and name in LIVE_LOGS:
+            return True
+        if open_files is None:
+            # Can't see inside the JVM - stay away from anything fresh
+            return now - mtime < RECENT_WRITE_GRACE
+        return os.path.normcase(os.path.abspath(file_path)) in open_files
+
+    # ---------------- LOG RETENTION ----------------
+    for folder, suffixes in RETENTION_DIRS.items():
+        files = [
+            f for f in _scan_folder(os.path.join(path, folder), suffixes)
+            if not in_use(f[0], f[1], f[3])
+        ]
+        keep, delete = _apply_retention(files, policy, now)
+
+        for file_path, name, size, _ in delete:
+            if not dry_run:
+                try:
+                    os.remove(file_path)
+                except OSError:
+                    report["skipped"].append(name)
+                    continue
+            report["deleted"] += 1
+            report["reclaimed"] += size
+
+        # ---------------- BACKGROUND COMPRESSION ----------------
+        if folder == "logs" and policy["compress_logs"] and not dry_run:
+            to_compress = [
+                file_path for file_path, name, _, _ in keep
+                if name.endswith(".log") and name not in LIVE_LOGS
+            ]
+            if to_compress:
+                _queue_compression(server_name, to_compress)
+                report["compressing"] += len(to_compress)
+
+    # ---------------- CACHES ----------------
+    if policy["clear_caches"]:
+        if running:
+            report["skipped"].append("caches (server running)")
+        else:
+            for cache in CACHE_DIRS:
+                cache_path = os.path.join(path, cache)
+                if not os.path.isdir(cache_path):
+                    continue
+                if _is_shared(cache_path):
+                    # Linked from a shared build - clearing it frees nothing, and
+                    # making its read-only files writable would do it for every server
+                    report["skipped"].append(f"{cache} (shared build)")
+                    continue
+                size = _dir_size(cache_path)
+                if not dry_run:
+                    try:
+                        shutil.rmtree(cache_path, onerror=remove_readonly)
+                    except OSError:
+                        report["skipped"].append(cache)
+                        continue
+                report["caches"] += 1
+                report["reclaimed"] += size
+
+    return report
+
+
+def clean_all_servers(dry_run=False, workers=16):
+    """Clean every registered server concurrently, returns a list of reports"""
+    data = load_data()
+    if not data:
+        return []
+
+    with ThreadPoolExecutor(max_workers=min(workers, len(data))) as pool:
+        futures = [
+            pool.submit(clean_server, name, server, dry_run)
+            for name, server in data.items()
+        ]
+        reports = [f.result() for f in futures]
+
+    # LAN mirror artifacts no peer asked for in a while - first, so the builds
+    # they were keeping go in the same run
+    removed, freed = prune_store(load_settings().get("mirror_keep_days", 30), dry_run)
+    if removed:
+        reports.append({"server": "(LAN mirror)", "deleted": removed, "reclaimed": freed,
+                        "caches": 0, "compressing": 0, "skipped": []})
+
+    # Shared Paper/Vanilla builds no server uses any more
+    removed, freed = prune_unused_builds(get_roots().values(), dry_run, mirrored=store_inodes())
+    if removed:
+        reports.append({"server": "(shared builds)", "deleted": removed, "reclaimed": freed,
+                        "caches": 0, "compressing": 0, "skipped": []})
+    return reports
+
+
+def print_cleanup_report(reports):
+    """Print per-server reclaimed space"""
+    total = 0
+    print(f"\n{'Server':<24} {'Deleted':>8} {'Caches':>7} {'Reclaimed':>12} {'Compressing':>12}")
+    print("─" * 67)
+    for r in reports:
+        total += r["reclaimed"]
+        print(f"{r['server']:<24} {r['deleted']:>8} {r['caches']:>7} "
+              f"{format_bytes(r['reclaimed']):>12} {r['compressing']:>12}")
+        for skipped in r["skipped"]:
+            print(f"  ⚠ skipped {skipped}")
+    print("─" * 67)
+    print(f"✔ Reclaimed {format_bytes(total)} across {len(reports)} server(s)")
+
+    if compression_state["pending"]:
+        print(f"🗜 {compression_state['pending']} log file(s) compressing in the background")
@@ -0,0 +1,305 @@
+"""
+Disk Usage Accounting for PyCraftHub
+Tracks how much space every server takes (world, logs, plugins, backups),
+how fast it grows, and warns before the volume holding it fills up.
+
+Every directory's own size is cached together with its mtime, so a refresh
+is one stat() per directory: only folders whose entries changed are listed
+again. Files rewritten in place (region files growing) don't touch their
+folder's mtime, so cached folders are also re-listed once they get old.
+"""
+import os
+import json
+import time
+import threading
+
+from settings_module import load_settings
+from core.storage import get_server_path
+from core.jobs import run_in_background
+from utils.lazy import lazy_import
+
+psutil = lazy_import("psutil")
+
+CACHE_FILE = os.path.join("data", "disk_usage_cache.json")
+HISTORY_FILE = os.path.join("data", "disk_usage_history.json")
+
+REVALIDATE_AGE = 600          # re-list an unchanged folder after 10 minutes
+HISTORY_INTERVAL = 3600       # one size sample per server per hour
+HISTORY_KEEP = 24 * 30        # 30 days of hourly samples
+GROWTH_WINDOW = 7 * 86400     # growth rate is fitted over the last week
+
+CATEGORIES = ("world", "logs", "plugins", "backups", "other")
+
+# top-level folder -> category (worlds are found by their level.dat)
+FOLDER_CATEGORIES = {
+    "logs": "logs",
+    "crash-reports": "logs",
+    "plugins": "plugins",
+    "mods": "plugins",
+    "backups": "backups",
+}
+
+_lock = threading.RLock()
+_cache = None    # server -> {relative dir: [mtime_ns, own_bytes, [subdirs], checked, has_level_dat]}
+_history = None  # server -> [[timestamp, total_bytes], ...]
+_usage = {}      # server -> last computed usage dict
+
+
+# -------------------- Persistence --------------------
+
+def _load_json(path):
+    try:
+        with open(path, "r") as f:
+            return json.load(f)
+    except:
+        return {}
+
+
+def _save_json(path, value):
+    os.makedirs("data", exist_ok=True)
+    tmp = path + ".tmp"
+    with open(tmp, "w") as f:
+        json.dump(value, f, separators=(",", ":"))
+    os.replace(tmp, path)
+
+
+def _ensure_loaded():
+    global _cache, _history
+    if _cache is None:
+        _cache = _load_json(CACHE_FILE)
+        _history = _load_json(HISTORY_FILE)
+
+
+# -------------------- Scanning --------------------
+
+def _list_dir(path, st, now):
+    """List one folder: size of the files directly inside it and its subfolders"""
+    own, subdirs, has_level = 0, [], False
+    with os.scandir(path) as it:
+        for e in it:
+            try:
+                if e.is_dir(follow_symlinks=False):
+                    subdirs.append(e.name)
+                else:
+                    own += e.stat(follow_symlinks=False).st_size
+                    if e.name == "level.dat":
+                        has_level = True
+            except OSError:
+                continue
+    return [st.st_mtime_ns, own, subdirs, now, has_level]
+
+
+def _entry(root, rel, old, new, now):
+    """Cached listing of root/rel, re-listed only if the folder changed"""
+    path = os.path.join(root, rel) if rel else root
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+
+    entry = old.get(rel)
+    if entry is None or entry[0] != st.st_mtime_ns or now - entry[3] > REVALIDATE_AGE:
+        try:
+            entry = _list_dir(path, st, now)
+        except OSError:
+            return None
+    new[rel] = entry
+    return entry
+
+
+def _tree_size(root, rel, old, new, now):
+    """Total size of root/rel"""
+    entry = _entry(root, rel, old, new, now)
+    if entry is None:
+        return 0
+    total = entry[1]
+    for name in entry[2]:
+        total += _tree_size(root, os.path.join(rel, name), old, new, now)
+    return total
+
+
+def _export_size(server_name):
+    """Packages made by the exporter count as this server's backups"""
+    total = 0
+    try:
+        with os.scandir("exports") as it:
+            for e in it:
+                if e.name.startswith(f"{server_name}.pchub."):
+                    total += e.stat().st_size
+    except OSError:
+        pass
+    return total
+
+
+def scan_server(server_name, now=None):
+    """
+    Measure one server folder.
+
+    Returns a usage dict with the total and per-category sizes in bytes.
+    """
+    now = now or time.time()
+    root = get_server_path(server_name)
+
+    with _lock:
+        _ensure_loaded()
+        old = _cache.get(server_name, {})
+        new = {}
+
+        usage = {category: 0 for category in CATEGORIES}
+        top = _entry(root, "", old, new, now)
+        if top is not None:
+            usage["other"] += top[1]
+            for name in top[2]:
+                size = _tree_size(root, name, old, new, now)
+                # No entry when the folder vanished or can't be read - size 0
+                entry = new.get(name)
+                if name in FOLDER_CATEGORIES:
+                    category = FOLDER_CATEGORIES[name]
+                elif entry and entry[4]:
+                    category = "world"
+                else:
+                    category = "other"
+                usage[category] += size
+
+        usage["backups"] += _export_size(server_name)
+        usage["total"] = sum(usage[c] for c in CATEGORIES)
+        usage["scanned"] = now
+
+        # Only keep folders that still exist
+        _cache[server_name] = new
+        _usage[server_name] = usage
+        return usage
+
+
+def refresh_all(server_names=None):
+    """
+    Rescan every registered server (cheap after the first run),
+    record growth history and persist the cache.
+
+    Returns {server_name: usage}.
+    """
+    from core.server_manager import load_data
+
+    if server_names is None:
+        server_names = list((load_data() or {}).keys())
+
+    now = time.time()
+    with _lock:
+        _ensure_loaded()
+        result = {name: scan_server(name, now) for name in server_names}
+
+        # Forget servers that were deleted
+        for name in list(_cache):
+            if name not in result:
+                del _cache[name]
+                _usage.pop(name, None)
+        for name in list(_history):
+            if name not in result:
+                del _history[name]
+
+        history_changed = False
+        for name, usage in result.items():
+            points = _history.setdefault(name, [])
+            if not points or now - points[-1][0] >= HISTORY_INTERVAL:
+                points.append([int(now), usage["total"]])
+                del points[:-HISTORY_KEEP]
+                history_changed = True
+
+        _save_json(CACHE_FILE, _cache)
+        if history_changed:
+            _save_json(HISTORY_FILE, _history)
+
+    return result
+
+
+def start_background_refresh():
+    """Warm the cache on startup so the first menu doesn't wait for a full scan"""
+    run_in_background("Disk usage scan", refresh_all, job_type="refresh")
+
+
+def get_usage(server_name):
+    """Last computed usage for a server, or None if it hasn't been scanned yet"""
+    with _lock:
+        return _usage.get(server_name)
+
+
+# -------------------- Growth & forecasting --------------------
+
+def growth_rate(server_name, now=None):
+    """
+    Growth in bytes per day, fitted over the last week of samples.
+    Returns None until there is at least an hour of history.
+    """
+    now = now or time.time()
+    with _lock:
+        _ensure_loaded()
+        points = [p for p in _history.get(server_name, []) if now - p[0] <= GROWTH_WINDOW]
+
+    if len(points) < 2 or points[-1][0] - points[0][0] < HISTORY_INTERVAL:
+        return None
+
+    # Least squares slope
+    n = len(points)
+    mean_t = sum(p[0] for p in points) / n
+    mean_s = sum(p[1] for p in points) / n
+    var = sum((p[0] - mean_t) ** 2 for p in points)
+    if not var:
+        return None
+    cov = sum((p[0] - mean_t) * (p[1] - mean_s) for p in points)
+    return cov / var * 86400
+
+
+def _mount_point(path):
+    path = os.path.abspath(path)
+    while not os.path.ismount(path):
+        parent = os.path.dirname(path)
+        if parent == path:
+            break
+        path = parent
+    return path
+
+
+def forecast_volumes(server_names=None):
+    """
+    Group servers by the volume they live on and estimate when it fills.
+
+    Returns a list of dicts: mount, free, total, percent, growth (bytes/day
+    for all its servers together), days_left (None when not growing) and warn.
+    """
+    from core.server_manager import load_data
+
+    settings = load_settings()
+    warn_days = settings.get("disk_warn_days", 14)
+    warn_percent = settings.get("disk_warn_percent", 90)
+
+    if server_names is None:
+        server_names = list((load_data() or {}).keys())
+
+    volumes = {}
+    for name in server_names:
+        path = get_server_path(name)
+        if not os.path.isdir(path):
+            continue
+        mount = _mount_point(path)
+        vol = volumes.setdefault(mount, {"mount": mount, "servers": [], "growth": 0.0})
+        vol["servers"].append(name)
+        rate = growth_rate(name)
+        if rate and rate > 0:
+            vol["growth"] += rate
+
+    forecasts = []
+    for mount, vol in volumes.items():
+        try:
+            disk = psutil.disk_usage(mount)
+        except OSError:
+            continue
+        days_left = disk.free / vol["growth"] if vol["growth"] > 0 else None
+        vol.update({
+            "free": disk.free,
+            "total": disk.total,
+            "percent": disk.percent,
+            "days_left": days_left,
+            "warn": disk.percent >= warn_percent or (days_left is not None and days_left <= warn_days),
+        })
+        forecasts.append(vol)
+    return forecasts
@@ -0,0 +1,271 @@
+"""
+Fast Copy Engine for PyCraftHub
+Mirrors a folder into another with a pool of worker threads.
+
+- Files whose size and mtime (or hash) already match are skipped,
+  so re-syncing a world only copies the regions that changed
+- Uses a reflink (FICLONE) or copy_file_range on Linux when the
+  filesystem supports it, plain buffered copy everywhere else
+- Optional hardlink mode for read-only content shared between servers
+"""
+import os
+import sys
+import time
+import stat
+import errno
+import shutil
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait
+
+from core.jobs import current_job
+from utils.helpers import format_bytes, format_eta, hash_file
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+FICLONE = 0x40049409
+
+# errnos meaning "this filesystem/kernel can't do that" rather than a real I/O error
+_UNSUPPORTED = {
+    errno.EXDEV, errno.EINVAL, errno.ENOSYS, errno.ENOTTY,
+    getattr(errno, "EOPNOTSUPP", errno.EINVAL), getattr(errno, "ENOTSUP", errno.EINVAL),
+}
+
+
+class _Capabilities:
+    """What worked so far for this source/destination pair"""
+
+    def __init__(self):
+        self.reflink = fcntl is not None and sys.platform.startswith("linux")
+        self.copy_file_range = hasattr(os, "copy_file_range")
+
+
+class SyncStats:
+    """Counters shared by the worker threads"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.total_bytes = 0
+        self.total_files = 0
+        self.done_bytes = 0
+        self.copied = 0
+        self.skipped = 0
+        self.deleted = 0
+        self.methods = {}
+        self.started = time.time()
+
+    def add(self, size, method):
+        with self.lock:
+            self.done_bytes += size
+            self.copied += 1
+            self.methods[method] = self.methods.get(method, 0) + 1
+
+    @property
+    def elapsed(self):
+        return time.time() - self.started
+
+    def line(self, label):
+        elapsed = max(self.elapsed, 0.001)
+        rate = self.done_bytes / elapsed
+        percent = (self.done_bytes / self.total_bytes * 100) if self.total_bytes else 100.0
+        remaining = self.total_bytes - self.done_bytes
+        eta = format_eta(remaining / rate) if rate > 0 else "--:--"
+        return (f"{label}: {percent:5.1f}% {self.copied}/{self.total_files} files "
+                f"{format_bytes(self.done_bytes)} @ {format_bytes(rate)}/s ETA {eta}")
+
+
+def _is_unchanged(src_stat, dst_path, verify, src_path):
+    """Decide whether dst already holds the same content as src"""
+    try:
+        dst_stat = os.stat(dst_path)
+    except FileNotFoundError:
+        return False
+
+    if dst_stat.st_size != src_stat.st_size:
+        return False
+    if dst_stat.st_mtime_ns == src_stat.st_mtime_ns:
+        return True
+    if verify == "hash" and hash_file(src_path) == hash_file(dst_path):
+        # Same content, just stamp the mtime so next time is a cheap stat
+        os.utime(dst_path, ns=(src_stat.st_atime_ns, src_stat.st_mtime_ns))
+        return True
+    return False
+
+
+def _copy_data(src, dst, size, caps):
+    """Copy one file's bytes with the fastest method available, returns the method used"""
+    with open(src, "rb") as fsrc, open(dst, "wb") as fdst:
+        if caps.reflink and size:
+            try:
+                fcntl.ioctl(fdst.fileno(), FICLONE, fsrc.fileno())
+                return "reflink"
+            except OSError as e:
+                if e.errno not in _UNSUPPORTED:
+                    raise
+                caps.reflink = False
+
+        if caps.copy_file_range and size:
+            try:
+                remaining = size
+                while remaining > 0:
+                    n = os.copy_file_range(fsrc.fileno(), fdst.fileno(), min(remaining, 1 << 30))
+                    if n == 0:
+                        break
+                    remaining -= n
+                return "copy_file_range"
+            except OSError as e:
+                if e.errno not in _UNSUPPORTED:
+                    raise
+                caps.copy_file_range = False
+                fsrc.seek(0)
+                fdst.seek(0)
+                fdst.truncate()
+
+        shutil.copyfileobj(fsrc, fdst, 1024 * 1024)
+        return "copy"
+
+
+def _sync_file(src, dst, src_stat, caps, link, stats):
+    # Never write into an existing file - it may be a hardlink shared with another server
+    try:
+        os.unlink(dst)
+    except FileNotFoundError:
+        pass
+    except PermissionError:
+        # Read-only shared build files can't be unlinked on Windows
+        os.chmod(dst, stat.S_IWRITE)
+        os.unlink(dst)
+
+    if link:
+        try:
+            os.link(src, dst)
+            stats.add(src_stat.st_size, "hardlink")
+            return
+        except OSError:
+            pass
+
+    method = _copy_data(src, dst, src_stat.st_size, caps)
+    shutil.copymode(src, dst)
+    os.utime(dst, ns=(src_stat.st_atime_ns, src_stat.st_mtime_ns))
+    stats.add(src_stat.st_size, method)
+
+
+def _scan(root):
+    """Walk a tree with os.scandir, returns ({rel_dir}, {rel_file: stat})"""
+    dirs, files = set(), {}
+    stack = [""]
+    while stack:
+        rel = stack.pop()
+        try:
+            with os.scandir(os.path.join(root, rel)) as it:
+                for entry in it:
+                    child = os.path.join(rel, entry.name)
+                    if entry.is_dir(follow_symlinks=False):
+                        dirs.add(child)
+                        stack.append(child)
+                    elif entry.is_file(follow_symlinks=False):
+                        files[child] = entry.stat(follow_symlinks=False)
+        except FileNotFoundError:
+            pass
+    return dirs, files
+
+
+def sync_tree(src, dst, workers=None, verify="mtime", link=False,
+              delete_extra=True, skip_names=(), label="Copying", quiet=False):
+    """
+    Make dst an exact copy of src, copying only what changed.
+
+    Args:
+        src: Source folder
+        dst: Destination folder (created if missing)
+        workers: Copy threads (defaults to 4 per CPU, max 32)
+        verify: "mtime" trusts size+mtime, "hash" also compares content
+                when only the mtime differs
+        link: Hardlink instead of copying (same volume, read-only content only)
+        delete_extra: Remove files in dst that no longer exist in src
+        skip_names: File names never copied (e.g. session.lock)
+        label: Progress line prefix
+        quiet: Don't print progress
+
+    Returns:
+        SyncStats with copied/skipped/deleted counts and bytes moved
+    """
+    workers = workers or min(32, (os.cpu_count() or 4) * 4)
+    stats = SyncStats()
+    caps = _Capabilities()
+
+    src_dirs, src_files = _scan(src)
+    os.makedirs(dst, exist_ok=True)
+    dst_dirs, dst_files = _scan(dst) if os.path.isdir(dst) else (set(), {})
+
+    for rel in sorted(src_dirs):
+        os.makedirs(os.path.join(dst, rel), exist_ok=True)
+
+    # ---------------- PLAN ----------------
+    todo = []
+    for rel, st in src_files.items():
+        if os.path.basename(rel) in skip_names:
+            continue
+        dst_path = os.path.join(dst, rel)
+        if rel in dst_files and verify == "mtime":
+            dst_stat = dst_files[rel]
+            if dst_stat.st_size == st.st_size and dst_stat.st_mtime_ns == st.st_mtime_ns:
+                stats.skipped += 1
+                continue
+        elif rel in dst_files and _is_unchanged(st, dst_path, verify, os.path.join(src, rel)):
+            stats.skipped += 1
+            continue
+        todo.append((rel, st))
+
+    # Biggest files first keeps every worker busy until the end
+    todo.sort(key=lambda item: item[1].st_size, reverse=True)
+    stats.total_files = len(todo)
+    stats.total_bytes = sum(st.st_size for _, st in todo)
+
+    # Progress and cancellation when running as a background job
+    job = current_job()
+    if job:
+        job.update(done_bytes=0, total_bytes=stats.total_bytes, done_files=0, total_files=stats.total_files)
+
+    # ---------------- COPY ----------------
+    if todo:
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            futures = [
+                pool.submit(_sync_file, os.path.join(src, rel), os.path.join(dst, rel), st, caps, link, stats)
+                for rel, st in todo
+            ]
+            pending = set(futures)
+            while pending:
+                _, pending = wait(pending, timeout=0.5)
+                if job:
+                    job.update(done_bytes=stats.done_bytes, done_files=stats.copied)
+                    if job.cancelled:
+                        for f in pending:
+                            f.cancel()
+                        job.check_cancelled()
+                if pending and not quiet:
+                    print(f"\r{stats.line(label)}   ", end="", flush=True)
+            for f in futures:
+                f.result()
+
+    # ---------------- MIRROR DELETIONS ----------------
+    if delete_extra:
+        for rel in dst_files:
+            if rel not in src_files and os.path.basename(rel) not in skip_names:
+                os.remove(os.path.join(dst, rel))
+                stats.deleted += 1
+        for rel in sorted(dst_dirs - src_dirs, key=len, reverse=True):
+            try:
+                os.rmdir(os.path.join(dst, rel))
+            except OSError:
+                pass
+
+    if not quiet:
+        print(f"\r{stats.line(label)}   ")
+        methods = ", ".join(f"{m}: {n}" for m, n in sorted(stats.methods.items()))
+        print(f"✔ {stats.copied} copied, {stats.skipped} unchanged, {stats.deleted} removed "
+              f"in {stats.elapsed:.1f}s" + (f" ({methods})" if methods else ""))
+
+    return stats
@@ -68,7 +68,13 @@ def main():
         sys.exit(1)
     
     server_name = sys.argv[1]
-    server_path = f"servers/{server_name}"
+    try:
+        # Launched as a script from core/ - the project root holds the modules
+        sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+        from core.storage import get_server_path
+        server_path = get_server_path(server_name)
+    except ImportError:
+        server_path = f"servers/{server_name}"
     running_file = os.path.join(server_path, "running.txt")
     
     # Startup banner
@@ -170,7 +176,7 @@ def main():
             
             # Disk I/O (if available)
             try:
-                disk = psutil.disk_usage('/')
+                disk = psutil.disk_usage(os.path.abspath(server_path))  # volume the server lives on
                 disk_percent = disk.percent
                 disk_free = format_bytes(disk.free)
                 disk_total = format_bytes(disk.total)
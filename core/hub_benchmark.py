@@ -0,0 +1,260 @@
+"""
+Hot Path Benchmarks for PyCraftHub
+Times PyCraftHub's own code against a synthetic fleet, so slowdowns that
+only show with many servers are caught before users notice them.
+
+    python -m core.hub_benchmark --sizes 10,100,1000
+    python -m core.hub_benchmark --save-baseline
+    python -m core.hub_benchmark --tolerance 0.2
+
+For every fleet size a throwaway folder gets a fake data/servers.json,
+server folders with plugins/mods and dummy processes standing in for
+running servers (a few tracked by the SEARCH: fallback, the rest by PID).
+Then these are timed, each `repeat` times after one warm-up:
+    status      is_server_running() for every server
+    load_data   reading servers.json
+    save_data   writing servers.json
+    mod_index   get_installed_files() for every server
+    dashboard   drawing every server card of the management menu
+
+Results go to benchmarks/hub/<time>.json. When benchmarks/hub/baseline.json
+exists the medians are compared with it and anything slower than
+baseline x (1 + tolerance) fails the run (exit code 1).
+"""
+import os
+import io
+import sys
+import json
+import time
+import shutil
+import argparse
+import tempfile
+import subprocess
+from contextlib import redirect_stdout
+from statistics import median
+
+RESULTS_DIR = os.path.join("benchmarks", "hub")
+BASELINE_NAME = "baseline.json"
+
+DEFAULT_SIZES = (10, 100, 1000)
+DEFAULT_REPEAT = 5
+DEFAULT_TOLERANCE = 0.25
+MODS_PER_SERVER = 25
+# Share of the fleet that is "running", and how many dummy processes at most
+RUNNING_SHARE = 0.2
+MAX_PROCESSES = 100
+# Share of the running servers tracked by SEARCH: instead of a PID
+SEARCH_SHARE = 0.05
+
+SERVER_TYPES = ("paper", "purpur", "fabric", "forge", "vanilla")
+
+
+# -------------------- Fake fleet --------------------
+
+def _dummy_process():
+    """A process that lives until its stdin is closed"""
+    return subprocess.Popen([sys.executable, "-S", "-c", "import sys; sys.stdin.read()"],
+                            stdin=subprocess.PIPE, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+
+def build_fleet(root, size, mods=MODS_PER_SERVER):
+    """
+    Fake registry and server folders for `size` servers under root.
+    Returns the dummy processes (stop them with stop_fleet).
+    """
+    data = {}
+    running = min(int(size * RUNNING_SHARE), MAX_PROCESSES)
+    searching = max(1, int(running * SEARCH_SHARE)) if running else 0
+    processes = []
+
+    for i in range(size):
+        name = f"bench-{i:04d}"
+        server_type = SERVER_TYPES[i % len(SERVER_TYPES)]
+        data[name] = {
+            "ram": "2G", "jar": "server.jar", "port": 25565 + i, "type": server_type,
+            "description": "", "render_distance": 10, "difficulty": "normal", "hardcore": False,
+            "version": "1.21.4", "online_mode": "true", "storage_root": "default",
+        }
+        path = os.path.join(root, "servers", name)
+        os.makedirs(os.path.join(path, "logs"))
+        with open(os.path.join(path, "server.jar"), "wb"):
+            pass
+        if server_type != "vanilla":
+            folder = os.path.join(path, "plugins" if server_type in ("paper", "purpur") else "mods")
+            os.makedirs(os.path.join(folder, "config"))
+            for m in range(mods):
+                with open(os.path.join(folder, f"Mod{m:03d}-1.0.{i}.jar"), "wb"):
+                    pass
+
+        if i < running:
+            with open(os.path.join(path, "running.txt"), "w") as f:
+                if i < searching:
+                    f.write(f"SEARCH:{name}:server.jar:{os.path.abspath(path)}")
+                else:
+                    process = _dummy_process()
+                    processes.append(process)
+                    f.write(str(process.pid))
+
+    os.makedirs(os.path.join(root, "data"))
+    with open(os.path.join(root, "data", "servers.json"), "w") as f:
+        json.dump(data, f, indent=4)
+    return processes
+
+
+def stop_fleet(processes):
+    for process in processes:
+        try:
+            process.stdin.close()
+        except OSError:
+            pass
+    for process in processes:
+        try:
+            process.wait(5)
+        except subprocess.TimeoutExpired:
+            process.kill()
+
+
+# -------------------- Timing --------------------
+
+def time_call(func, repeat):
+    """Seconds per call: one warm-up, then repeat timed runs"""
+    func()
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+    return {"median": median(times), "min": min(times), "max": max(times)}
+
+
+def hot_paths():
+    """{name: zero-argument callable} for the fleet in the current directory"""
+    from core.server_manager import load_data, save_data, is_server_running, get_installed_files, get_mods_folder
+    import main
+
+    data = load_data()
+
+    def status():
+        return [is_server_running(name) for name in data]
+
+    def mod_index():
+        return [get_installed_files(get_mods_folder(name, server) or "") for name, server in data.items()]
+
+    def dashboard():
+        with redirect_stdout(io.StringIO()):
+            for index, (name, info) in enumerate(data.items(), 1):
+                main.print_server_card(name, info, index)
+
+    return {
+        "status": status,
+        "load_data": load_data,
+        "save_data": lambda: save_data(data),
+        "mod_index": mod_index,
+        "dashboard": dashboard,
+    }
+
+
+def run_size(size, repeat, mods=MODS_PER_SERVER):
+    """Build a fleet of `size` in a temp folder and time every hot path on it"""
+    root = tempfile.mkdtemp(prefix="pycrafthub-bench-")
+    cwd = os.getcwd()
+    processes = []
+    try:
+        processes = build_fleet(root, size, mods)
+        # Every path in PyCraftHub is relative to the working directory
+        os.chdir(root)
+        return {name: time_call(func, repeat) for name, func in hot_paths().items()}
+    finally:
+        os.chdir(cwd)
+        stop_fleet(processes)
+        shutil.rmtree(root, ignore_errors=True)
+
+
+# -------------------- Baseline --------------------
+
+def compare(results, baseline, tolerance):
+    """Rows of (size, path, median, baseline median or None, regressed)"""
+    rows = []
+    for size, paths in results.items():
+        for name, timing in paths.items():
+            before = baseline.get(size, {}).get(name) if baseline else None
+            before = before["median"] if before else None
+            regressed = before is not None and timing["median"] > before * (1 + tolerance)
+            rows.append((size, name, timing["median"], before, regressed))
+    return rows
+
+
+def print_rows(rows):
+    print(f"\n{'Fleet':>6} {'Hot path':<12} {'median ms':>11} {'baseline ms':>12} {'change':>9}")
+    for size, name, now, before, regressed in rows:
+        if before is None:
+            change, mark = "", ""
+        else:
+            change = f"{(now / before - 1) * 100:+.0f}%" if before else ""
+            mark = "❌" if regressed else "✔"
+        baseline = f"{before * 1000:.2f}" if before is not None else "-"
+        print(f"{size:>6} {name:<12} {now * 1000:>11.2f} {baseline:>12} {change:>9} {mark}")
+
+
+def main():
+    parser = argparse.ArgumentParser(prog="python -m core.hub_benchmark")
+    parser.add_argument("--sizes", default=",".join(map(str, DEFAULT_SIZES)),
+                        help="Fleet sizes, comma separated")
+    parser.add_argument("--repeat", type=int, default=DEFAULT_REPEAT)
+    parser.add_argument("--mods", type=int, default=MODS_PER_SERVER, help="Mod/plugin JARs per server")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE,
+                        help="Allowed slowdown against the baseline (0.25 = 25%%)")
+    parser.add_argument("--save-baseline", action="store_true", help="Store this run as the baseline")
+    parser.add_argument("--output", default=RESULTS_DIR)
+    args = parser.parse_args()
+
+    try:
+        sizes = [int(s) for s in args.sizes.split(",") if s.strip()]
+    except ValueError:
+        parser.error("--sizes takes numbers, e.g. 10,100,1000")
+
+    output = os.path.abspath(args.output)
+    # The fleet runs in another working directory
+    sys.path.insert(0, os.getcwd())
+
+    results = {}
+    for size in sizes:
+        print(f"⏳ Fleet of {size} servers...")
+        results[str(size)] = run_size(size, args.repeat, args.mods)
+
+    os.makedirs(output, exist_ok=True)
+    report = {"created": time.time(), "repeat": args.repeat, "mods_per_server": args.mods,
+              "python": sys.version.split()[0], "platform": sys.platform, "results": results}
+    stamp = time.strftime("%Y%m%d-%H%M%S")
+    path = os.path.join(output, f"{stamp}.json")
+    count = 1
+    while os.path.exists(path):
+        count += 1
+        path = os.path.join(output, f"{stamp}-{count}.json")
+    with open(path, "w") as f:
+        json.dump(report, f, indent=4)
+
+    baseline_path = os.path.join(output, BASELINE_NAME)
+    baseline = None
+    if os.path.exists(baseline_path) and not args.save_baseline:
+        with open(baseline_path, "r") as f:
+            baseline = json.load(f)["results"]
+
+    rows = compare(results, baseline, args.tolerance)
+    print_rows(rows)
+    print(f"\n✔ Results: {path}")
+
+    if args.save_baseline:
+        shutil.copyfile(path, baseline_path)
+        print(f"✔ Saved as baseline: {baseline_path}")
+    elif baseline is None:
+        print("⚠ No baseline yet - run with --save-baseline to store one")
+
+    regressed = [row for row in rows if row[4]]
+    if regressed:
+        print(f"❌ {len(regressed)} hot path(s) more than {args.tolerance:.0%} slower than the baseline")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
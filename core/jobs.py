@@ -0,0 +1,376 @@
+"""
+Background Jobs for PyCraftHub
+Long operations (downloads, Forge installs, world imports, exports,
+migrations, deletions) run as jobs so the menu stays usable.
+
+- Every job has an ID, a status and progress (bytes, files, percent,
+  rate, ETA) that the Jobs menu shows
+- Each job type has its own concurrency limit (JOB_LIMITS, overridable
+  with settings["job_limits"]); extra jobs of that type wait in a queue
+- Cancelling a queued job drops it, a running job stops at its next
+  checkpoint() - downloads and copies check between chunks
+- Anything a job prints is captured into the job instead of interleaving
+  with prompts, and shown when the job is waited for or viewed
+"""
+import io
+import sys
+import time
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor, wait as wait_futures
+from urllib.parse import urlparse
+
+from utils.tracing import span, attach, current_span, count, annotate
+
+# Jobs of one type that may run at the same time
+JOB_LIMITS = {
+    "download": 4,
+    "create": 3,
+    "import": 1,
+    "export": 1,
+    "migrate": 1,
+    "delete": 1,
+    "compress": 2,
+    "refresh": 2,
+    "server": 8,
+    "task": 4,
+}
+
+# Finished jobs kept for the Jobs menu
+KEEP_FINISHED = 50
+
+_lock = threading.Lock()
+_router_lock = threading.Lock()
+_pools = {}
+_jobs = OrderedDict()
+_next_id = [1]
+_local = threading.local()
+
+
+class JobCancelled(Exception):
+    """Raised inside a job when it was cancelled"""
+
+
+# -------------------- Output capture --------------------
+
+class _ThreadRouter(io.TextIOBase):
+    """sys.stdout stand-in that sends each job thread's output to its own buffer"""
+
+    def __init__(self, console):
+        self.console = console
+        self.captures = {}
+
+    def write(self, text):
+        buf = self.captures.get(threading.get_ident())
+        if buf is not None:
+            buf.append(text)
+            return len(text)
+        return self.console.write(text)
+
+    def flush(self):
+        self.console.flush()
+
+    def isatty(self):
+        return self.console.isatty()
+
+    @property
+    def encoding(self):
+        return getattr(self.console, "encoding", "utf-8")
+
+
+def _router():
+    with _router_lock:
+        if not isinstance(sys.stdout, _ThreadRouter):
+            sys.stdout = _ThreadRouter(sys.stdout)
+        return sys.stdout
+
+
+# -------------------- Jobs --------------------
+
+class Job:
+    """One piece of background work, its progress and what it printed"""
+
+    def __init__(self, job_id, name, job_type):
+        self.id = job_id
+        self.name = name
+        self.type = job_type
+        self.output = []
+        self.future = None
+        self.created = time.time()
+        self.started = None
+        self.finished = None
+        self.done_bytes = 0
+        self.total_bytes = 0
+        self.done_files = 0
+        self.total_files = 0
+        # Who queued it (thread, and the job it ran in) and the thread running it
+        self.queued_by = None
+        self.parent = None
+        self.thread = None
+        self._cancel = threading.Event()
+
+    # ---------- state ----------
+
+    @property
+    def done(self):
+        return self.future.done()
+
+    @property
+    def cancelled(self):
+        return self._cancel.is_set()
+
+    @property
+    def error(self):
+        """Exception the job ended with (JobCancelled when cancelled), None otherwise"""
+        if not self.future.done():
+            return None
+        if self.future.cancelled():
+            return JobCancelled("cancelled")
+        return self.future.exception()
+
+    @property
+    def status(self):
+        if not self.future.done():
+            return "running" if self.started else "queued"
+        error = self.error
+        if isinstance(error, JobCancelled):
+            return "cancelled"
+        return "failed" if error else "done"
+
+    def result(self):
+        return self.future.result()
+
+    def cancel(self):
+        """Drop the job if queued, ask it to stop if running"""
+        self._cancel.set()
+        self.future.cancel()
+
+    def check_cancelled(self):
+        if self._cancel.is_set():
+            raise JobCancelled(f"{self.name} cancelled")
+
+    # ---------- progress ----------
+
+    def update(self, done_bytes=None, total_bytes=None, done_files=None, total_files=None, add_bytes=0):
+        if done_bytes is not None:
+            self.done_bytes = done_bytes
+        if total_bytes is not None:
+            self.total_bytes = total_bytes
+        if done_files is not None:
+            self.done_files = done_files
+        if total_files is not None:
+            self.total_files = total_files
+        self.done_bytes += add_bytes
+
+    @property
+    def elapsed(self):
+        if not self.started:
+            return 0.0
+        return (self.finished or time.time()) - self.started
+
+    @property
+    def percent(self):
+        """Progress by bytes, or by files when there is no byte total (None if unknown)"""
+        if self.total_bytes:
+            return min(100.0, self.done_bytes / self.total_bytes * 100)
+        if self.total_files:
+            return min(100.0, self.done_files / self.total_files * 100)
+        return None
+
+    @property
+    def rate(self):
+        """Bytes per second"""
+        elapsed = self.elapsed
+        return self.done_bytes / elapsed if elapsed > 0 else 0.0
+
+    @property
+    def eta(self):
+        """Seconds left (None if unknown)"""
+        if self.done or not self.total_bytes or self.rate <= 0:
+            return None
+        return max(0.0, (self.total_bytes - self.done_bytes) / self.rate)
+
+    # ---------- output ----------
+
+    def lines(self, last=None):
+        """Captured output as lines (progress bars collapsed to their last state)"""
+        lines = []
+        for line in "".join(self.output).split("\n"):
+            line = line.split("\r")[-1].rstrip()
+            if line:
+                lines.append(line)
+        return lines[-last:] if last else lines
+
+
+def _limit(job_type):
+    try:
+        from settings_module import load_settings
+        limits = load_settings().get("job_limits", {})
+    except Exception:
+        limits = {}
+    return max(1, int(limits.get(job_type) or JOB_LIMITS.get(job_type) or JOB_LIMITS["task"]))
+
+
+def _pool(job_type):
+    """Executor sized to the type's limit - its queue holds the jobs waiting for a slot"""
+    with _lock:
+        pool = _pools.get(job_type)
+        if pool is None:
+            pool = ThreadPoolExecutor(max_workers=_limit(job_type), thread_name_prefix=f"job-{job_type}")
+            _pools[job_type] = pool
+        return pool
+
+
+def _forget_old():
+    """Drop the oldest finished jobs beyond KEEP_FINISHED (call with _lock held)"""
+    finished = [j for j in _jobs.values() if j.future.done()]
+    for job in finished[:max(0, len(finished) - KEEP_FINISHED)]:
+        _jobs.pop(job.id, None)
+
+
+def run_in_background(name, func, *args, job_type="task", **kwargs):
+    """Queue func as a job of the given type, returns its Job"""
+    router = _router()
+    with _lock:
+        job = Job(_next_id[0], name, job_type)
+        _next_id[0] += 1
+    job.queued_by = threading.get_ident()
+    job.parent = current_job()
+    # Spans inside the job nest under whatever queued it
+    parent = current_span()
+
+    def run():
+        job.check_cancelled()
+        ident = threading.get_ident()
+        router.captures[ident] = job.output
+        _local.job = job
+        job.thread = ident
+        job.started = time.time()
+        try:
+            with attach(parent), span(f"job.{job_type}", job=name, queued=round(job.started - job.created, 3)):
+                return func(*args, **kwargs)
+        finally:
+            job.finished = time.time()
+            job.thread = None
+            _local.job = None
+            router.captures.pop(ident, None)
+
+    job.future = _pool(job_type).submit(run)
+    with _lock:
+        _jobs[job.id] = job
+        _forget_old()
+    return job
+
+
+def current_job():
+    """The Job running on this thread, None outside jobs"""
+    return getattr(_local, "job", None)
+
+
+@contextmanager
+def bind_job(job):
+    """
+    Run a helper thread's share of a job (e.g. from a pool the job owns)
+    as part of it: output, progress and cancellation go to the job.
+    """
+    if job is None:
+        yield
+        return
+    router = _router()
+    ident = threading.get_ident()
+    router.captures[ident] = job.output
+    _local.job = job
+    try:
+        yield
+    finally:
+        _local.job = None
+        router.captures.pop(ident, None)
+
+
+def checkpoint():
+    """Raise JobCancelled if the current job was cancelled (no-op outside jobs)"""
+    job = current_job()
+    if job:
+        job.check_cancelled()
+
+
+def copy_stream(response, f, chunk_size=64 * 1024, label=None):
+    """
+    Write a streamed requests response to f, reporting progress to the
+    current job and stopping when it is cancelled. Outside a job, prints
+    a progress line when a label is given. Returns bytes written.
+    """
+    job = current_job()
+    total = int(response.headers.get("content-length", 0) or 0)
+    if job:
+        job.update(total_bytes=job.total_bytes + total)
+
+    written = 0
+    for chunk in response.iter_content(chunk_size):
+        if job:
+            job.check_cancelled()
+            job.update(add_bytes=len(chunk))
+        f.write(chunk)
+        written += len(chunk)
+        if label and not job and total:
+            print(f"\r{label}: {written / total * 100:.1f}%", end="", flush=True)
+    if label and not job and total:
+        print()
+    count(bytes=written)
+    annotate(url_host=urlparse(getattr(response, "url", "") or "").hostname)
+    return written
+
+
+# -------------------- Registry --------------------
+
+def list_jobs(active_only=False):
+    """Known jobs, oldest first"""
+    with _lock:
+        jobs = list(_jobs.values())
+    if active_only:
+        jobs = [j for j in jobs if not j.done]
+    return jobs
+
+
+def get_job(job_id):
+    with _lock:
+        return _jobs.get(job_id)
+
+
+def cancel_job(job_id):
+    """Cancel a job by ID, returns False if there is no such job or it already ended"""
+    job = get_job(job_id)
+    if not job or job.done:
+        return False
+    job.cancel()
+    return True
+
+
+def clear_finished():
+    """Forget every job that has ended"""
+    with _lock:
+        for job_id in [j.id for j in _jobs.values() if j.future.done()]:
+            del _jobs[job_id]
+
+
+def wait_for(jobs, show_output=3):
+    """
+    Wait for jobs still running and report each one.
+    Returns the jobs that failed or were cancelled.
+    """
+    pending = [j for j in jobs if not j.done]
+    if pending:
+        print(f"⏳ Waiting for: {', '.join(j.name for j in pending)}")
+        wait_futures([j.future for j in pending])
+
+    failed = []
+    for job in jobs:
+        if job.error:
+            failed.append(job)
+            print(f"❌ {job.name}: {job.error}")
+        else:
+            print(f"✔ {job.name}")
+        for line in job.lines(show_output):
+            print(f"   {line}")
+    return failed
@@ -0,0 +1,229 @@
+"""
+JVM Profiles for PyCraftHub
+Picks garbage collector and tuning flags for each server instead of
+launching every one with a bare -Xms/-Xmx.
+
+Profiles:
+- aikar:  G1 with Aikar's flags, the safe choice for most servers
+- zgc:    generational ZGC for big heaps on Java 21+ (sub-millisecond pauses)
+- small:  G1 tuned for small heaps / few cores
+- none:   just -Xms/-Xmx, the old behaviour
+
+"auto" (the default) chooses from heap size, core count and Java version.
+A server can force a profile with "jvm_profile" in its servers.json entry,
+add its own flags with "jvm_args" and turn large pages on/off with "large_pages".
+"""
+import os
+import re
+import subprocess
+
+PROFILES = ("aikar", "zgc", "small", "none")
+
+# user_jvm_args.txt lines between these markers belong to PyCraftHub
+FORGE_BEGIN = "# >>> PyCraftHub JVM profile (set jvm_profile / jvm_args in servers.json) >>>"
+FORGE_END = "# <<< PyCraftHub JVM profile <<<"
+
+ZGC_MIN_HEAP_MB = 16 * 1024
+ZGC_MIN_CORES = 8
+SMALL_MAX_HEAP_MB = 3 * 1024
+
+_java_versions = {}
+
+
+def parse_ram(ram):
+    """'4G' / '4096M' -> megabytes"""
+    match = re.fullmatch(r"\s*(\d+(?:\.\d+)?)\s*([KMGT]?)B?\s*", str(ram).upper())
+    if not match:
+        raise ValueError(f"Invalid RAM value: {ram}")
+    value, unit = float(match.group(1)), match.group(2) or "M"
+    factor = {"K": 1 / 1024, "M": 1, "G": 1024, "T": 1024 * 1024}[unit]
+    return int(value * factor)
+
+
+def detect_java_version(java="java"):
+    """Major Java version (8, 17, 21...) or None if java can't be run"""
+    if java in _java_versions:
+        return _java_versions[java]
+
+    version = None
+    try:
+        out = subprocess.run(
+            [java, "-version"], capture_output=True, text=True, timeout=15
+        )
+        match = re.search(r'version "(\d+)(?:\.(\d+))?', out.stderr + out.stdout)
+        if match:
+            major = int(match.group(1))
+            # Java 8 and older report 1.x
+            version = int(match.group(2)) if major == 1 and match.group(2) else major
+    except (OSError, subprocess.SubprocessError):
+        pass
+
+    _java_versions[java] = version
+    return version
+
+
+def detect_huge_pages():
+    """
+    Huge page support on Linux.
+
+    Returns {"thp": "always"/"madvise"/"never"/None, "explicit_free_mb": int}
+    """
+    info = {"thp": None, "explicit_free_mb": 0}
+    try:
+        with open("/sys/kernel/mm/transparent_hugepage/enabled") as f:
+            match = re.search(r"\[(\w+)\]", f.read())
+            if match:
+                info["thp"] = match.group(1)
+    except OSError:
+        pass
+
+    try:
+        meminfo = {}
+        with open("/proc/meminfo") as f:
+            for line in f:
+                key, _, value = line.partition(":")
+                meminfo[key] = int(value.split()[0])
+        page_kb = meminfo.get("Hugepagesize", 0)
+        info["explicit_free_mb"] = meminfo.get("HugePages_Free", 0) * page_kb // 1024
+    except (OSError, ValueError, IndexError):
+        pass
+    return info
+
+
+def choose_profile(heap_mb, cores, java_version):
+    """The profile "auto" resolves to"""
+    if java_version and java_version < 8:
+        return "none"
+    if heap_mb <= SMALL_MAX_HEAP_MB or cores <= 2:
+        return "small"
+    if java_version and java_version >= 21 and heap_mb >= ZGC_MIN_HEAP_MB and cores >= ZGC_MIN_CORES:
+        return "zgc"
+    return "aikar"
+
+
+def _profile_flags(profile, heap_mb, java_version):
+    if profile == "aikar":
+        big = heap_mb >= 12 * 1024
+        flags = [
+            "-XX:+UseG1GC",
+            "-XX:+ParallelRefProcEnabled",
+            "-XX:MaxGCPauseMillis=200",
+            "-XX:+UnlockExperimentalVMOptions",
+            "-XX:+DisableExplicitGC",
+            "-XX:+AlwaysPreTouch",
+            f"-XX:G1NewSizePercent={40 if big else 30}",
+            f"-XX:G1MaxNewSizePercent={50 if big else 40}",
+            f"-XX:G1HeapRegionSize={16 if big else 8}M",
+            f"-XX:G1ReservePercent={15 if big else 20}",
+            "-XX:G1HeapWastePercent=5",
+            "-XX:G1MixedGCCountTarget=4",
+            f"-XX:InitiatingHeapOccupancyPercent={20 if big else 15}",
+            "-XX:G1MixedGCLiveThresholdPercent=90",
+            "-XX:G1RSetUpdatingPauseTimePercent=5",
+            "-XX:SurvivorRatio=32",
+            "-XX:+PerfDisableSharedMem",
+            "-XX:MaxTenuringThreshold=1",
+            "-Dusing.aikars.flags=https://mcflags.emc.gs",
+            "-Daikars.new.flags=true",
+        ]
+    elif profile == "zgc":
+        flags = ["-XX:+UseZGC"]
+        # Generational is the default from 23 and the switch is gone in 24
+        if java_version in (21, 22):
+            flags.append("-XX:+ZGenerational")
+        flags += ["-XX:+AlwaysPreTouch", "-XX:+DisableExplicitGC", "-XX:+PerfDisableSharedMem"]
+    elif profile == "small":
+        flags = [
+            "-XX:+UseG1GC",
+            "-XX:+ParallelRefProcEnabled",
+            "-XX:MaxGCPauseMillis=100",
+            "-XX:+UnlockExperimentalVMOptions",
+            "-XX:+DisableExplicitGC",
+            "-XX:G1NewSizePercent=20",
+            "-XX:G1MaxNewSizePercent=40",
+            "-XX:G1HeapRegionSize=4M",
+            "-XX:InitiatingHeapOccupancyPercent=35",
+            "-XX:SurvivorRatio=32",
+            "-XX:+PerfDisableSharedMem",
+            "-XX:MaxTenuringThreshold=1",
+        ]
+    else:
+        flags = []
+    return flags
+
+
+def _large_page_flags(server, heap_mb):
+    """-XX:+UseLargePages when enough explicit huge pages are reserved, THP otherwise"""
+    wanted = server.get("large_pages")
+    if wanted is False:
+        return []
+
+    pages = detect_huge_pages()
+    if pages["explicit_free_mb"] >= heap_mb:
+        return ["-XX:+UseLargePages"]
+    if pages["thp"] in ("always", "madvise"):
+        return ["-XX:+UseTransparentHugePages"]
+    if wanted:
+        # Forced on (e.g. Windows with "Lock pages in memory" granted)
+        return ["-XX:+UseLargePages"]
+    return []
+
+
+def build_jvm_args(server, java_version=None, cores=None):
+    """
+    JVM flags for a server entry from servers.json.
+
+    Returns (profile_name, [flags]) - heap size included, jar and nogui not.
+    """
+    ram = server["ram"]
+    heap_mb = parse_ram(ram)
+    cores = cores or os.cpu_count() or 2
+    if java_version is None:
+        java_version = detect_java_version()
+
+    profile = server.get("jvm_profile", "auto")
+    if profile not in PROFILES:
+        profile = choose_profile(heap_mb, cores, java_version)
+
+    args = [f"-Xms{ram}", f"-Xmx{ram}"]
+    args += _profile_flags(profile, heap_mb, java_version)
+    if profile != "none":
+        args += _large_page_flags(server, heap_mb)
+    args += server.get("jvm_args", [])
+    return profile, args
+
+
+def format_command_line(args):
+    """Quote flags for a .bat/.sh line"""
+    return " ".join(f'"{a}"' if " " in a else a for a in args)
+
+
+def write_forge_jvm_args(server_path, args):
+    """
+    Put the flags into Forge's user_jvm_args.txt, which both run.bat and
+    run.sh read. Anything the user wrote outside our block is kept.
+    """
+    path = os.path.join(server_path, "user_jvm_args.txt")
+    kept = []
+    if os.path.exists(path):
+        with open(path, "r") as f:
+            inside = False
+            for line in f.read().splitlines():
+                if line.strip() == FORGE_BEGIN:
+                    inside = True
+                elif line.strip() == FORGE_END:
+                    inside = False
+                elif not inside and not re.match(r"\s*-Xm[sx]", line):
+                    # Heap size now comes from servers.json
+                    kept.append(line)
+
+    # Replace rather than rewrite - the file may be a hardlink into the Forge install cache
+    tmp = path + ".tmp"
+    with open(tmp, "w") as f:
+        for line in kept:
+            f.write(line + "\n")
+        f.write(FORGE_BEGIN + "\n")
+        for arg in args:
+            f.write(arg + "\n")
+        f.write(FORGE_END + "\n")
+    os.replace(tmp, path)
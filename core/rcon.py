@@ -0,0 +1,164 @@
+"""
+RCON for PyCraftHub
+Servers run in their own console window, so the only way to send them a
+console command from elsewhere (the control API, scripts) is Minecraft's
+built-in RCON protocol.
+
+ensure_rcon() turns RCON on in server.properties with a random password
+and a free local port before a start; send_command() runs a command and
+returns what the server answered. Minecraft binds RCON to server-ip (every
+interface by default), so it is only turned on when the control API is
+enabled or the server's servers.json entry has "rcon": true.
+"""
+import os
+import socket
+import struct
+import secrets
+import threading
+
+LOGIN = 3
+COMMAND = 2
+RESPONSE = 0
+
+TIMEOUT = 5
+
+_request_id = [0]
+_id_lock = threading.Lock()
+
+
+# -------------------- server.properties --------------------
+
+def read_properties(server_path):
+    """server.properties as a dict (empty if missing)"""
+    props = {}
+    try:
+        with open(os.path.join(server_path, "server.properties"), "r", errors="replace") as f:
+            for line in f:
+                line = line.strip()
+                if line and not line.startswith("#") and "=" in line:
+                    key, _, value = line.partition("=")
+                    props[key.strip()] = value.strip()
+    except OSError:
+        pass
+    return props
+
+
+def set_properties(server_path, values):
+    """Update or add keys in server.properties, keeping everything else"""
+    path = os.path.join(server_path, "server.properties")
+    lines = []
+    if os.path.exists(path):
+        with open(path, "r", errors="replace") as f:
+            lines = f.read().splitlines()
+
+    remaining = dict(values)
+    out = []
+    for line in lines:
+        key = line.partition("=")[0].strip()
+        if key in remaining and not line.lstrip().startswith("#"):
+            out.append(f"{key}={remaining.pop(key)}")
+        else:
+            out.append(line)
+    out += [f"{key}={value}" for key, value in remaining.items()]
+
+    with open(path, "w") as f:
+        f.write("\n".join(out) + "\n")
+
+
+def _free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def rcon_wanted(server):
+    """Whether a server should get RCON: the control API is on, or it opted in itself"""
+    from settings_module import load_settings
+
+    return bool(server.get("rcon") or load_settings().get("api_enabled"))
+
+
+def ensure_rcon(server_path):
+    """
+    Make sure RCON is on (takes effect on the next start).
+    Returns (port, password).
+    """
+    props = read_properties(server_path)
+    port = props.get("rcon.port", "")
+    password = props.get("rcon.password", "")
+
+    changes = {}
+    if props.get("enable-rcon") != "true":
+        changes["enable-rcon"] = "true"
+    if not password:
+        password = changes["rcon.password"] = secrets.token_urlsafe(24)
+    if not port.isdigit() or port == "25575":
+        # Every server would fight over the default port
+        port = changes["rcon.port"] = str(_free_port())
+    if props.get("broadcast-rcon-to-ops") != "false":
+        changes["broadcast-rcon-to-ops"] = "false"
+
+    if changes:
+        set_properties(server_path, changes)
+    return int(port), password
+
+
+# -------------------- Protocol --------------------
+
+def _next_id():
+    with _id_lock:
+        _request_id[0] = _request_id[0] % 0x7FFFFFFF + 1
+        return _request_id[0]
+
+
+def _send(sock, request_id, kind, body):
+    payload = struct.pack("<ii", request_id, kind) + body.encode("utf-8") + b"\x00\x00"
+    sock.sendall(struct.pack("<i", len(payload)) + payload)
+
+
+def _recv_exact(sock, size):
+    data = b""
+    while len(data) < size:
+        chunk = sock.recv(size - len(data))
+        if not chunk:
+            raise ConnectionError("RCON connection closed")
+        data += chunk
+    return data
+
+
+def _receive(sock):
+    size = struct.unpack("<i", _recv_exact(sock, 4))[0]
+    packet = _recv_exact(sock, size)
+    request_id, kind = struct.unpack("<ii", packet[:8])
+    return request_id, kind, packet[8:-2].decode("utf-8", errors="replace")
+
+
+def send_command(server_path, command, host="127.0.0.1", timeout=TIMEOUT):
+    """Run a console command on a running server, returns its response text"""
+    props = read_properties(server_path)
+    if props.get("enable-rcon") != "true" or not props.get("rcon.password"):
+        raise RuntimeError("RCON is not enabled for this server (it is once the control API is "
+                           "enabled, or \"rcon\": true is set for it, and it restarts)")
+
+    with socket.create_connection((host, int(props.get("rcon.port", 25575))), timeout=timeout) as sock:
+        login_id = _next_id()
+        _send(sock, login_id, LOGIN, props["rcon.password"])
+        request_id, _, _ = _receive(sock)
+        if request_id == -1:
+            raise PermissionError("RCON login rejected")
+
+        command_id = _next_id()
+        _send(sock, command_id, COMMAND, command)
+        # Long answers arrive in several packets - an empty marker command
+        # is answered only after all of them
+        marker_id = _next_id()
+        _send(sock, marker_id, RESPONSE, "")
+
+        parts = []
+        while True:
+            request_id, _, body = _receive(sock)
+            if request_id == marker_id:
+                break
+            if request_id == command_id:
+                parts.append(body)
+        return "".join(parts)
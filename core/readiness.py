@@ -0,0 +1,288 @@
+"""
+Server Readiness for PyCraftHub
+A launched server only counts as up once it can take players: its
+logs/latest.log shows the "Done (X.XXXs)!" line, or it answers a Server
+List Ping on its port (for log setups that hide the line).
+
+Each boot is stored in data/boot_times.json with what could explain a
+change in boot time - server JAR hash, JVM flags, mod count and world
+size - so boot_regression() can point out a boot that got slower and why.
+"""
+import os
+import json
+import time
+import socket
+import struct
+import threading
+from statistics import median
+
+from utils.lazy import lazy_import
+from utils.helpers import format_bytes
+from utils.tracing import current_span, record_span
+from core.appcds import DONE_RE, BOOT_TIMEOUT, record_boot, load_boot_history, launch_fingerprint
+from core.disk_usage import get_usage
+
+psutil = lazy_import("psutil")
+
+READY_TIMEOUT = BOOT_TIMEOUT
+POLL_INTERVAL = 0.25
+PING_INTERVAL = 2.0
+PING_TIMEOUT = 1.0
+# A boot this much slower than the usual one is reported
+REGRESSION_FACTOR = 1.25
+
+_watches = {}
+_watches_lock = threading.Lock()
+
+
+class BootWatch:
+    """One launch being followed until the server is ready, exits or times out"""
+
+    def __init__(self, server_name, launched_at):
+        self.server_name = server_name
+        self.launched_at = launched_at
+        self.pid = None
+        self.result = None
+        self._done = threading.Event()
+
+    @property
+    def state(self):
+        if not self._done.is_set():
+            return "starting"
+        if self.result["ready"]:
+            return "ready"
+        return "exited" if self.result.get("exited") else "timeout"
+
+    def wait(self, timeout=None):
+        """The result once known: {"ready", "seconds", "reported", "via", ...}"""
+        self._done.wait(timeout)
+        return self.result
+
+    def _finish(self, result):
+        self.result = result
+        self._done.set()
+
+
+# -------------------- Checks --------------------
+
+def log_marker(server_path):
+    """Where latest.log stands before a launch, so the last run's Done line isn't taken"""
+    try:
+        st = os.stat(os.path.join(server_path, "logs", "latest.log"))
+        return st.st_ino, st.st_size
+    except OSError:
+        return None, 0
+
+
+def _write_varint(value):
+    out = b""
+    value &= 0xFFFFFFFF
+    while True:
+        byte = value & 0x7F
+        value >>= 7
+        out += struct.pack("B", byte | (0x80 if value else 0))
+        if not value:
+            return out
+
+
+def _read_varint(sock):
+    value = 0
+    for shift in range(0, 35, 7):
+        byte = sock.recv(1)
+        if not byte:
+            raise ConnectionError("connection closed")
+        value |= (byte[0] & 0x7F) << shift
+        if not byte[0] & 0x80:
+            return value
+    raise ValueError("VarInt too long")
+
+
+def slp_ping(port, host="127.0.0.1", timeout=PING_TIMEOUT):
+    """Server List Ping, returns the status JSON (None when it doesn't answer)"""
+    try:
+        with socket.create_connection((host, int(port)), timeout=timeout) as sock:
+            address = host.encode("utf-8")
+            handshake = (b"\x00" + _write_varint(-1) + _write_varint(len(address)) + address
+                         + struct.pack(">H", int(port)) + _write_varint(1))
+            sock.sendall(_write_varint(len(handshake)) + handshake + b"\x01\x00")
+
+            _read_varint(sock)
+            if _read_varint(sock) != 0:
+                return None
+            size = _read_varint(sock)
+            data = b""
+            while len(data) < size:
+                chunk = sock.recv(size - len(data))
+                if not chunk:
+                    return None
+                data += chunk
+            return json.loads(data.decode("utf-8"))
+    except (OSError, ValueError):
+        return None
+
+
+def wait_until_ready(server_path, port, launched_at, marker, watch=None, timeout=READY_TIMEOUT):
+    """
+    Follow latest.log and ping the port until the server is ready.
+
+    Returns {"ready", "seconds", "reported", "via"} plus "exited" when the
+    JVM went away first.
+    """
+    log_path = os.path.join(server_path, "logs", "latest.log")
+    inode, pos = marker
+    partial = ""
+    next_ping = launched_at + PING_INTERVAL
+
+    while time.time() - launched_at < timeout:
+        try:
+            st = os.stat(log_path)
+            if st.st_ino != inode or st.st_size < pos:
+                # The server rotated the old log away - this run's log starts at 0
+                inode, pos, partial = st.st_ino, 0, ""
+            if st.st_size > pos:
+                with open(log_path, "r", errors="replace") as f:
+                    f.seek(pos)
+                    chunk = partial + f.read()
+                    pos = f.tell()
+                *lines, partial = chunk.split("\n")
+                for line in lines:
+                    match = DONE_RE.search(line)
+                    if match:
+                        return {"ready": True, "seconds": time.time() - launched_at,
+                                "reported": float(match.group(1).replace(",", ".")), "via": "log"}
+        except OSError:
+            pass
+
+        now = time.time()
+        if now >= next_ping:
+            next_ping = now + PING_INTERVAL
+            if slp_ping(port):
+                return {"ready": True, "seconds": now - launched_at, "reported": None, "via": "ping"}
+            if watch and watch.pid and not psutil.pid_exists(watch.pid):
+                return {"ready": False, "seconds": now - launched_at, "reported": None, "via": None,
+                        "exited": True}
+        time.sleep(POLL_INTERVAL)
+
+    return {"ready": False, "seconds": time.time() - launched_at, "reported": None, "via": None}
+
+
+# -------------------- Boot history --------------------
+
+def boot_details(server_name, server, server_path, jvm_args):
+    """What a boot ran with, stored next to its time"""
+    mods = 0
+    for folder in ("mods", "plugins"):
+        try:
+            mods += sum(1 for f in os.listdir(os.path.join(server_path, folder)) if f.endswith(".jar"))
+        except OSError:
+            pass
+    fingerprint = launch_fingerprint(server_path, server)
+    return {
+        "jar_hash": fingerprint[:16] if fingerprint else None,
+        # The archive flags change with the CDS mode, which is stored on its own
+        "jvm_args": [a for a in jvm_args if not a.startswith(("-XX:SharedArchiveFile", "-XX:ArchiveClassesAtExit"))],
+        "mods": mods,
+        "world_bytes": (get_usage(server_name) or {}).get("world"),
+    }
+
+
+def boot_regression(server_name):
+    """
+    Whether the last boot was clearly slower than the usual one.
+
+    Returns None, or {"seconds", "usual", "changes"} where changes lists
+    what differs from the boot before.
+    """
+    boots = load_boot_history().get(server_name, [])
+    if len(boots) < 2:
+        return None
+    last, previous = boots[-1], boots[-2]
+    # Boots with and without a CDS archive aren't comparable
+    with_cds = last.get("mode") == "cds"
+    earlier = [b["seconds"] for b in boots[:-1] if (b.get("mode") == "cds") == with_cds][-10:]
+    if len(earlier) < 3:
+        return None
+    usual = median(earlier)
+    if last["seconds"] < usual * REGRESSION_FACTOR:
+        return None
+
+    changes = []
+    if previous.get("jar_hash") and last.get("jar_hash") != previous.get("jar_hash"):
+        changes.append("server JAR")
+    if "jvm_args" in previous and last.get("jvm_args") != previous.get("jvm_args"):
+        changes.append("JVM flags")
+    if previous.get("mods") is not None and last.get("mods") != previous.get("mods"):
+        changes.append(f"mods {previous['mods']} → {last.get('mods')}")
+    before, after = previous.get("world_bytes"), last.get("world_bytes")
+    if before and after and after > before * 1.2:
+        changes.append(f"world {format_bytes(before)} → {format_bytes(after)}")
+    return {"seconds": last["seconds"], "usual": usual, "changes": changes}
+
+
+# -------------------- Watching --------------------
+
+def watch_boot(server_name, server, server_path, port, launched_at, marker, mode, jvm_args, on_ready=None):
+    """
+    Follow a launch in the background. Returns a BootWatch - set its pid
+    once known so a crashed JVM ends the wait early. On readiness the boot
+    is recorded and on_ready(result) is called.
+    """
+    watch = BootWatch(server_name, launched_at)
+    with _watches_lock:
+        _watches[server_name] = watch
+    parent = current_span()
+
+    def run():
+        result = wait_until_ready(server_path, port, launched_at, marker, watch)
+        record_span("server.ready", launched_at, parent=parent, status="ok" if result["ready"] else "error",
+                    server=server_name, via=result["via"], reported=result["reported"],
+                    exited=bool(result.get("exited")), cds_mode=mode)
+        if result["ready"]:
+            try:
+                details = boot_details(server_name, server, server_path, jvm_args)
+                record_boot(server_name, result["seconds"], result["reported"], mode, details)
+                result["regression"] = boot_regression(server_name)
+            except Exception:
+                pass
+        watch._finish(result)
+        if result["ready"] and on_ready:
+            try:
+                on_ready(result)
+            except Exception:
+                pass
+
+    threading.Thread(target=run, name=f"boot-{server_name}", daemon=True).start()
+    return watch
+
+
+def boot_state(server_name):
+    """"starting", "ready", "exited" or "timeout" for the last launch this session, None if none"""
+    with _watches_lock:
+        watch = _watches.get(server_name)
+    return watch.state if watch else None
+
+
+def require_ready(result):
+    """Result fields of a start that waited for readiness, RuntimeError if it never got there"""
+    if not result:
+        raise RuntimeError("Server did not start")
+    if not result["ready"]:
+        raise RuntimeError("Server exited during startup" if result.get("exited")
+                           else f"Server wasn't ready after {result['seconds']:.0f}s")
+    return {"ready_seconds": round(result["seconds"], 2), "ready_via": result["via"],
+            "slower_than_usual": result.get("regression")}
+
+
+def describe_boot(result):
+    """One line about a finished wait for the console"""
+    if not result["ready"]:
+        if result.get("exited"):
+            return f"❌ Server exited after {result['seconds']:.1f}s without finishing startup"
+        return f"⚠ Server wasn't ready after {result['seconds']:.0f}s"
+    via = f"server reported {result['reported']:.1f}s" if result["reported"] is not None else "answered a ping"
+    line = f"✔ Ready to join after {result['seconds']:.1f}s ({via})"
+    regression = result.get("regression")
+    if regression:
+        line += (f"\n⚠ Slower than usual ({regression['usual']:.1f}s)"
+                 + (f" - changed since last boot: {', '.join(regression['changes'])}" if regression["changes"] else ""))
+    return line
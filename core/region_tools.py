@@ -0,0 +1,731 @@
+"""
+Region Tools for PyCraftHub
+Reads Anvil (.mca) region files to report how much of a world was
+actually played, and prunes chunks nobody ever spent time in.
+
+Region file layout:
+    0x0000  1024 x 4 byte locations  (3 byte sector offset, 1 byte sector count)
+    0x1000  1024 x 4 byte timestamps
+    0x2000  chunk records, 4 KiB aligned:
+            4 byte length, 1 byte compression, compressed NBT
+
+Headers are read through mmap and chunk NBT is only decompressed as far
+as needed to find its InhabitedTime tag. Regions are handled by a
+process pool, one region (and its entities/poi twins) per task.
+
+Offline maintenance can also rewrite every region compacted (no freed
+sectors, chunks packed in order) and optionally recompressed with the
+codec selected by server.properties "region-file-compression"
+(deflate / lz4 / none, Minecraft 1.20.5+). LZ4 needs: pip install lz4 xxhash
+"""
+import os
+import re
+import mmap
+import zlib
+import gzip
+import math
+import time
+import struct
+from concurrent.futures import ProcessPoolExecutor
+
+from utils.helpers import format_bytes
+
+try:
+    import lz4.block
+    HAS_LZ4 = True
+except ImportError:
+    HAS_LZ4 = False
+
+try:
+    import xxhash
+    HAS_XXHASH = True
+except ImportError:
+    HAS_XXHASH = False
+
+SECTOR = 4096
+HEADER_SIZE = 2 * SECTOR
+# A chunk record in the region file itself is at most this long (one header byte)
+MAX_RECORD_SECTORS = 255
+CHUNKS_PER_REGION = 1024
+
+COMPRESSION_GZIP = 1
+COMPRESSION_ZLIB = 2
+COMPRESSION_NONE = 3
+COMPRESSION_LZ4 = 4
+EXTERNAL_FLAG = 128
+
+# TAG_Long named "InhabitedTime" - found by byte search instead of a full NBT walk
+INHABITED_PATTERN = b"\x04\x00\x0dInhabitedTime"
+SPAWN_PATTERNS = (b"\x03\x00\x06SpawnX", b"\x03\x00\x06SpawnZ")
+
+# Compressed bytes fed to the decompressor per step while looking for the tag
+DECOMPRESS_STEP = 4096
+
+# lz4-java LZ4BlockOutputStream framing, as written by Minecraft
+LZ4_MAGIC = b"LZ4Block"
+LZ4_HEADER = len(LZ4_MAGIC) + 13
+LZ4_BLOCK_SIZE = 1 << 16
+LZ4_LEVEL = 6  # "compression level" nibble lz4-java derives from a 64 KiB block
+LZ4_RAW = 0x10
+LZ4_COMPRESSED = 0x20
+LZ4_SEED = 0x9747B28C
+
+# region-file-compression value -> chunk compression byte
+CODECS = {
+    "deflate": COMPRESSION_ZLIB,
+    "lz4": COMPRESSION_LZ4,
+    "none": COMPRESSION_NONE,
+}
+CODECS_MIN_VERSION = (1, 20, 5)
+
+REGION_NAME = re.compile(r"^r\.(-?\d+)\.(-?\d+)\.mca$")
+
+# InhabitedTime buckets (ticks, 20 per second) for the report
+INHABITED_BUCKETS = [
+    ("never", 0),
+    ("< 1 min", 20 * 60),
+    ("< 10 min", 20 * 600),
+    ("< 1 hour", 20 * 3600),
+    ("< 10 hours", 20 * 36000),
+    ("10+ hours", None),
+]
+
+
+# ==================== REGION FILE ACCESS ====================
+
+def read_header(mm):
+    """Return (locations, timestamps) as lists of 1024 ints"""
+    locations = struct.unpack_from(">1024I", mm, 0)
+    timestamps = struct.unpack_from(">1024I", mm, SECTOR)
+    return locations, timestamps
+
+
+def chunk_coords(rx, rz, index):
+    return rx * 32 + (index & 31), rz * 32 + (index >> 5)
+
+
+def read_chunk_record(mm, location):
+    """
+    Raw record for one chunk: (compression, payload, record_bytes).
+    record_bytes is the on-disk record (length + type + payload) without padding.
+    """
+    offset = (location >> 8) * SECTOR
+    if offset < HEADER_SIZE or offset + 5 > len(mm):
+        return None
+    length = struct.unpack_from(">I", mm, offset)[0]
+    if length == 0 or offset + 4 + length > len(mm):
+        return None
+    compression = mm[offset + 4]
+    record = mm[offset:offset + 4 + length]
+    return compression, record[5:], record
+
+
+def _external_path(region_path, cx, cz):
+    return os.path.join(os.path.dirname(region_path), f"c.{cx}.{cz}.mcc")
+
+
+def _decompressor(compression):
+    if compression == COMPRESSION_ZLIB:
+        return zlib.decompressobj()
+    if compression == COMPRESSION_GZIP:
+        return zlib.decompressobj(16 + zlib.MAX_WBITS)
+    return None
+
+
+def lz4_block_decode(payload):
+    """Decode an lz4-java block stream"""
+    out = bytearray()
+    pos = 0
+    while pos + LZ4_HEADER <= len(payload):
+        if payload[pos:pos + len(LZ4_MAGIC)] != LZ4_MAGIC:
+            raise ValueError("Bad LZ4 block magic")
+        token = payload[pos + len(LZ4_MAGIC)]
+        compressed_len, original_len, _ = struct.unpack_from("<iii", payload, pos + len(LZ4_MAGIC) + 1)
+        pos += LZ4_HEADER
+        if original_len == 0:
+            break
+        block = payload[pos:pos + compressed_len]
+        pos += compressed_len
+        if token & 0xF0 == LZ4_RAW:
+            out += block
+        else:
+            out += lz4.block.decompress(block, uncompressed_size=original_len)
+    return bytes(out)
+
+
+def lz4_block_encode(raw):
+    """Encode bytes as an lz4-java block stream (64 KiB blocks + end marker)"""
+    out = bytearray()
+    for start in range(0, len(raw), LZ4_BLOCK_SIZE):
+        block = raw[start:start + LZ4_BLOCK_SIZE]
+        # lz4-java masks the xxhash32 checksum to 28 bits
+        check = xxhash.xxh32_intdigest(block, seed=LZ4_SEED) & 0xFFFFFFF
+        compressed = lz4.block.compress(block, store_size=False)
+        method = LZ4_COMPRESSED
+        if len(compressed) >= len(block):
+            method, compressed = LZ4_RAW, block
+        out += LZ4_MAGIC + bytes([method | LZ4_LEVEL])
+        out += struct.pack("<iii", len(compressed), len(block), check)
+        out += compressed
+    out += LZ4_MAGIC + bytes([LZ4_RAW | LZ4_LEVEL]) + struct.pack("<iii", 0, 0, 0)
+    return bytes(out)
+
+
+def decode_chunk(compression, payload):
+    """Fully decompress a chunk payload to raw NBT"""
+    if compression == COMPRESSION_ZLIB:
+        return zlib.decompress(payload)
+    if compression == COMPRESSION_GZIP:
+        return gzip.decompress(payload)
+    if compression == COMPRESSION_NONE:
+        return bytes(payload)
+    if compression == COMPRESSION_LZ4:
+        if not HAS_LZ4:
+            raise RuntimeError("LZ4 chunks need: pip install lz4")
+        return lz4_block_decode(payload)
+    raise RuntimeError(f"Unknown chunk compression {compression}")
+
+
+def encode_chunk(codec, raw):
+    """Compress raw NBT with a region-file-compression codec, returns (type, payload)"""
+    if codec == "deflate":
+        return COMPRESSION_ZLIB, zlib.compress(raw, 6)
+    if codec == "none":
+        return COMPRESSION_NONE, raw
+    if codec == "lz4":
+        return COMPRESSION_LZ4, lz4_block_encode(raw)
+    raise ValueError(f"Unknown codec '{codec}'")
+
+
+def codec_available(codec):
+    if codec == "lz4":
+        return HAS_LZ4 and HAS_XXHASH
+    return codec in CODECS
+
+
+def find_inhabited_time(compression, payload):
+    """
+    Decompress just enough of a chunk to read its InhabitedTime.
+    Returns None when the codec isn't supported or the tag is missing.
+    """
+    need = len(INHABITED_PATTERN) + 8
+
+    if compression == COMPRESSION_NONE:
+        idx = payload.find(INHABITED_PATTERN)
+        if idx < 0 or idx + need > len(payload):
+            return None
+        return struct.unpack_from(">q", payload, idx + len(INHABITED_PATTERN))[0]
+
+    if compression == COMPRESSION_LZ4:
+        if not HAS_LZ4:
+            return None
+        return find_inhabited_time(COMPRESSION_NONE, lz4_block_decode(payload))
+
+    d = _decompressor(compression)
+    if d is None:
+        return None
+
+    buf = bytearray()
+    searched = 0
+    view = memoryview(payload)
+    for start in range(0, len(payload), DECOMPRESS_STEP):
+        try:
+            buf += d.decompress(view[start:start + DECOMPRESS_STEP])
+        except zlib.error:
+            return None
+        idx = buf.find(INHABITED_PATTERN, max(0, searched - need))
+        if idx >= 0:
+            # Tag found - pull a little more if the value straddles the step
+            while idx + need > len(buf) and start < len(payload):
+                start += DECOMPRESS_STEP
+                buf += d.decompress(view[start:start + DECOMPRESS_STEP])
+            if idx + need > len(buf):
+                return None
+            return struct.unpack_from(">q", buf, idx + len(INHABITED_PATTERN))[0]
+        searched = len(buf)
+    return None
+
+
+def chunk_inhabited_time(region_path, rx, rz, index, compression, payload):
+    """InhabitedTime for a chunk record, following external .mcc chunks"""
+    if compression & EXTERNAL_FLAG:
+        cx, cz = chunk_coords(rx, rz, index)
+        try:
+            with open(_external_path(region_path, cx, cz), "rb") as f:
+                payload = f.read()
+        except OSError:
+            return None
+        compression &= ~EXTERNAL_FLAG
+    return find_inhabited_time(compression, payload)
+
+
+def write_region(path, records, timestamps):
+    """
+    Write a compacted region file.
+
+    Args:
+        records: {index: record_bytes} (length + type + payload, unpadded)
+        timestamps: {index: timestamp}
+    """
+    if not records:
+        if os.path.exists(path):
+            os.remove(path)
+        return 0
+
+    header = bytearray(HEADER_SIZE)
+    body = bytearray()
+    sector = 2
+    for index in sorted(records):
+        record = records[index]
+        sectors = (len(record) + SECTOR - 1) // SECTOR
+        if sectors > MAX_RECORD_SECTORS:
+            raise ValueError(f"Chunk record too large for {os.path.basename(path)}")
+        struct.pack_into(">I", header, index * 4, (sector << 8) | sectors)
+        struct.pack_into(">I", header, SECTOR + index * 4, timestamps.get(index, 0))
+        body += record
+        body += bytes(sectors * SECTOR - len(record))
+        sector += sectors
+
+    tmp = path + ".tmp"
+    with open(tmp, "wb") as f:
+        f.write(header)
+        f.write(body)
+    os.replace(tmp, path)
+    return len(header) + len(body)
+
+
+# ==================== WORLD DISCOVERY ====================
+
+def get_level_name(server_path):
+    props = os.path.join(server_path, "server.properties")
+    try:
+        with open(props, "r") as f:
+            for line in f:
+                if line.startswith("level-name="):
+                    return line.split("=", 1)[1].strip() or "world"
+    except OSError:
+        pass
+    return "world"
+
+
+def find_dimensions(server_path):
+    """
+    Map dimension label -> region folder for every world of a server
+    (world/region, world_nether/DIM-1/region, world/dimensions/..., etc.)
+    """
+    level = get_level_name(server_path)
+    dimensions = {}
+    if not os.path.isdir(server_path):
+        return dimensions
+
+    for entry in sorted(os.listdir(server_path)):
+        world = os.path.join(server_path, entry)
+        if not entry.startswith(level) or not os.path.isdir(world):
+            continue
+        for root, dirs, _ in os.walk(world):
+            if "region" in dirs:
+                label = os.path.relpath(root, server_path).replace(os.sep, "/")
+                dimensions[label] = os.path.join(root, "region")
+            # Don't descend into data folders
+            dirs[:] = [d for d in dirs if d not in ("region", "entities", "poi", "data", "playerdata", "stats", "advancements")]
+    return dimensions
+
+
+def list_regions(region_dir):
+    regions = []
+    try:
+        with os.scandir(region_dir) as it:
+            for entry in it:
+                m = REGION_NAME.match(entry.name)
+                if m and entry.is_file():
+                    regions.append((entry.path, int(m.group(1)), int(m.group(2))))
+    except FileNotFoundError:
+        pass
+    return regions
+
+
+def read_spawn(server_path):
+    """Spawn chunk from level.dat, (0, 0) if it can't be read"""
+    level_dat = os.path.join(server_path, get_level_name(server_path), "level.dat")
+    try:
+        with gzip.open(level_dat, "rb") as f:
+            raw = f.read()
+        coords = []
+        for pattern in SPAWN_PATTERNS:
+            idx = raw.find(pattern)
+            if idx < 0:
+                return 0, 0
+            coords.append(struct.unpack_from(">i", raw, idx + len(pattern))[0] >> 4)
+        return coords[0], coords[1]
+    except (OSError, EOFError, struct.error):
+        return 0, 0
+
+
+# ==================== WORKERS ====================
+
+def _bucket(inhabited):
+    for i, (_, limit) in enumerate(INHABITED_BUCKETS):
+        if limit is None:
+            return i
+        if limit == 0 and inhabited == 0:
+            return i
+        if limit and inhabited < limit:
+            return i
+    return len(INHABITED_BUCKETS) - 1
+
+
+def analyze_region(region_path, rx, rz, read_inhabited=True):
+    """Per-region stats: chunk count, chunk bytes, file size, InhabitedTime histogram"""
+    stats = {
+        "chunks": 0,
+        "chunk_bytes": 0,
+        "file_bytes": os.path.getsize(region_path),
+        "unknown": 0,
+        "histogram": [0] * len(INHABITED_BUCKETS),
+    }
+    if stats["file_bytes"] < HEADER_SIZE:
+        return stats
+
+    with open(region_path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        locations, _ = read_header(mm)
+        for index, location in enumerate(locations):
+            if not location:
+                continue
+            record = read_chunk_record(mm, location)
+            if record is None:
+                continue
+            compression, payload, raw = record
+            stats["chunks"] += 1
+            stats["chunk_bytes"] += len(raw)
+            if not read_inhabited:
+                continue
+            inhabited = chunk_inhabited_time(region_path, rx, rz, index, compression, payload)
+            if inhabited is None:
+                stats["unknown"] += 1
+            else:
+                stats["histogram"][_bucket(inhabited)] += 1
+    return stats
+
+
+def _should_prune(cx, cz, inhabited, rule):
+    min_inhabited, radius, center = rule
+    if radius is not None:
+        dx = cx - center[0]
+        dz = cz - center[1]
+        if math.hypot(dx, dz) > radius:
+            return True
+    if min_inhabited is not None and inhabited is not None:
+        return inhabited < min_inhabited
+    return False
+
+
+def _compact_twin(path, drop, dry_run):
+    """Drop the same chunk indexes from an entities/ or poi/ region file"""
+    if not os.path.exists(path) or os.path.getsize(path) < HEADER_SIZE:
+        return 0, 0
+    before = os.path.getsize(path)
+    with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        locations, timestamps = read_header(mm)
+        records, stamps = {}, {}
+        for index, location in enumerate(locations):
+            if not location or index in drop:
+                continue
+            record = read_chunk_record(mm, location)
+            if record:
+                records[index] = bytes(record[2])
+                stamps[index] = timestamps[index]
+    if dry_run:
+        size = HEADER_SIZE + sum((len(r) + SECTOR - 1) // SECTOR * SECTOR for r in records.values())
+        return before, size if records else 0
+    return before, write_region(path, records, stamps)
+
+
+def prune_region(region_path, rx, rz, rule, dry_run=False):
+    """
+    Remove chunks matching the prune rule from one region (plus its
+    entities/ and poi/ twins) and rewrite it compacted.
+    """
+    result = {"chunks": 0, "pruned": 0, "bytes_before": 0, "bytes_after": 0}
+    if os.path.getsize(region_path) < HEADER_SIZE:
+        return result
+
+    min_inhabited = rule[0]
+    records, stamps, drop = {}, {}, set()
+    result["bytes_before"] = os.path.getsize(region_path)
+
+    with open(region_path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        locations, timestamps = read_header(mm)
+        for index, location in enumerate(locations):
+            if not location:
+                continue
+            record = read_chunk_record(mm, location)
+            if record is None:
+                continue
+            compression, payload, raw = record
+            result["chunks"] += 1
+            cx, cz = chunk_coords(rx, rz, index)
+
+            inhabited = None
+            if min_inhabited is not None:
+                inhabited = chunk_inhabited_time(region_path, rx, rz, index, compression, payload)
+
+            if _should_prune(cx, cz, inhabited, rule):
+                drop.add(index)
+                if compression & EXTERNAL_FLAG and not dry_run:
+                    try:
+                        os.remove(_external_path(region_path, cx, cz))
+                    except OSError:
+                        pass
+            else:
+                records[index] = bytes(raw)
+                stamps[index] = timestamps[index]
+
+    result["pruned"] = len(drop)
+    if dry_run:
+        kept = sum((len(r) + SECTOR - 1) // SECTOR * SECTOR for r in records.values())
+        result["bytes_after"] = HEADER_SIZE + kept if records else 0
+    else:
+        result["bytes_after"] = write_region(region_path, records, stamps)
+
+    # Entities and POI live in twin region files with the same chunk layout
+    dim_dir = os.path.dirname(os.path.dirname(region_path))
+    name = os.path.basename(region_path)
+    for twin in ("entities", "poi"):
+        before, after = _compact_twin(os.path.join(dim_dir, twin, name), drop, dry_run)
+        result["bytes_before"] += before
+        result["bytes_after"] += after
+
+    return result
+
+
+def recompress_region(path, codec=None, sample_every=8):
+    """
+    Rewrite one .mca compacted, re-encoding chunks with codec if given.
+    Chunk decode time is measured before/after on every Nth chunk to
+    estimate the load-time change.
+    """
+    result = {
+        "files": 1, "chunks": 0, "recompressed": 0,
+        "bytes_before": os.path.getsize(path), "bytes_after": 0,
+        "sampled": 0, "decode_before": 0.0, "decode_after": 0.0, "too_large": 0,
+    }
+    if result["bytes_before"] < HEADER_SIZE:
+        result["bytes_after"] = result["bytes_before"]
+        return result
+
+    target = CODECS.get(codec)
+    records, stamps = {}, {}
+
+    with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        locations, timestamps = read_header(mm)
+        for index, location in enumerate(locations):
+            if not location:
+                continue
+            record = read_chunk_record(mm, location)
+            if record is None:
+                continue
+            compression, payload, raw_record = record
+            result["chunks"] += 1
+            stamps[index] = timestamps[index]
+            sample = target is not None and result["chunks"] % sample_every == 0
+
+            # External (.mcc) chunks and unreadable codecs are kept as they are
+            keep = compression & EXTERNAL_FLAG or (compression == COMPRESSION_LZ4 and not HAS_LZ4)
+            if keep or (target is None and not sample):
+                records[index] = raw_record
+                continue
+
+            started = time.perf_counter()
+            try:
+                raw = decode_chunk(compression, payload)
+            except Exception:
+                # Corrupt chunk - leave it for the server to deal with
+                records[index] = raw_record
+                continue
+            decode_old = time.perf_counter() - started
+
+            if target is None or target == compression:
+                records[index] = raw_record
+                new_type, new_payload = compression, payload
+            else:
+                new_type, new_payload = encode_chunk(codec, raw)
+                new_record = struct.pack(">IB", len(new_payload) + 1, new_type) + new_payload
+                if len(new_record) > MAX_RECORD_SECTORS * SECTOR:
+                    # A dense chunk re-encoded (e.g. to none) can outgrow the
+                    # region's 255-sector limit - keep it as it was
+                    records[index] = raw_record
+                    new_type, new_payload = compression, payload
+                    result["too_large"] += 1
+                else:
+                    records[index] = new_record
+                    result["recompressed"] += 1
+
+            if sample:
+                started = time.perf_counter()
+                decode_chunk(new_type, new_payload)
+                result["decode_after"] += time.perf_counter() - started
+                result["decode_before"] += decode_old
+                result["sampled"] += 1
+
+    result["bytes_after"] = write_region(path, records, stamps)
+    return result
+
+
+def _version_tuple(version):
+    parts = []
+    for p in str(version).split("."):
+        if not p.isdigit():
+            break
+        parts.append(int(p))
+    return tuple(parts)
+
+
+# ==================== SERVER-LEVEL OPERATIONS ====================
+
+def analyze_world(server_name, read_inhabited=True, workers=None):
+    """Per-dimension totals for a server's worlds"""
+    from core.storage import get_server_path
+
+    server_path = get_server_path(server_name)
+    report = {}
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for label, region_dir in find_dimensions(server_path).items():
+            regions = list_regions(region_dir)
+            dim = {
+                "regions": len(regions),
+                "chunks": 0,
+                "chunk_bytes": 0,
+                "file_bytes": 0,
+                "unknown": 0,
+                "histogram": [0] * len(INHABITED_BUCKETS),
+            }
+            futures = [pool.submit(analyze_region, path, rx, rz, read_inhabited) for path, rx, rz in regions]
+            for future in futures:
+                stats = future.result()
+                for key in ("chunks", "chunk_bytes", "file_bytes", "unknown"):
+                    dim[key] += stats[key]
+                dim["histogram"] = [a + b for a, b in zip(dim["histogram"], stats["histogram"])]
+            report[label] = dim
+    return report
+
+
+def prune_world(server_name, min_inhabited=None, radius=None, center=None, dry_run=False, workers=None):
+    """
+    Prune chunks below an InhabitedTime threshold (ticks) and/or further
+    than radius chunks from center (default: world spawn). Offline only.
+    """
+    from core.server_manager import is_server_running
+    from core.storage import get_server_path
+
+    if min_inhabited is None and radius is None:
+        raise ValueError("Nothing to prune - give a threshold and/or a radius")
+    if not dry_run and is_server_running(server_name):
+        raise RuntimeError("Stop the server before pruning its world")
+
+    server_path = get_server_path(server_name)
+    if center is None:
+        center = read_spawn(server_path)
+    rule = (min_inhabited, radius, center)
+
+    report = {}
+    started = time.time()
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for label, region_dir in find_dimensions(server_path).items():
+            regions = list_regions(region_dir)
+            futures = [pool.submit(prune_region, path, rx, rz, rule, dry_run) for path, rx, rz in regions]
+            dim = {"regions": len(regions), "chunks": 0, "pruned": 0, "bytes_before": 0, "bytes_after": 0}
+            for future in futures:
+                for key, value in future.result().items():
+                    dim[key] += value
+            report[label] = dim
+    report_time = time.time() - started
+    return report, report_time
+
+
+def optimize_world(server_name, codec=None, workers=None):
+    """
+    Offline: compact every region/entities/poi file of a server and
+    optionally recompress to codec, then point server.properties at it.
+    """
+    from core.server_manager import load_data, is_server_running
+    from core.storage import get_server_path
+
+    server = load_data().get(server_name)
+    if not server:
+        raise RuntimeError(f"Server '{server_name}' not found")
+    if is_server_running(server_name):
+        raise RuntimeError("Stop the server before optimizing its world")
+
+    if codec:
+        if codec not in CODECS:
+            raise ValueError(f"Unknown codec '{codec}' (use deflate, lz4 or none)")
+        if not codec_available(codec):
+            raise RuntimeError("LZ4 needs: pip install lz4 xxhash")
+        if _version_tuple(server.get("version", "")) < CODECS_MIN_VERSION:
+            raise RuntimeError("region-file-compression needs Minecraft 1.20.5 or newer")
+
+    server_path = get_server_path(server_name)
+    files = []
+    for region_dir in find_dimensions(server_path).values():
+        dim_dir = os.path.dirname(region_dir)
+        for folder in ("region", "entities", "poi"):
+            files.extend(path for path, _, _ in list_regions(os.path.join(dim_dir, folder)))
+
+    totals = {
+        "files": 0, "chunks": 0, "recompressed": 0, "bytes_before": 0, "bytes_after": 0,
+        "sampled": 0, "decode_before": 0.0, "decode_after": 0.0, "too_large": 0,
+    }
+    started = time.time()
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for result in pool.map(recompress_region, files, [codec] * len(files), chunksize=4):
+            for key, value in result.items():
+                totals[key] += value
+
+    if codec:
+        from core.rcon import set_properties
+
+        set_properties(server_path, {"region-file-compression": codec})
+
+    return totals, time.time() - started
+
+
+def print_optimize_report(totals, elapsed, codec):
+    saved = totals["bytes_before"] - totals["bytes_after"]
+    print(f"\n✔ Rewrote {totals['files']} region file(s), {totals['chunks']} chunks in {elapsed:.1f}s")
+    if codec:
+        print(f"🗜 Recompressed {totals['recompressed']} chunk(s) to {codec} "
+              f"(region-file-compression={codec} set in server.properties)")
+        if totals["too_large"]:
+            print(f"⚠ Kept {totals['too_large']} chunk(s) in their old format - too large for a region file as {codec}")
+    print(f"💾 Size: {format_bytes(totals['bytes_before'])} → {format_bytes(totals['bytes_after'])} "
+          f"({'-' if saved >= 0 else '+'}{format_bytes(abs(saved))})")
+
+    if totals["sampled"]:
+        before = totals["decode_before"] / totals["sampled"] * 1e6
+        after = totals["decode_after"] / totals["sampled"] * 1e6
+        change = (after - before) / before * 100 if before else 0
+        print(f"⏱ Chunk decode (estimated load cost): {before:.0f} µs → {after:.0f} µs per chunk ({change:+.0f}%)")
+
+
+def print_world_report(report):
+    for label, dim in report.items():
+        print(f"\n🗺 {label}")
+        print(f"   Regions: {dim['regions']}   Chunks: {dim['chunks']}   "
+              f"On disk: {format_bytes(dim['file_bytes'])} (chunk data {format_bytes(dim['chunk_bytes'])})")
+        total = sum(dim["histogram"]) or 1
+        for (name, _), count in zip(INHABITED_BUCKETS, dim["histogram"]):
+            bar = "█" * int(30 * count / total)
+            print(f"   {name:<11} {count:>8} {bar}")
+        if dim["unknown"]:
+            print(f"   unreadable  {dim['unknown']:>8} (unsupported compression)")
+
+
+def print_prune_report(report, elapsed, dry_run):
+    verb = "Would prune" if dry_run else "Pruned"
+    total_before = total_after = 0
+    for label, dim in report.items():
+        total_before += dim["bytes_before"]
+        total_after += dim["bytes_after"]
+        print(f"🗺 {label}: {verb} {dim['pruned']}/{dim['chunks']} chunks, "
+              f"{format_bytes(dim['bytes_before'])} → {format_bytes(dim['bytes_after'])}")
+    print(f"✔ {verb} {format_bytes(total_before - total_after)} in {elapsed:.1f}s")
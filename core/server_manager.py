@@ -9,31 +9,63 @@ except ImportError:
     def notify_server_created(*args, **kwargs): pass
     def notify_server_deleted(*args, **kwargs): pass
 
-import tkinter as tk
-from tkinter import filedialog
 import os
 import json
 import shutil
 import subprocess
-import requests
 import socket
 import time
-import psutil
-import webbrowser
 import threading
 from pathlib import Path
 
+from utils.lazy import lazy_import
+
+# Loaded on first use - most menu actions never touch the network
+requests = lazy_import("requests")
+psutil = lazy_import("psutil")
+
+from core.fast_copy import sync_tree
+from core.trash import schedule_deletion, is_name_reserved
+from core.storage import get_server_path, choose_root, path_on_root, root_of, get_roots
+from core.disk_usage import get_usage
+from core.jvm_profiles import (
+    PROFILES, parse_ram, build_jvm_args, format_command_line, write_forge_jvm_args
+)
+from core.appcds import prepare_launch, boot_summary
+from core.readiness import watch_boot, log_marker, describe_boot, boot_state
+from core.build_cache import link_cached_build, patch_server_jar, create_build
+from core.jobs import run_in_background, wait_for, copy_stream, current_job
+from core.artifact_mirror import download_artifact, mirror_peers
+from core.rcon import ensure_rcon, rcon_wanted, send_command
+from utils.tracing import traced, annotate, current_span, record_span
+from core.version_catalog import (
+    SERVER_TYPES, validate_version, latest_version, latest_build, fabric_installer, vanilla_metadata_url
+)
+
 DATA_FILE = os.path.join("data", "servers.json")
 
+# How long start_server looks for the launched JVM
+PID_SEARCH_TIMEOUT = 15
+
+# Held by whoever has the world open - the server writes its own
+WORLD_SKIP_FILES = {"session.lock"}
+
 
 
 
 # -------------------- Utility Functions --------------------
 
 server_processes = {}  # Tracks running server processes
+_registry_lock = threading.Lock()  # Background jobs also write servers.json
 
 def select_folder(title):
-    root = tk.Tk()
+    # Tk is only needed here - and isn't there at all on headless hosts
+    try:
+        import tkinter as tk
+        from tkinter import filedialog
+        root = tk.Tk()
+    except Exception:
+        return input(f"{title} (folder path): ").strip().strip('"')
     root.withdraw()   # hide empty tkinter window
     root.attributes('-topmost', True)
 
@@ -43,13 +75,18 @@ def select_folder(title):
 
 
 def import_world(server_name):
-    server_path = f"servers/{server_name}"
+    """
+    Pick world folders to import, then copy them in an "import" job.
+    Returns the Job, or None when nothing was picked.
+    """
+    server_path = get_server_path(server_name)
 
     print("\n🌍 Import World")
     print("1. Import from Singleplayer")
     print("2. Import from Server")
 
     choice = input("> ").strip()
+    copies = []
 
     # ---------- SINGLEPLAYER ----------
     if choice == "1":
@@ -58,15 +95,9 @@ def import_world(server_name):
 
         if not src:
             print("❌ No folder selected")
-            return
+            return None
 
-        dst = os.path.join(server_path, "world")
-
-        if os.path.exists(dst):
-            shutil.rmtree(dst)
-
-        shutil.copytree(src, dst)
-        print("✅ Singleplayer world imported")
+        copies.append((src, "world"))
 
     # ---------- SERVER ----------
     elif choice == "2":
@@ -82,22 +113,22 @@ def import_world(server_name):
 
             if not src:
                 print("❌ Import cancelled")
-                return
-
-            dst = os.path.join(server_path, folder)
-
-            if os.path.exists(dst):
-                shutil.rmtree(dst)
-
-            shutil.copytree(src, dst)
-            print(f"✅ {folder} imported")
+                return None
 
-        print("\n🎉 Server world fully imported")
+            copies.append((src, folder))
 
     else:
         print("❌ Invalid option")
+        return None
 
+    def copy_worlds():
+        for src, folder in copies:
+            sync_tree(src, os.path.join(server_path, folder), skip_names=WORLD_SKIP_FILES, label=f"🌍 {folder}")
+            print(f"✅ {folder} imported")
 
+    job = run_in_background(f"Import world ({server_name})", copy_worlds, job_type="import")
+    print(f"📋 Copying world in the background (job #{job.id})")
+    return job
 
 
 def install_plugin(plugin_key, plugins_dir):
@@ -218,163 +249,168 @@ def get_local_ip():
 
 # -------------------- Plugin Installer --------------------
 
+@traced("download.purpur", "version")
 def download_purpur(version, path):
     """Download Purpur server jar"""
     print(f"⬇ Downloading Purpur {version}...")
     
     try:
-        # Get latest Purpur build for this version
-        api_url = f"https://api.purpurmc.org/v2/purpur/{version}"
-        r = requests.get(api_url, timeout=15)
-        
-        if r.status_code != 200:
-            raise RuntimeError(f"Purpur version '{version}' not found")
-        
-        data = r.json()
-        builds = data.get("builds")
-        
-        if not builds or not builds.get("latest"):
-            raise RuntimeError("No Purpur builds found")
-        
-        latest_build = builds["latest"]
+        # Latest Purpur build for this version, from the catalog when cached
+        build = latest_build("purpur", version)
+        if not build:
+            api_url = f"https://api.purpurmc.org/v2/purpur/{version}"
+            r = requests.get(api_url, timeout=15)
+            
+            if r.status_code != 200:
+                raise RuntimeError(f"Purpur version '{version}' not found")
+            
+            data = r.json()
+            builds = data.get("builds")
+            
+            if not builds or not builds.get("latest"):
+                raise RuntimeError("No Purpur builds found")
+            
+            build = builds["latest"]
+
+        build_key = f"purpur-{version}-{build}"
+        annotate(build=build)
+        if link_cached_build(build_key, path):
+            annotate(cache="hit")
+            print(f"✔ Purpur {version} (build {build}) linked from shared build cache")
+            return
         
         # Download the jar
-        jar_url = f"https://api.purpurmc.org/v2/purpur/{version}/{latest_build}/download"
+        jar_url = f"https://api.purpurmc.org/v2/purpur/{version}/{build}/download"
         
         jar_path = os.path.join(path, "server.jar")
         
-        with requests.get(jar_url, stream=True, timeout=30) as r2:
-            r2.raise_for_status()
-            with open(jar_path, "wb") as f:
-                for chunk in r2.iter_content(8192):
-                    f.write(chunk)
+        # Only LAN peers are looked up by hash - skip the extra request without them
+        hashes = None
+        if mirror_peers():
+            info = requests.get(f"https://api.purpurmc.org/v2/purpur/{version}/{build}", timeout=15)
+            md5 = info.json().get("md5") if info.status_code == 200 else None
+            hashes = {"md5": md5} if md5 else None
+        
+        download_artifact(jar_url, jar_path, hashes)
         
         if os.path.getsize(jar_path) < 10 * 1024 * 1024:
             raise RuntimeError("Downloaded Purpur jar is corrupt")
         
-        print(f"✔ Purpur {version} (build {latest_build}) downloaded")
+        print(f"✔ Purpur {version} (build {build}) downloaded")
+        patch_server_jar(jar_path, build_key, "purpur")
         
     except Exception as e:
         raise RuntimeError(f"Failed to download Purpur: {e}")
 
 
-def install_recommended_purpur_plugins(server_name, mc_version):
-    """Install recommended plugins for Purpur"""
-    plugins_dir = f"servers/{server_name}/plugins"
-    
-    # Purpur uses same plugins as Paper/Spigot
-    print("\nPurpur-compatible plugins (same as Paper):")
-    print("1. ViaVersion")
-    print("2. ViaBackwards")
-    print("3. EssentialsX")
-    print("4. LuckPerms")
-    print("5. Vault")
-    print("6. WorldEdit")
-    
-    choice = input("\nSelect plugins to install (comma-separated): ").strip()
+RECOMMENDED_PURPUR_PLUGINS = {
+    "1": ("ViaVersion", "viaversion"),
+    "2": ("ViaBackwards", "viabackwards"),
+    "3": ("EssentialsX", "essentialsx"),
+    "4": ("LuckPerms", "luckperms"),
+    "5": ("Vault", "vault"),
+    "6": ("WorldEdit", "worldedit")
+}
+
+
+def choose_recommended(title, options, kind="plugins"):
+    """Show a numbered list and return the (name, slug) pairs picked"""
+    print(f"\n{title}")
+    for k, (name, _) in options.items():
+        print(f"{k}. {name}")
+
+    choice = input(f"\nSelect {kind} to install (comma-separated): ").strip()
     if not choice:
-        print("❌ No plugins selected")
-        return
-    
-    purpur_plugins = {
-        "1": ("ViaVersion", "viaversion"),
-        "2": ("ViaBackwards", "viabackwards"),
-        "3": ("EssentialsX", "essentialsx"),
-        "4": ("LuckPerms", "luckperms"),
-        "5": ("Vault", "vault"),
-        "6": ("WorldEdit", "worldedit")
-    }
-    
+        print(f"❌ No {kind} selected")
+        return []
+
+    picked = []
     for c in choice.split(","):
         c = c.strip()
-        if c in purpur_plugins:
-            name, slug = purpur_plugins[c]
-            download_modrinth_plugin(
-                slug,
-                mc_version,
-                "purpur",
-                plugins_dir
-            )
+        if c in options:
+            picked.append(options[c])
         else:
             print(f"⚠ Invalid option: {c}")
+    return picked
+
+
+def install_modrinth_projects(projects, mc_version, loader, target_dir):
+    """Download (name, slug) pairs picked with choose_recommended, returns the slugs that failed"""
+    failed = []
+    for name, slug in projects:
+        if not download_modrinth_plugin(slug, mc_version, loader, target_dir):
+            failed.append(slug)
+    return failed
+
+
+def install_recommended_purpur_plugins(server_name, mc_version):
+    """Install recommended plugins for Purpur"""
+    plugins_dir = os.path.join(get_server_path(server_name), "plugins")
+    
+    # Purpur uses same plugins as Paper/Spigot
+    picked = choose_recommended("Purpur-compatible plugins (same as Paper):", RECOMMENDED_PURPUR_PLUGINS)
+    install_modrinth_projects(picked, mc_version, "purpur", plugins_dir)
 
 
 # ==================== FORGE SUPPORT ====================
 
-def download_forge(version, path):
-    """Download and AUTO-INSTALL Forge server"""
-    print(f"⬇ Downloading Forge {version}...")
+@traced("forge.resolve_version", "version")
+def resolve_forge_version(version):
+    """Full Forge version (e.g. 1.20.1-47.2.0) for a Minecraft version"""
+    # Recommended (or latest) build from the version catalog, no request needed
+    forge_version = latest_build("forge", version)
+    if forge_version:
+        return f"{version}-{forge_version}"
+
+    forge_api = "https://files.minecraftforge.net/net/minecraftforge/forge/promotions_slim.json"
+    r = requests.get(forge_api, timeout=15)
     
-    try:
-        # Get Forge version list
-        forge_api = "https://files.minecraftforge.net/net/minecraftforge/forge/promotions_slim.json"
-        r = requests.get(forge_api, timeout=15)
-        
-        if r.status_code != 200:
-            raise RuntimeError("Could not connect to Forge API")
-        
-        promos = r.json()["promos"]
-        
-        # Try to find recommended version for this MC version
-        forge_version = None
-        
-        # Check for recommended version
-        rec_key = f"{version}-recommended"
-        lat_key = f"{version}-latest"
-        
-        if rec_key in promos:
-            forge_version = promos[rec_key]
-        elif lat_key in promos:
-            forge_version = promos[lat_key]
-        else:
-            print(f"⚠ No direct Forge version found for {version}")
-            print("Trying to find latest compatible version...")
-            
-            # Try to find any version for this MC version
-            for key in promos:
-                if key.startswith(version):
-                    forge_version = promos[key]
-                    break
-            
-            if not forge_version:
-                print(f"❌ No Forge version available for Minecraft {version}")
-                print("\nPlease download Forge manually from:")
-                print(f"https://files.minecraftforge.net/net/minecraftforge/forge/index_{version}.html")
-                raise RuntimeError("Forge version not found")
-        
-        # Construct Forge installer URL
-        forge_full = f"{version}-{forge_version}"
-        installer_url = f"https://maven.minecraftforge.net/net/minecraftforge/forge/{forge_full}/forge-{forge_full}-installer.jar"
-        
-        print(f"📥 Downloading Forge {forge_full} installer...")
-        
-        installer_path = os.path.join(path, "forge-installer.jar")
-        
-        with requests.get(installer_url, stream=True, timeout=60) as r2:
-            r2.raise_for_status()
-            
-            # Download with progress
-            total_size = int(r2.headers.get('content-length', 0))
-            downloaded = 0
-            
-            with open(installer_path, "wb") as f:
-                for chunk in r2.iter_content(8192):
-                    f.write(chunk)
-                    downloaded += len(chunk)
-                    if total_size:
-                        percent = (downloaded / total_size) * 100
-                        print(f"\rDownloading... {percent:.1f}%", end='', flush=True)
-            
-            print()  # New line after progress
-        
-        print("✔ Forge installer downloaded")
-        
-        # ============ AUTO-INSTALL FORGE ============
-        print("\n🔧 Installing Forge server (this may take 2-5 minutes)...")
-        print("⏳ Please wait, do not close PyCraftHub...")
-        
-        abs_path = os.path.abspath(path)
-        
+    if r.status_code != 200:
+        raise RuntimeError("Could not connect to Forge API")
+    
+    promos = r.json()["promos"]
+    
+    # Check for recommended version
+    rec_key = f"{version}-recommended"
+    lat_key = f"{version}-latest"
+    
+    if rec_key in promos:
+        forge_version = promos[rec_key]
+    elif lat_key in promos:
+        forge_version = promos[lat_key]
+    else:
+        ok, message = validate_version("forge", version)
+        print(f"❌ No Forge version available for Minecraft {version}")
+        if message:
+            print(f"💡 {message}")
+        print("\nPlease download Forge manually from:")
+        print(f"https://files.minecraftforge.net/net/minecraftforge/forge/index_{version}.html")
+        raise RuntimeError("Forge version not found")
+    
+    return f"{version}-{forge_version}"
+
+
+@traced("forge.installer", "forge_version")
+def run_forge_installer(forge_full, install_dir, verbose=True):
+    """Download the Forge installer into install_dir and run --installServer there"""
+    installer_url = f"https://maven.minecraftforge.net/net/minecraftforge/forge/{forge_full}/forge-{forge_full}-installer.jar"
+    
+    print(f"📥 Downloading Forge {forge_full} installer...")
+    
+    installer_path = os.path.join(install_dir, "forge-installer.jar")
+    
+    # Download with progress (shown in the Jobs menu when running as a job)
+    download_artifact(installer_url, installer_path, timeout=60, label="Downloading..." if verbose else None)
+    
+    print("✔ Forge installer downloaded")
+    
+    # ============ AUTO-INSTALL FORGE ============
+    print("\n🔧 Installing Forge server (this may take 2-5 minutes)...")
+    print("⏳ Please wait, do not close PyCraftHub...")
+    
+    abs_path = os.path.abspath(install_dir)
+    
+    if verbose:
         # Run the installer
         install_process = subprocess.Popen(
             ["java", "-jar", "forge-installer.jar", "--installServer"],
@@ -402,39 +438,78 @@ def download_forge(version, path):
             print(f"\n❌ Forge installation failed!")
             print(f"Error: {error_output}")
             raise RuntimeError("Forge installation failed")
+    else:
+        try:
+            result = subprocess.run(
+                ["java", "-jar", "forge-installer.jar", "--installServer"],
+                cwd=abs_path,
+                capture_output=True,
+                text=True,
+                timeout=300  # 5 minute timeout
+            )
+        except subprocess.TimeoutExpired:
+            raise RuntimeError("Installation timeout - took too long")
         
-        # Verify installation
-        if not os.path.exists(os.path.join(abs_path, "libraries")):
-            raise RuntimeError("Forge installation incomplete - libraries folder not found")
-        
-        # Check if run.bat was created
-        if not os.path.exists(os.path.join(abs_path, "run.bat")):
-            # Try to find the forge jar and create run.bat manually
-            forge_jar = None
-            for file in os.listdir(abs_path):
-                if file.startswith("forge") and file.endswith(".jar") and "installer" not in file:
-                    forge_jar = file
-                    break
-            
-            if forge_jar:
-                # Create run.bat manually
-                with open(os.path.join(abs_path, "run.bat"), "w") as f:
-                    f.write('@echo off\n')
-                    f.write(f'java -jar {forge_jar} %*\n')
-                print("✔ Created run.bat manually")
-            else:
-                raise RuntimeError("Could not find Forge server jar")
-        
-        print("\n✔ Forge server installed successfully!")
-        print(f"✔ Server ready to start")
+        if result.returncode != 0:
+            raise RuntimeError(f"Installation failed: {result.stderr}")
+    
+    # Verify installation
+    if not os.path.exists(os.path.join(abs_path, "libraries")):
+        raise RuntimeError("Forge installation incomplete - libraries folder not found")
+    
+    # Check if run.bat was created
+    if not os.path.exists(os.path.join(abs_path, "run.bat")):
+        # Try to find the forge jar and create run.bat manually
+        forge_jar = None
+        for file in os.listdir(abs_path):
+            if file.startswith("forge") and file.endswith(".jar") and "installer" not in file:
+                forge_jar = file
+                break
         
-        # Clean up installer
+        if forge_jar:
+            # Create run.bat manually
+            with open(os.path.join(abs_path, "run.bat"), "w") as f:
+                f.write('@echo off\n')
+                f.write(f'java -jar {forge_jar} %*\n')
+            print("✔ Created run.bat manually")
+        else:
+            raise RuntimeError("Could not find Forge server jar")
+    
+    # Clean up installer
+    for leftover in ("forge-installer.jar", "forge-installer.jar.log", "installer.log"):
         try:
-            os.remove(installer_path)
-            print("✔ Cleaned up installer")
-        except:
+            os.remove(os.path.join(abs_path, leftover))
+        except OSError:
             pass
-        
+
+
+@traced("download.forge", "version")
+def install_forge(version, path, verbose=True):
+    """
+    Install Forge into a server folder. The installer runs once per Forge
+    version into the shared build cache; every server after that gets
+    libraries/, run.sh/run.bat and user_jvm_args.txt as hardlinks.
+    """
+    forge_full = resolve_forge_version(version)
+    build_key = f"forge-{forge_full}"
+    
+    annotate(forge_version=forge_full)
+    if link_cached_build(build_key, path):
+        annotate(cache="hit")
+        print(f"✔ Forge {forge_full} linked from shared install cache")
+        return
+    
+    create_build(path, build_key, lambda tmp: run_forge_installer(forge_full, tmp, verbose))
+    print("\n✔ Forge server installed successfully!")
+    print(f"✔ Server ready to start")
+
+
+def download_forge(version, path):
+    """Download and AUTO-INSTALL Forge server"""
+    print(f"⬇ Downloading Forge {version}...")
+    
+    try:
+        install_forge(version, path)
     except Exception as e:
         raise RuntimeError(f"Failed to setup Forge: {e}")
 
@@ -449,69 +524,8 @@ def download_forge_silent(version, path):
     print(f"⬇ Downloading Forge {version}...")
     
     try:
-        # Get Forge version
-        forge_api = "https://files.minecraftforge.net/net/minecraftforge/forge/promotions_slim.json"
-        r = requests.get(forge_api, timeout=15)
-        
-        if r.status_code != 200:
-            raise RuntimeError("Could not connect to Forge API")
-        
-        promos = r.json()["promos"]
-        
-        rec_key = f"{version}-recommended"
-        lat_key = f"{version}-latest"
-        
-        if rec_key in promos:
-            forge_version = promos[rec_key]
-        elif lat_key in promos:
-            forge_version = promos[lat_key]
-        else:
-            raise RuntimeError(f"No Forge version for Minecraft {version}")
-        
-        forge_full = f"{version}-{forge_version}"
-        installer_url = f"https://maven.minecraftforge.net/net/minecraftforge/forge/{forge_full}/forge-{forge_full}-installer.jar"
-        
-        installer_path = os.path.join(path, "forge-installer.jar")
-        
-        # Download
-        with requests.get(installer_url, stream=True, timeout=60) as r2:
-            r2.raise_for_status()
-            with open(installer_path, "wb") as f:
-                for chunk in r2.iter_content(8192):
-                    f.write(chunk)
-        
-        print("✔ Installer downloaded")
-        
-        # Install
-        print("🔧 Installing Forge (please wait 2-5 minutes)...")
-        
-        abs_path = os.path.abspath(path)
-        
-        result = subprocess.run(
-            ["java", "-jar", "forge-installer.jar", "--installServer"],
-            cwd=abs_path,
-            capture_output=True,
-            text=True,
-            timeout=300  # 5 minute timeout
-        )
-        
-        if result.returncode != 0:
-            raise RuntimeError(f"Installation failed: {result.stderr}")
-        
-        # Verify
-        if not os.path.exists(os.path.join(abs_path, "libraries")):
-            raise RuntimeError("Installation incomplete")
-        
+        install_forge(version, path, verbose=False)
         print("✔ Forge installed!")
-        
-        # Cleanup
-        try:
-            os.remove(installer_path)
-        except:
-            pass
-            
-    except subprocess.TimeoutExpired:
-        raise RuntimeError("Installation timeout - took too long")
     except Exception as e:
         raise RuntimeError(f"Failed to setup Forge: {e}")
 
@@ -525,44 +539,40 @@ def setup_forge_dirs(server_dir):
     config_dir.mkdir(parents=True, exist_ok=True)
 
 
+RECOMMENDED_FORGE_MODS = {
+    "1": ("JEI (Just Enough Items)", "jei"),
+    "2": ("JourneyMap", "journeymap"),
+    "3": ("Biomes O' Plenty", "biomes-o-plenty"),
+    "4": ("Create", "create"),
+    "5": ("Applied Energistics 2", "applied-energistics-2"),
+    "6": ("Tinkers' Construct", "tinkers-construct")
+}
+
+
 def install_recommended_forge_mods(server_name, mc_version):
     """Install recommended Forge mods"""
-    mods_dir = f"servers/{server_name}/mods"
-    
-    print("\nRecommended Forge mods:")
-    print("1. JEI (Just Enough Items)")
-    print("2. JourneyMap")
-    print("3. Biomes O' Plenty")
-    print("4. Create")
-    print("5. Applied Energistics 2")
-    print("6. Tinkers' Construct")
+    mods_dir = os.path.join(get_server_path(server_name), "mods")
     
-    choice = input("\nSelect mods to install (comma-separated): ").strip()
-    if not choice:
-        print("❌ No mods selected")
-        return
-    
-    forge_mods = {
-        "1": ("JEI", "jei"),
-        "2": ("JourneyMap", "journeymap"),
-        "3": ("Biomes O' Plenty", "biomes-o-plenty"),
-        "4": ("Create", "create"),
-        "5": ("Applied Energistics 2", "applied-energistics-2"),
-        "6": ("Tinkers' Construct", "tinkers-construct")
-    }
+    picked = choose_recommended("Recommended Forge mods:", RECOMMENDED_FORGE_MODS, "mods")
+    install_modrinth_projects(picked, mc_version, "forge", mods_dir)
+
+
+RECOMMENDED_FABRIC_MODS = {
+    "1": ("Lithium (game logic)", "lithium"),
+    "2": ("FerriteCore (memory)", "ferrite-core"),
+    "3": ("Krypton (networking)", "krypton"),
+    "4": ("C2ME (chunk generation)", "c2me-fabric"),
+    "5": ("ModernFix", "modernfix"),
+    "6": ("Chunky (pre-generation)", "chunky")
+}
+
+
+def install_recommended_fabric_mods(server_name, mc_version):
+    """Install recommended Fabric performance mods"""
+    mods_dir = os.path.join(get_server_path(server_name), "mods")
     
-    for c in choice.split(","):
-        c = c.strip()
-        if c in forge_mods:
-            name, slug = forge_mods[c]
-            download_modrinth_plugin(
-                slug,
-                mc_version,
-                "forge",
-                mods_dir
-            )
-        else:
-            print(f"⚠ Invalid option: {c}")
+    picked = choose_recommended("Recommended Fabric mods:", RECOMMENDED_FABRIC_MODS, "mods")
+    install_modrinth_projects(picked, mc_version, "fabric", mods_dir)
 
 
 def download_fabric(version, path):
@@ -590,8 +600,7 @@ def download_fabric(version, path):
 
     jar_path = Path(path) / "fabric-server-launch.jar"
     with open(jar_path, "wb") as f:
-        for chunk in r.iter_content(8192):
-            f.write(chunk)
+        copy_stream(r, f)
 
     print("✔ Fabric server downloaded")
 
@@ -600,6 +609,7 @@ def setup_fabric_dirs(server_dir):
     mods_dir.mkdir(parents=True, exist_ok=True)
 
 
+@traced("download.fabric_api", "version")
 def install_fabric_api(version, mods_dir):
     print("⬇ Installing Fabric API...")
 
@@ -612,11 +622,7 @@ def install_fabric_api(version, mods_dir):
             download_url = file["url"]
 
             path = Path(mods_dir) / file["filename"]
-            r = requests.get(download_url, stream=True)
-
-            with open(path, "wb") as f:
-                for chunk in r.iter_content(8192):
-                    f.write(chunk)
+            download_artifact(download_url, str(path), file.get("hashes"))
 
             print("✔ Fabric API installed")
             return
@@ -625,6 +631,7 @@ def install_fabric_api(version, mods_dir):
 
 
 
+@traced("download.modrinth", "project", "mc_version", "loader")
 def download_modrinth_plugin(project_slug, mc_version, loader, target_dir):
     os.makedirs(target_dir, exist_ok=True)
 
@@ -637,7 +644,7 @@ def download_modrinth_plugin(project_slug, mc_version, loader, target_dir):
     r = requests.get(api_url, timeout=15)
     if r.status_code != 200 or not r.json():
         print(f"❌ No compatible version found for {project_slug}")
-        return
+        return False
 
     version_data = r.json()[0]
     file = version_data["files"][0]
@@ -645,17 +652,15 @@ def download_modrinth_plugin(project_slug, mc_version, loader, target_dir):
     filename = file["filename"]
     download_url = file["url"]
 
+    annotate(file=filename)
     if is_already_installed(filename, target_dir):
+        annotate(cache="installed")
         print(f"✔ {filename} already installed, skipping")
-        return
+        return True
 
     # ---------------- DOWNLOAD MAIN MOD ----------------
     print(f"⬇ Downloading {filename}...")
-    with requests.get(download_url, stream=True) as d:
-        d.raise_for_status()
-        with open(os.path.join(target_dir, filename), "wb") as f:
-            for chunk in d.iter_content(8192):
-                f.write(chunk)
+    download_artifact(download_url, os.path.join(target_dir, filename), file.get("hashes"))
 
     print(f"✔ Installed {filename}")
 
@@ -688,6 +693,7 @@ def download_modrinth_plugin(project_slug, mc_version, loader, target_dir):
             target_dir
         )
 
+    return True
 
 
 def get_installed_files(target_dir):
@@ -709,9 +715,9 @@ def list_installed_mods(server_name):
         return
 
     if server["type"] == "paper":
-        target_dir = f"servers/{server_name}/plugins"
+        target_dir = os.path.join(get_server_path(server_name), "plugins")
     elif server["type"] == "fabric":
-        target_dir = f"servers/{server_name}/mods"
+        target_dir = os.path.join(get_server_path(server_name), "mods")
     else:
         print("⚠ Vanilla has no mods/plugins")
         return
@@ -732,9 +738,9 @@ def remove_mod_plugin(server_name):
     server = data.get(server_name)
 
     if server["type"] == "paper":
-        target_dir = f"servers/{server_name}/plugins"
+        target_dir = os.path.join(get_server_path(server_name), "plugins")
     elif server["type"] == "fabric":
-        target_dir = f"servers/{server_name}/mods"
+        target_dir = os.path.join(get_server_path(server_name), "mods")
     else:
         return
 
@@ -764,10 +770,10 @@ def update_mod_plugin(server_name):
     server = data.get(server_name)
 
     if server["type"] == "paper":
-        target_dir = f"servers/{server_name}/plugins"
+        target_dir = os.path.join(get_server_path(server_name), "plugins")
         loader = "paper"
     elif server["type"] == "fabric":
-        target_dir = f"servers/{server_name}/mods"
+        target_dir = os.path.join(get_server_path(server_name), "mods")
         loader = "fabric"
     else:
         return
@@ -832,9 +838,9 @@ def mod_plugin_search_menu(server_name):
     mc_version = server["version"]
 
     if loader == "paper":
-        target_dir = f"servers/{server_name}/plugins"
+        target_dir = os.path.join(get_server_path(server_name), "plugins")
     elif loader == "fabric":
-        target_dir = f"servers/{server_name}/mods"
+        target_dir = os.path.join(get_server_path(server_name), "mods")
     else:
         print("⚠ Mods/plugins not supported on Vanilla")
         return
@@ -900,7 +906,7 @@ def mod_plugin_search_menu(server_name):
 
 
 def download_plugin_from_url(url, server_name, filename):
-    plugins_dir = f"servers/{server_name}/plugins"
+    plugins_dir = os.path.join(get_server_path(server_name), "plugins")
     os.makedirs(plugins_dir, exist_ok=True)
 
     print(f"⬇ Downloading {filename}...")
@@ -909,20 +915,104 @@ def download_plugin_from_url(url, server_name, filename):
 
     path = os.path.join(plugins_dir, filename)
     with open(path, "wb") as f:
-        for chunk in r.iter_content(8192):
-            f.write(chunk)
+        copy_stream(r, f)
 
     print(f"✔ Installed {filename}")
 
 
 
+def ask_jvm_profile(server):
+    """Let the user pin a JVM profile or go back to automatic selection"""
+    current = server.get("jvm_profile", "auto")
+    auto_choice, _ = build_jvm_args(dict(server, jvm_profile="auto"))
+    print(f"\nCurrent: {current} (auto would pick: {auto_choice})")
+    print("1. auto  - Pick from heap size, CPU cores and Java version")
+    print("2. aikar - G1 with Aikar's flags (most servers)")
+    print("3. zgc   - Generational ZGC, big heaps on Java 21+")
+    print("4. small - G1 tuned for small heaps / few cores")
+    print("5. none  - Only -Xms/-Xmx")
+
+    choice = input("> ").strip()
+    choices = dict(zip("12345", ("auto",) + PROFILES))
+    if choice in choices:
+        server["jvm_profile"] = choices[choice]
+        print(f"✔ JVM profile: {server['jvm_profile']}")
+
+    extra = input("Extra JVM flags (ENTER to keep current): ").strip()
+    if extra:
+        server["jvm_args"] = extra.split()
+
+
+def ask_version(jar_type):
+    """Ask for a Minecraft version until the version catalog accepts it"""
+    latest = latest_version(jar_type)
+    example = latest or "1.21.4"
+    while True:
+        version = input(f"Enter Minecraft version (e.g., {example}): ").strip()
+        if not version and latest:
+            version = latest
+            print(f"✔ Using latest: {version}")
+
+        ok, message = validate_version(jar_type, version)
+        if ok:
+            return version
+        print(f"❌ {message}")
+
+
+def start_server_download(jar_type, version, path):
+    """Background job that puts the server software into path"""
+    downloaders = {
+        "paper": download_paper,
+        "purpur": download_purpur,
+        "vanilla": download_vanilla,
+        "fabric": download_fabric,
+        "forge": download_forge,
+    }
+
+    def download():
+        downloaders[jar_type](version, path)
+        if jar_type == "fabric":
+            setup_fabric_dirs(path)
+
+    return run_in_background(f"{jar_type.capitalize()} {version}", download, job_type="download")
+
+
+def write_server_properties(path, port, online_mode, render_distance, difficulty,
+                            world_type="default", hardcore=False, seed=None):
+    """First server.properties of a new server"""
+    with open(f"{path}/server.properties", "w") as f:
+        f.write(f"server-port={port}\n")
+        f.write(f"online-mode={online_mode}\n")
+        f.write(f"render-distance={render_distance}\n")
+        f.write(f"view-distance={render_distance}\n")
+        f.write(f"difficulty={difficulty}\n")
+        f.write(f"level-type={world_type}\n")
+        if hardcore:
+            f.write("hardcore=true\n")
+        if seed:
+            f.write(f"level-seed={seed}\n")
+
+
+def abort_creation(path, jobs):
+    """Let running jobs finish writing, then remove the half-created server"""
+    wait_for(jobs)
+    shutil.rmtree(path, ignore_errors=True)
+
+
+@traced("server.create")
 def create_server():
     server_name = input("Server name: ").strip()
-    path = f"servers/{server_name}"
 
-    if os.path.exists(path):
+    if os.path.exists(get_server_path(server_name)):
         print("❌ Server already exists")
         return
+    if is_name_reserved(server_name):
+        print("❌ A deleted server of this name is still waiting to be removed")
+        return
+
+    # Most free space on the least busy disk
+    storage_root = choose_root()
+    path = path_on_root(storage_root, server_name)
 
     # ---------------- SERVER TYPE (UPDATED) ----------------
     print("\n🎮 Select server type:")
@@ -946,8 +1036,60 @@ def create_server():
         print("❌ Invalid choice")
         return
 
+    version = ask_version(jar_type)
+    annotate(server=server_name, type=jar_type, version=version)
+
+    # ---------------- CREATE FOLDERS ----------------
+    os.makedirs(path)
+    os.makedirs(f"{path}/logs")
+    os.makedirs(f"{path}/plugins")
+    os.makedirs(f"{path}/mods", exist_ok=True)
+
+    # ---------------- DOWNLOAD SERVER JAR ----------------
+    # Runs while the rest of the questions are answered
+    download = start_server_download(jar_type, version, path)
+    jobs = [download]
+    print(f"⬇ Downloading {jar_type.capitalize()} {version} in the background...")
+
+    # ---------------- MODS / PLUGINS ----------------
+    # Each download starts as soon as it is picked
+    if jar_type == "fabric":
+        if input("Install Fabric API? (y/n): ").strip().lower() == "y":
+            jobs.append(run_in_background("Fabric API", install_fabric_api, version, f"{path}/mods",
+                                          job_type="download"))
+        if input("Install recommended Fabric mods? (y/n): ").strip().lower() == "y":
+            picked = choose_recommended("Recommended Fabric mods:", RECOMMENDED_FABRIC_MODS, "mods")
+            if picked:
+                jobs.append(run_in_background("Fabric mods", install_modrinth_projects,
+                                              picked, version, "fabric", f"{path}/mods", job_type="download"))
+    elif jar_type == "forge":
+        if input("Install recommended Forge mods? (y/n): ").strip().lower() == "y":
+            picked = choose_recommended("Recommended Forge mods:", RECOMMENDED_FORGE_MODS, "mods")
+            if picked:
+                jobs.append(run_in_background("Forge mods", install_modrinth_projects,
+                                              picked, version, "forge", f"{path}/mods", job_type="download"))
+    elif jar_type in ["paper", "purpur"]:
+        if input("Install Geyser for Bedrock? (y/n): ").strip().lower() == "y":
+            jobs.append(run_in_background("Geyser + Floodgate", install_geyser, server_name, job_type="download"))
+
+        if input("Install recommended plugins? (y/n): ").strip().lower() == "y":
+            if jar_type == "paper":
+                picked = choose_recommended("Select plugins to install:", RECOMMENDED_PLUGINS)
+            else:
+                picked = choose_recommended("Purpur-compatible plugins (same as Paper):", RECOMMENDED_PURPUR_PLUGINS)
+            if picked:
+                jobs.append(run_in_background("Plugins", install_modrinth_projects,
+                                              picked, version, jar_type, f"{path}/plugins", job_type="download"))
+
     # ---------------- BASIC OPTIONS ----------------
     ram = select_ram()
+
+    # No point asking the rest if the version doesn't exist
+    if download.done and download.error:
+        print(f"❌ Failed to download server: {download.error}")
+        abort_creation(path, jobs)
+        return
+
     description = ask_description()
     render_distance = ask_render_distance()
     difficulty = ask_difficulty()
@@ -967,49 +1109,24 @@ def create_server():
     else:
         print("✔ Only premium players allowed (online-mode=true)")
 
-    version = input("Enter Minecraft version (e.g., 1.21.4): ").strip()
-
-    # ---------------- CREATE FOLDERS ----------------
-    os.makedirs(path)
-    os.makedirs(f"{path}/logs")
-    os.makedirs(f"{path}/plugins")
-    os.makedirs(f"{path}/mods", exist_ok=True)
-
-    # ---------------- DOWNLOAD SERVER JAR ----------------
-    try:
-       if jar_type == "paper":
-           download_paper(version, path)
-       elif jar_type == "purpur":
-           download_purpur(version, path)
-       elif jar_type == "vanilla":
-           download_vanilla(version, path)
-       elif jar_type == "fabric":
-           download_fabric(version, path)
-           setup_fabric_dirs(path)
-           if input("Install Fabric API? (y/n): ").strip().lower() == "y":
-               install_fabric_api(version, f"{path}/mods")
-           if input("Install recommended Fabric mods? (y/n): ").strip().lower() == "y":
-               install_recommended_fabric_mods(server_name, version)
-       elif jar_type == "forge":
-           download_forge(version, path)
-           os.makedirs(f"{path}/mods", exist_ok=True)
-           if input("Install recommended Forge mods? (y/n): ").strip().lower() == "y":
-               install_recommended_forge_mods(server_name, version)
-
-    except Exception as e:
-        print(f"❌ Failed to download server: {e}")
-        shutil.rmtree(path)
-        return
+    # ---------------- server.properties ----------------
+    port = get_free_port()
 
-    # ---------------- ACCEPT EULA ----------------
-    with open(f"{path}/eula.txt", "w") as f:
-        f.write("eula=true")
+    # Ask for world type (optional advanced setting)
+    if input("\nConfigure world type? (y/n): ").strip().lower() == "y":
+        world_type = ask_world_type()
+    else:
+        world_type = "default"
+    
+    write_server_properties(path, port, online_mode, render_distance, difficulty, world_type, hardcore)
 
-    # ---------------- SAVE SERVER CONFIG (IMPORTANT) ----------------
-    data = load_data()
-    port = get_free_port()
+    # ---------------- WORLD SETUP ----------------
+    world_import = setup_world(server_name)
+    if world_import:
+        jobs.append(world_import)
 
-    data[server_name] = {
+    # ---------------- WAIT FOR DOWNLOADS ----------------
+    server = {
         "ram": ram,
         "jar": "fabric-server-launch.jar" if jar_type == "fabric" else "server.jar",
         "port": port,
@@ -1019,53 +1136,219 @@ def create_server():
         "difficulty": difficulty,
         "hardcore": hardcore,
         "version": version,
-        "online_mode": online_mode
+        "online_mode": online_mode,
+        "storage_root": storage_root
     }
 
-    save_data(data)  # 🔥 MUST happen BEFORE plugins
+    if any(not j.done for j in jobs):
+        print()
+        if input("Downloads still running - wait here? (y/n, n = finish in background): ").strip().lower() == "n":
+            job = run_in_background(f"Create {server_name}", finish_server_creation,
+                                    server_name, server, jobs, job_type="create")
+            print(f"📋 '{server_name}' will be ready when job #{job.id} finishes (see Jobs menu)")
+            return
 
-    # ---------------- server.properties ----------------
-    # Ask for world type (optional advanced setting)
-    if input("\nConfigure world type? (y/n): ").strip().lower() == "y":
-        world_type = ask_world_type()
-    else:
-        world_type = "default"
-    
-    with open(f"{path}/server.properties", "w") as f:
-        f.write(f"server-port={port}\n")
-        f.write(f"online-mode={online_mode}\n")
-        f.write(f"render-distance={render_distance}\n")
-        f.write(f"view-distance={render_distance}\n")
-        f.write(f"difficulty={difficulty}\n")
-        f.write(f"level-type={world_type}\n")
-        if hardcore:
-            f.write("hardcore=true\n")
+    print()
+    if not finish_server_creation(server_name, server, jobs):
+        return
 
-    # ---------------- WORLD SETUP ----------------
-    setup_world(server_name)
+    if jar_type in ["paper", "purpur", "fabric", "forge"]:
+       if input("Search & install mods/plugins now? (y/n): ").lower() == "y":
+           mod_plugin_search_menu(server_name)
 
-    # ---------------- PAPER EXTRAS ----------------
-    if jar_type in ["paper", "purpur"]:
-        if input("Install Geyser for Bedrock? (y/n): ").strip().lower() == "y":
-            install_geyser(server_name)
 
-        if input("Install recommended plugins? (y/n): ").strip().lower() == "y":
-            if jar_type == "paper":
-                install_recommended_plugins(server_name, version)
-            elif jar_type == "purpur":
-                install_recommended_purpur_plugins(server_name, version)
+@traced("server.create.finish", "server")
+def finish_server_creation(server_name, server, jobs):
+    """
+    Last step of create_server: wait for its downloads, then accept the
+    EULA and register the server. Returns False if the download failed.
+    """
+    path = get_server_path(server_name)
+    wait_for(jobs)
+    download = jobs[0]
+    if download.error:
+        print(f"❌ Failed to download server: {download.error}")
+        shutil.rmtree(path, ignore_errors=True)
+        if current_job():
+            raise RuntimeError(f"Server download failed: {download.error}")
+        return False
+
+    # ---------------- ACCEPT EULA ----------------
+    with open(f"{path}/eula.txt", "w") as f:
+        f.write("eula=true")
+
+    # ---------------- SAVE SERVER CONFIG (IMPORTANT) ----------------
+    # Several creations can finish at once
+    with _registry_lock:
+        data = load_data()
+        data[server_name] = server
+        save_data(data)
+
     # ---------------- DONE ----------------
-    print(f"\n✔ {jar_type.upper()} server '{server_name}' created successfully!")
-    print(f"🖥 Local join address: {get_local_ip()}:{port}")
+    print(f"\n✔ {server['type'].upper()} server '{server_name}' created successfully!")
+    print(f"🖥 Local join address: {get_local_ip()}:{server['port']}")
     
-    if online_mode == "false":
+    if server["online_mode"] == "false":
         print("🔓 Cracked players can join (online-mode is disabled)")
 
-    if jar_type in ["paper", "purpur", "fabric", "forge"]:
-       if input("Search & install mods/plugins now? (y/n): ").lower() == "y":
-           mod_plugin_search_menu(server_name)
+    notify_server_created(server_name, server["type"], server["version"])
+    return True
+
 
-    notify_server_created(server_name, jar_type, version)
+DIFFICULTIES = ("peaceful", "easy", "normal", "hard", "hardcore")
+WORLD_TYPES = ("default", "flat", "large_biomes", "amplified")
+
+
+def validate_server_name(server_name):
+    """Raise ValueError for a name that can't be a folder under a storage root"""
+    if not server_name:
+        raise ValueError("Server name is required")
+    if any(c in server_name for c in "/\\:") or ".." in server_name or server_name.startswith("."):
+        raise ValueError(f"Invalid server name '{server_name}' (no path separators, ':' or '..')")
+
+
+def validate_spec(spec):
+    """
+    Check every answer of a create spec without touching the disk.
+    Raises ValueError for a bad one, returns the answers with defaults
+    filled in (see create_server_from_spec).
+    """
+    server_name = str(spec.get("name") or "").strip()
+    validate_server_name(server_name)
+
+    jar_type = spec.get("type", "paper")
+    if jar_type not in SERVER_TYPES:
+        raise ValueError(f"Unknown server type '{jar_type}' (use {', '.join(SERVER_TYPES)})")
+
+    version = spec.get("version") or latest_version(jar_type)
+    if not version:
+        raise ValueError("No version given and the version catalog isn't loaded yet")
+    ok, message = validate_version(jar_type, version)
+    if not ok:
+        raise ValueError(message)
+
+    ram = str(spec.get("ram", "2G")).upper()
+    parse_ram(ram)
+
+    try:
+        render_distance = int(spec.get("render_distance", 10))
+    except (TypeError, ValueError):
+        raise ValueError(f"Invalid render distance '{spec.get('render_distance')}' (use a number)")
+    if not 2 <= render_distance <= 32:
+        raise ValueError(f"Render distance must be between 2 and 32, not {render_distance}")
+
+    difficulty = spec.get("difficulty", "normal")
+    if difficulty not in DIFFICULTIES:
+        raise ValueError(f"Unknown difficulty '{difficulty}' (use {', '.join(DIFFICULTIES)})")
+
+    world_type = spec.get("world_type", "default")
+    if world_type not in WORLD_TYPES:
+        raise ValueError(f"Unknown world type '{world_type}' (use {', '.join(WORLD_TYPES)})")
+
+    world = spec.get("world")
+    if world and not os.path.isdir(world):
+        raise ValueError(f"World folder not found: {world}")
+
+    mods = list(spec.get("mods") or [])
+    if mods and jar_type == "vanilla":
+        raise ValueError("Vanilla servers can't have mods or plugins")
+
+    storage_root = spec.get("storage_root")
+    if storage_root and storage_root not in get_roots():
+        raise ValueError(f"Unknown storage root '{storage_root}' (use {', '.join(get_roots())})")
+
+    return dict(spec, name=server_name, type=jar_type, version=version, ram=ram,
+                render_distance=render_distance, difficulty=difficulty, world_type=world_type,
+                world=world, mods=mods, storage_root=storage_root)
+
+
+@traced("server.create")
+def create_server_from_spec(spec):
+    """
+    create_server without prompts (used by cli.py). Every wizard answer
+    comes from the spec dict:
+
+        name, type ("paper"), version (latest), ram ("2G"), description,
+        render_distance (10), difficulty ("normal", or "hardcore"),
+        cracked (False), world_type ("default"), seed, world (singleplayer
+        world folder to import), fabric_api (True), mods (Modrinth slugs),
+        geyser (False), storage_root (picked automatically)
+
+    Raises ValueError for a bad spec (checked before anything is written)
+    and RuntimeError when the server download fails. Returns the
+    servers.json entry.
+    """
+    spec = validate_spec(spec)
+    server_name, jar_type, version = spec["name"], spec["type"], spec["version"]
+    if os.path.exists(get_server_path(server_name)) or server_name in load_data():
+        raise ValueError(f"Server '{server_name}' already exists")
+    if is_name_reserved(server_name):
+        raise ValueError(f"A deleted server '{server_name}' is still waiting to be removed")
+    annotate(server=server_name, type=jar_type, version=version)
+
+    ram, render_distance, world_type = spec["ram"], spec["render_distance"], spec["world_type"]
+    world, mods = spec["world"], spec["mods"]
+    difficulty = spec["difficulty"]
+    hardcore = difficulty == "hardcore"
+    if hardcore:
+        difficulty = "hard"
+
+    storage_root = spec["storage_root"] or choose_root()
+    path = path_on_root(storage_root, server_name)
+    if os.path.exists(path):
+        raise ValueError(f"Server '{server_name}' already exists")
+
+    os.makedirs(path)
+    os.makedirs(f"{path}/logs")
+    os.makedirs(f"{path}/plugins")
+    os.makedirs(f"{path}/mods", exist_ok=True)
+
+    jobs = [start_server_download(jar_type, version, path)]
+    if jar_type == "fabric" and spec.get("fabric_api", True):
+        jobs.append(run_in_background("Fabric API", install_fabric_api, version, f"{path}/mods",
+                                      job_type="download"))
+    if jar_type in ["paper", "purpur"] and spec.get("geyser"):
+        jobs.append(run_in_background("Geyser + Floodgate", install_geyser, server_name, job_type="download"))
+    if mods:
+        target = f"{path}/plugins" if jar_type in ["paper", "purpur"] else f"{path}/mods"
+        jobs.append(run_in_background("Mods/plugins", install_modrinth_projects,
+                                      [(slug, slug) for slug in mods], version, jar_type, target,
+                                      job_type="download"))
+    if world:
+        jobs.append(run_in_background(f"Import world ({server_name})", sync_tree, world,
+                                      os.path.join(path, "world"), skip_names=WORLD_SKIP_FILES,
+                                      label="🌍 world", job_type="import"))
+
+    online_mode = "false" if spec.get("cracked") else "true"
+    port = get_free_port()
+    write_server_properties(path, port, online_mode, render_distance, difficulty,
+                            world_type, hardcore, spec.get("seed"))
+
+    server = {
+        "ram": ram,
+        "jar": "fabric-server-launch.jar" if jar_type == "fabric" else "server.jar",
+        "port": port,
+        "type": jar_type,
+        "description": spec.get("description", ""),
+        "render_distance": render_distance,
+        "difficulty": difficulty,
+        "hardcore": hardcore,
+        "version": version,
+        "online_mode": online_mode,
+        "storage_root": storage_root
+    }
+
+    try:
+        created = finish_server_creation(server_name, server, jobs)
+    except RuntimeError:
+        created = False
+    if not created:
+        raise RuntimeError(f"Failed to download {jar_type} {version}: {jobs[0].error}")
+
+    mods_job = next((j for j in jobs if j.name == "Mods/plugins"), None)
+    if mods_job and not mods_job.error and mods_job.result():
+        print(f"⚠ Not installed (no compatible version): {', '.join(mods_job.result())}")
+    return server
 
 
 # ============================================================
@@ -1078,6 +1361,8 @@ def setup_world(server_name):
     1. Import existing world
     2. Set a custom seed
     3. Random seed (do nothing)
+
+    Returns the world import Job when one was started.
     """
     print("\n🌍 World Setup")
     print("1. Import existing world")
@@ -1087,15 +1372,15 @@ def setup_world(server_name):
     choice = input("> ").strip()
     
     if choice == "1":
-        # Import world
-        import_world(server_name)
+        # Import world (copied in the background)
+        return import_world(server_name)
         
     elif choice == "2":
         # Set custom seed
         seed = input("Enter world seed: ").strip()
         
         if seed:
-            server_path = f"servers/{server_name}"
+            server_path = get_server_path(server_name)
             props_file = os.path.join(server_path, "server.properties")
             
             # Read existing properties
@@ -1172,29 +1457,10 @@ def install_recommended_plugins(server_name, mc_version):
         return
 
     
-    plugins_dir = f"servers/{server_name}/plugins"
+    plugins_dir = os.path.join(get_server_path(server_name), "plugins")
 
-    print("\nSelect plugins to install (comma-separated):")
-    for k, (name, _) in RECOMMENDED_PLUGINS.items():
-        print(f"{k}. {name}")
-
-    choice = input("> ").strip()
-    if not choice:
-        print("❌ No plugins selected")
-        return
-
-    for c in choice.split(","):
-        c = c.strip()
-        if c in RECOMMENDED_PLUGINS:
-            name, slug = RECOMMENDED_PLUGINS[c]
-            download_modrinth_plugin(
-                slug,
-                mc_version,
-                "paper",
-                plugins_dir
-            )
-        else:
-            print(f"⚠ Invalid option: {c}")
+    picked = choose_recommended("Select plugins to install:", RECOMMENDED_PLUGINS)
+    install_modrinth_projects(picked, mc_version, "paper", plugins_dir)
 
 
 
@@ -1213,7 +1479,7 @@ def install_geyser(server_name, bedrock_port="19132"):
         server_name: Name of your server folder inside 'servers/'
         bedrock_port: Port for Bedrock clients to connect
     """
-    server_path = f"servers/{server_name}"
+    server_path = get_server_path(server_name)
     plugins_path = os.path.join(server_path, "plugins")
     os.makedirs(plugins_path, exist_ok=True)
 
@@ -1262,22 +1528,33 @@ def list_servers():
         status = "Running" if name in server_processes else "Stopped"
         print(f"- {name} | Type: {info['type']} | Port: {info['port']} | Status: {status}")
 
+@traced("download.paper", "version")
 def download_paper(version, path):
     print(f"⬇ Downloading PaperMC {version}...")
 
-    api_url = f"https://api.papermc.io/v2/projects/paper/versions/{version}"
-    r = requests.get(api_url, timeout=15)
+    # Latest build from the version catalog when cached
+    build = latest_build("paper", version)
+    if not build:
+        api_url = f"https://api.papermc.io/v2/projects/paper/versions/{version}"
+        r = requests.get(api_url, timeout=15)
 
-    if r.status_code != 200:
-        raise RuntimeError(f"PaperMC version '{version}' not found")
+        if r.status_code != 200:
+            raise RuntimeError(f"PaperMC version '{version}' not found")
 
-    data = r.json()
-    builds = data.get("builds")
+        data = r.json()
+        builds = data.get("builds")
+
+        if not builds:
+            raise RuntimeError("No Paper builds found")
 
-    if not builds:
-        raise RuntimeError("No Paper builds found")
+        build = max(builds)  # ✅ FIX HERE
 
-    build = max(builds)  # ✅ FIX HERE
+    build_key = f"paper-{version}-{build}"
+    annotate(build=build)
+    if link_cached_build(build_key, path):
+        annotate(cache="hit")
+        print(f"✔ Paper {version} (build {build}) linked from shared build cache")
+        return
 
     jar_url = (
         f"https://api.papermc.io/v2/projects/paper/versions/"
@@ -1286,51 +1563,69 @@ def download_paper(version, path):
 
     jar_path = os.path.join(path, "server.jar")
 
-    with requests.get(jar_url, stream=True, timeout=30) as r2:
-        r2.raise_for_status()
-        with open(jar_path, "wb") as f:
-            for chunk in r2.iter_content(8192):
-                f.write(chunk)
+    # Only LAN peers are looked up by hash - skip the extra request without them
+    hashes = None
+    if mirror_peers():
+        info = requests.get(
+            f"https://api.papermc.io/v2/projects/paper/versions/{version}/builds/{build}", timeout=15
+        )
+        if info.status_code == 200:
+            sha256 = info.json().get("downloads", {}).get("application", {}).get("sha256")
+            hashes = {"sha256": sha256} if sha256 else None
+
+    download_artifact(jar_url, jar_path, hashes)
 
     if os.path.getsize(jar_path) < 10 * 1024 * 1024:
         raise RuntimeError("Downloaded Paper jar is corrupt")
 
     print(f"✔ Paper {version} (build {build}) downloaded")
+    patch_server_jar(jar_path, build_key, "paper")
 
 
 
 
+@traced("download.vanilla", "version")
 def download_vanilla(version, server_path):
     print(f"⬇ Downloading Vanilla {version}...")
 
-    manifest = requests.get(
-        "https://launchermeta.mojang.com/mc/game/version_manifest.json"
-    ).json()
+    build_key = f"vanilla-{version}"
+    if link_cached_build(build_key, server_path):
+        annotate(cache="hit")
+        print(f"✔ Vanilla {version} linked from shared build cache")
+        return
 
-    version_data = next((v for v in manifest["versions"] if v["id"] == version), None)
-    if not version_data:
-        raise Exception("❌ Invalid Minecraft version")
+    metadata_url = vanilla_metadata_url(version)
+    if not metadata_url:
+        manifest = requests.get(
+            "https://launchermeta.mojang.com/mc/game/version_manifest.json"
+        ).json()
 
-    version_json = requests.get(version_data["url"]).json()
+        version_data = next((v for v in manifest["versions"] if v["id"] == version), None)
+        if not version_data:
+            raise Exception("❌ Invalid Minecraft version")
+        metadata_url = version_data["url"]
+
+    version_json = requests.get(metadata_url).json()
     jar_url = version_json["downloads"]["server"]["url"]
+    sha1 = version_json["downloads"]["server"].get("sha1")
 
     jar_path = os.path.join(server_path, "server.jar")
-    r = requests.get(jar_url)
-
-    with open(jar_path, "wb") as f:
-        f.write(r.content)
+    download_artifact(jar_url, jar_path, {"sha1": sha1} if sha1 else None)
 
     print("✔ Vanilla server downloaded")
+    patch_server_jar(jar_path, build_key, "vanilla")
 
+@traced("download.fabric", "version")
 def download_fabric(version, server_path):
     print(f"⬇ Downloading Fabric {version}...")
 
-    loader = requests.get(
+    # Loader and installer versions come from the version catalog when cached
+    loader = latest_build("fabric", version) or requests.get(
         "https://meta.fabricmc.net/v2/versions/loader"
     ).json()[0]["version"]
 
     installer_url = "https://meta.fabricmc.net/v2/versions/installer"
-    installer = requests.get(installer_url).json()[0]["version"]
+    installer = fabric_installer() or requests.get(installer_url).json()[0]["version"]
 
     fabric_jar_url = (
         f"https://meta.fabricmc.net/v2/versions/loader/"
@@ -1338,14 +1633,12 @@ def download_fabric(version, server_path):
     )
 
     jar_path = os.path.join(server_path, "server.jar")
-    r = requests.get(fabric_jar_url)
-
-    if r.status_code != 200:
+    # Fabric publishes no hash, but a launcher URL always serves the same JAR
+    try:
+        download_artifact(fabric_jar_url, jar_path)
+    except requests.RequestException:
         raise Exception("❌ Failed to download Fabric")
 
-    with open(jar_path, "wb") as f:
-        f.write(r.content)
-
     print("✔ Fabric server downloaded")
 
 
@@ -1364,7 +1657,7 @@ def remove_file(folder, filename):
         print("❌ File not found")
 
 def manage_paper_plugins(server_name, mc_version):
-    plugins_dir = f"servers/{server_name}/plugins"
+    plugins_dir = os.path.join(get_server_path(server_name), "plugins")
 
     while True:
         print("\n--- Plugins (Paper) ---")
@@ -1420,7 +1713,7 @@ def manage_paper_plugins(server_name, mc_version):
 
 
 def manage_fabric_mods(server_name, mc_version):
-    mods_dir = f"servers/{server_name}/mods"
+    mods_dir = os.path.join(get_server_path(server_name), "mods")
 
     while True:
         print("\n--- Mods (Fabric) ---")
@@ -1484,7 +1777,7 @@ def edit_server():
         return
 
     server = data[name]
-    server_path = f"servers/{name}"
+    server_path = get_server_path(name)
 
     while True:
         print("\n==============================")
@@ -1509,7 +1802,8 @@ def edit_server():
             print("2. Change Render Distance")
             print("3. Toggle Hardcore")
             print("4. Toggle Online Mode (Allow/Disallow Cracked Players)")
-            print("5. Back")
+            print("5. JVM Profile")
+            print("6. Back")
 
             s = input("> ").strip()
 
@@ -1562,6 +1856,9 @@ def edit_server():
                     else:
                         print("⚠ server.properties not found")
 
+            elif s == "5":
+                ask_jvm_profile(server)
+
         # MODS / PLUGINS
         if server["type"] in ["paper", "purpur"]:
             manage_paper_plugins(name, server["version"])
@@ -1646,14 +1943,24 @@ START SERVER - ALL WINDOWS AUTO-CLOSE
 Everything closes automatically when server stops - clean and simple
 """
 
-def start_server(server_name):
+@traced("server.start", "server")
+def start_server(server_name, wait_ready=False):
+    """
+    Launch a server. With wait_ready, block until it can take players and
+    return the readiness result; otherwise return right after the launch
+    and send the start notification once it is ready.
+    """
     data = load_data()
     if server_name not in data:
         print("❌ Server not found")
         return
 
     server = data[server_name]
-    path = f"servers/{server_name}"
+    if server.get("migrating"):
+        # A crashed migration leaves the flag - migrating again finishes it
+        print("❌ Server is being moved to another storage root - wait for the migration to finish")
+        return
+    path = get_server_path(server_name)
     jar = server.get("jar", "server.jar")
     ram = server["ram"]
     port = server["port"]
@@ -1671,6 +1978,31 @@ def start_server(server_name):
         os.remove(command_file)
 
     print(f"\n▶ Starting server '{server_name}' on port {port} with {ram} RAM...")
+
+    # Console commands from the control API go over RCON. Minecraft binds it
+    # on every interface, so only servers that opted in get the listener
+    if rcon_wanted(server):
+        ensure_rcon(abs_path)
+
+    # GC and tuning flags for this heap / CPU / Java
+    profile, jvm_args = build_jvm_args(server)
+    print(f"☕ JVM profile: {profile}")
+    annotate(type=server_type, port=port, jvm_profile=profile)
+
+    # Class data sharing archive from an earlier clean run
+    cds_args, cds_mode = prepare_launch(abs_path, server)
+    jvm_args += cds_args
+    if cds_mode == "cds":
+        summary = boot_summary(server_name)
+        if summary["without"] and summary["with"]:
+            print(f"⚡ AppCDS archive in use (boot {summary['without']:.1f}s → {summary['with']:.1f}s)")
+        else:
+            print("⚡ AppCDS archive in use")
+    elif cds_mode == "dump":
+        print("📦 AppCDS archive will be created when this run stops")
+    annotate(cds_mode=cds_mode)
+    launched_at = time.time()
+    marker = log_marker(abs_path)
     
     # ============ FORGE SERVERS ============
     if server_type == "forge":
@@ -1681,6 +2013,9 @@ def start_server(server_name):
             print(f"\n📍 Go to: {abs_path}")
             print(f"🔧 Run: INSTALL_FORGE.bat")
             return
+
+        # run.bat / run.sh pick their flags up from user_jvm_args.txt
+        write_forge_jvm_args(abs_path, jvm_args)
         
         # Create launcher that calls Forge's run.bat
         launcher_file = os.path.join(abs_path, "start_forge.bat")
@@ -1715,7 +2050,7 @@ def start_server(server_name):
             f.write('@echo off\n')
             f.write(f'title Minecraft Server - {server_name}\n')
             f.write(f'cd /d "{abs_path}"\n')
-            f.write(f'java -Xms{ram} -Xmx{ram} -jar "{jar}" nogui\n')
+            f.write(f'java {format_command_line(jvm_args)} -jar "{jar}" nogui\n')
             f.write('pause\n')
         
         try:
@@ -1729,16 +2064,24 @@ def start_server(server_name):
             print(f"❌ Failed to start: {e}")
             return
 
+    def on_ready(result):
+        notify_server_start(server_name, port, server_type)
+
+    # Ready once latest.log shows the Done line or the port answers a ping;
+    # the boot is recorded with what it ran with
+    boot = watch_boot(server_name, server, abs_path, port, launched_at, marker, cds_mode, jvm_args, on_ready)
+
     # ============ IMPROVED PROCESS DETECTION ============
-    print("⏳ Waiting for server to start...")
-    time.sleep(3)  # Initial wait
+    print("🔍 Looking for the Java process...")
     
     java_pid = None
-    max_attempts = 5
+    search_started = time.time()
+    deadline = search_started + PID_SEARCH_TIMEOUT
+    attempts = 0
     
-    for attempt in range(max_attempts):
-        print(f"🔍 Looking for Java process (attempt {attempt + 1}/{max_attempts})...")
-        
+    while not java_pid and time.time() < deadline:
+        time.sleep(0.5)
+        attempts += 1
         try:
             for proc in psutil.process_iter(['pid', 'name', 'cmdline', 'cwd']):
                 try:
@@ -1793,16 +2136,14 @@ def start_server(server_name):
                     continue
         except Exception as e:
             print(f"⚠ Search error: {e}")
-        
-        if java_pid:
-            break
-        
-        if attempt < max_attempts - 1:
-            print(f"⏳ Waiting 2 more seconds...")
-            time.sleep(2)
     
+    record_span("server.start.find_pid", search_started, parent=current_span(),
+                status="ok" if java_pid else "error", pid=java_pid, attempts=attempts)
+    annotate(pid=java_pid)
+
     # Save PID or search info
     if java_pid:
+        boot.pid = java_pid
         with open(running_file, "w") as f:
             f.write(str(java_pid))
         print(f"✔ Server PID saved: {java_pid}")
@@ -1814,11 +2155,8 @@ def start_server(server_name):
             f.write(f"SEARCH:{server_name}:{jar}:{abs_path}")
         print(f"✔ Server tracking enabled (fallback mode)")
 
-    print(f"\n✔ Server '{server_name}' started!")
+    print(f"\n✔ Server '{server_name}' launched")
     print(f"🖥 Join: {get_local_ip()}:{port}")
-    
-    if server_type == "forge":
-        print(f"\n💡 Forge server may take longer to fully start")
 
     # ============ START HELPER PROCESSES ============
     
@@ -1852,22 +2190,28 @@ def start_server(server_name):
         print(f"\n⚠ Helper processes not started (PID detection failed)")
         print(f"   Server is running, but you'll need to stop it manually")
 
-    # Notification
-    try:
-        from notifications import notify_server_start
-        notify_server_start(server_name, port, server_type)
-    except:
-        pass
+    if not wait_ready:
+        usual = boot_summary(server_name)["with" if cds_mode == "cds" else "without"]
+        hint = f" (usually ~{usual:.0f}s)" if usual else ""
+        print(f"⏳ World is loading{hint} - you'll be notified when it's ready")
+        return None
+
+    print("⏳ Waiting until the server is ready...")
+    result = boot.wait()
+    print(describe_boot(result))
+    return result
 
 
 
+@traced("server.stop", "server")
 def stop_server(server_name):
     """Stop server with improved process detection"""
-    path = f"servers/{server_name}"
+    path = get_server_path(server_name)
     running_file = os.path.join(path, "running.txt")
     command_file = os.path.join(path, "command.txt")
 
     if not os.path.exists(running_file):
+        annotate(exit_reason="not_running")
         print("❌ Server is not running")
         return
 
@@ -1875,6 +2219,7 @@ def stop_server(server_name):
         with open(running_file, "r") as f:
             content = f.read().strip()
     except:
+        annotate(exit_reason="unreadable_running_file")
         print("❌ Could not read running file")
         return
 
@@ -1928,6 +2273,7 @@ def stop_server(server_name):
                 continue
         
         if not java_pid:
+            annotate(exit_reason="process_not_found")
             print("❌ Could not find server process")
             print("💡 Try closing the server console window manually")
             cleanup_files(running_file, command_file)
@@ -1935,6 +2281,7 @@ def stop_server(server_name):
     else:
         # Direct PID
         java_pid = int(content)
+    annotate(pid=java_pid)
 
     print(f"🎯 Stopping PID: {java_pid}")
 
@@ -1948,6 +2295,7 @@ def stop_server(server_name):
             
             for i in range(10):
                 if not psutil.pid_exists(java_pid):
+                    annotate(exit_reason="clean", waited=i)
                     print(f"✔ Server stopped")
                     cleanup_files(running_file, command_file)
                     
@@ -1971,6 +2319,7 @@ def stop_server(server_name):
         
         for i in range(5):
             if not proc.is_running():
+                annotate(exit_reason="terminated")
                 print("✔ Server stopped")
                 cleanup_files(running_file, command_file)
                 
@@ -1984,11 +2333,14 @@ def stop_server(server_name):
             time.sleep(1)
         
         proc.kill()
+        annotate(exit_reason="killed")
         time.sleep(2)
         
     except psutil.NoSuchProcess:
+        annotate(exit_reason="already_stopped")
         print("✔ Process already stopped")
     except Exception as e:
+        annotate(exit_reason="taskkill")
         print(f"⚠ Error: {e}")
     
     # Method 3: Taskkill
@@ -2016,12 +2368,13 @@ def cleanup_files(running_file, command_file):
                 pass
 
 
+@traced("server.force_stop", "server")
 def force_stop_server(server_name):
     """
     Force stop without any grace period
     Use this when regular stop doesn't work
     """
-    path = f"servers/{server_name}"
+    path = get_server_path(server_name)
     running_file = os.path.join(path, "running.txt")
     command_file = os.path.join(path, "command.txt")
     
@@ -2076,8 +2429,9 @@ def force_stop_server(server_name):
         pass
 
 
-def restart_server(server_name):
-    """Restart a server"""
+@traced("server.restart", "server")
+def restart_server(server_name, wait_ready=False):
+    """Restart a server (wait_ready as for start_server)"""
     print(f"🔄 Restarting server '{server_name}'...")
     
     stop_server(server_name)
@@ -2086,13 +2440,14 @@ def restart_server(server_name):
     print("⏳ Waiting for cleanup...")
     time.sleep(5)
     
-    start_server(server_name)
+    result = start_server(server_name, wait_ready)
     print(f"✔ Server '{server_name}' restarted")
+    return result
 
 
 def is_server_running(server_name):
     """Check if a server is running with improved detection"""
-    path = f"servers/{server_name}"
+    path = get_server_path(server_name)
     running_file = os.path.join(path, "running.txt")
     
     if not os.path.exists(running_file):
@@ -2151,63 +2506,70 @@ def is_server_running(server_name):
 
 
 def delete_server(name):
-    path = f"servers/{name}"
+    """
+    Delete a server without blocking the menu: the registry entry is
+    removed at once and the folder is reclaimed in the background.
+    """
+    path = get_server_path(name)
 
     notify_server_deleted(name)
 
-    # 1. Stop server if running
+    # 1. Kill the server if running - no point saving a world we're deleting
     if is_server_running(name):
-        print(f"⛔ Stopping server '{name}' before deletion...")
-        pid = get_server_pid(name)
-
-        stop_server(name)
-
-        # wait up to 15 seconds
-        for _ in range(15):
-            if not psutil.pid_exists(pid):
-                break
-            time.sleep(1)
+        print(f"⛔ Killing server '{name}' before deletion...")
+        if not kill_server_process(name):
+            force_stop_server(name)
+        cleanup_files(os.path.join(path, "running.txt"), os.path.join(path, "command.txt"))
 
-        # force kill if still alive
-        if psutil.pid_exists(pid):
-            print("⚠ Server did not stop, force killing...")
-            try:
-                psutil.Process(pid).kill()
-            except psutil.NoSuchProcess:
-                pass
-            time.sleep(2)
-
-    # 2. Delete folder (the folder itself)
-    if os.path.exists(path):
-        force_delete_folder(path)
-
-    # 3. Remove metadata
+    # 2. Remove metadata
     data = load_data()
     if name in data:
         del data[name]
         save_data(data)
 
+    # 3. Move folder to trash, space is reclaimed in the background
+    if os.path.exists(path):
+        entry = schedule_deletion(name, path)
+        if not entry["renamed"]:
+            print("⚠ Folder is still locked, it will be removed once released")
+
     print(f"✔ Server '{name}' deleted successfully")
+    print("🗑 Disk space is being reclaimed in the background")
 
-def force_delete_folder(path, retries=5):
+
+def kill_server_process(server_name, timeout=5):
     """
-    Deletes the FOLDER ITSELF (not just contents)
-    Windows-safe with retries + rename fallback
+    Kill a server's JVM (and the console window that launched it) right away.
+    Returns False when the PID isn't known.
     """
-    for _ in range(retries):
-        try:
-            shutil.rmtree(path)
-            return
-        except PermissionError:
-            time.sleep(1)
+    pid = get_server_pid(server_name)
+    if not pid:
+        return False
+
+    try:
+        proc = psutil.Process(pid)
+    except psutil.NoSuchProcess:
+        return True
 
-    # rename fallback (very effective on Windows)
-    tmp = path + "_deleting"
-    os.rename(path, tmp)
-    shutil.rmtree(tmp)
+    victims = [proc] + proc.children(recursive=True)
+    try:
+        # The cmd window keeps the server folder locked on Windows
+        parent = proc.parent()
+        if parent and parent.name().lower() == "cmd.exe":
+            victims.append(parent)
+    except (psutil.NoSuchProcess, psutil.AccessDenied):
+        pass
+
+    for p in victims:
+        try:
+            p.kill()
+        except (psutil.NoSuchProcess, psutil.AccessDenied):
+            pass
+    psutil.wait_procs(victims, timeout=timeout)
+    return True
 
 def get_server_pid(server_name):
-    path = f"servers/{server_name}"
+    path = get_server_path(server_name)
     running_file = os.path.join(path, "running.txt")
     try:
         with open(running_file, "r") as f:
@@ -2216,3 +2578,50 @@ def get_server_pid(server_name):
         return None
 
 
+def send_console_command(server_name, command):
+    """Run a console command on a running server, returns the server's answer"""
+    if not is_server_running(server_name):
+        raise RuntimeError("Server is not running")
+    return send_command(get_server_path(server_name), command)
+
+
+def get_mods_folder(server_name, server):
+    """plugins/ or mods/ folder of a server, None for Vanilla"""
+    if server.get("type") in ("paper", "purpur"):
+        return os.path.join(get_server_path(server_name), "plugins")
+    if server.get("type") in ("fabric", "forge"):
+        return os.path.join(get_server_path(server_name), "mods")
+    return None
+
+
+def remove_mod_file(server_name, server, filename):
+    """Delete one installed mod/plugin JAR by file name (any case), returns False if missing"""
+    target_dir = get_mods_folder(server_name, server)
+    if not target_dir or not os.path.isdir(target_dir):
+        return False
+    for f in os.listdir(target_dir):
+        if f.lower() == filename.lower() and f.endswith(".jar"):
+            os.remove(os.path.join(target_dir, f))
+            return True
+    return False
+
+
+def get_server_status(server_name, server):
+    """Status fields of one server (cheap, no job needed)"""
+    running = is_server_running(server_name)
+    usage = get_usage(server_name) or {}
+    return {
+        "server": server_name,
+        "ok": True,
+        "running": running,
+        "pid": get_server_pid(server_name) if running else None,
+        "type": server.get("type"),
+        "version": server.get("version"),
+        "port": server.get("port"),
+        "ram": server.get("ram"),
+        "storage_root": root_of(server_name),
+        "path": get_server_path(server_name),
+        "disk_bytes": usage.get("total"),
+        "boot_seconds": boot_summary(server_name),
+        "boot_state": boot_state(server_name),
+    }
@@ -0,0 +1,607 @@
+"""
+Server Packages for PyCraftHub
+Streams a whole server into one compressed tar (and back) so it can be
+moved between hosts without an intermediate zip on disk.
+
+Package layout (a plain tar stream, zstd or gzip compressed):
+    pycrafthub/manifest.json   servers.json entry, options, jars to re-fetch
+    server/...                 the server files
+    pycrafthub/hashes.json     sha256 of every shipped file (written last,
+                               so export only has to read each file once)
+
+Usage:
+    python -m core.server_package export <server> [file | -]
+    python -m core.server_package import <file | -> [--name NEW_NAME]
+"""
+import os
+import sys
+import json
+import time
+import shutil
+import tarfile
+import hashlib
+import argparse
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+try:
+    import zstandard
+    HAS_ZSTD = True
+except ImportError:
+    HAS_ZSTD = False
+
+from utils.lazy import lazy_import
+from utils.helpers import format_bytes, hash_file
+from core.jobs import current_job, bind_job
+from core.server_manager import (
+    load_data, save_data, get_free_port, is_server_running, _registry_lock,
+    download_paper, download_purpur, download_vanilla, download_fabric
+)
+from core.storage import get_server_path, choose_root, path_on_root
+from core.build_cache import PATCH_OUTPUTS
+
+requests = lazy_import("requests")
+
+PACKAGE_FORMAT = 1
+MANIFEST_NAME = "pycrafthub/manifest.json"
+HASHES_NAME = "pycrafthub/hashes.json"
+SERVER_PREFIX = "server/"
+EXPORT_DIR = "exports"
+
+ZSTD_MAGIC = b"\x28\xb5\x2f\xfd"
+GZIP_MAGIC = b"\x1f\x8b"
+
+# Never worth shipping: runtime tracking files recreated by start_server
+RUNTIME_FILES = {"running.txt", "command.txt"}
+LOG_DIRS = ("logs", "crash-reports")
+# Rebuilt by Paperclip / the Vanilla bundler on first boot (Forge needs its libraries)
+CACHE_DIRS = ("cache", "versions", "libraries", os.path.join("plugins", ".paper-remapped"), ".cds")
+
+SERVER_DOWNLOADERS = {
+    "paper": download_paper,
+    "purpur": download_purpur,
+    "vanilla": download_vanilla,
+    "fabric": download_fabric,
+}
+
+# Files up to this size are handed to the writer pool, bigger ones are streamed inline
+SMALL_FILE_LIMIT = 4 * 1024 * 1024
+
+
+def _log(msg, end="\n"):
+    """
+    Progress goes to stderr so export can stream the package on stdout.
+    Inside a job it goes to stdout instead, which the job captures.
+    """
+    print(msg, file=sys.stdout if current_job() else sys.stderr, end=end, flush=True)
+
+
+class _Progress:
+    """Single-line byte progress with throughput"""
+
+    def __init__(self, label, total):
+        self.label = label
+        self.total = total
+        self.done = 0
+        self.started = time.time()
+        self.last_print = 0
+        self.lock = threading.Lock()
+        # A job shows percent, rate and ETA itself - feed it instead of printing
+        self.job = current_job()
+        if self.job:
+            self.job.update(total_bytes=self.job.total_bytes + total)
+
+    def add(self, amount):
+        if self.job:
+            self.job.update(add_bytes=amount)
+        with self.lock:
+            self.done += amount
+            if self.job:
+                return
+            now = time.time()
+            if now - self.last_print < 0.5:
+                return
+            self.last_print = now
+        self.show()
+
+    def show(self, final=False):
+        if self.job and not final:
+            return
+        elapsed = max(time.time() - self.started, 0.001)
+        rate = self.done / elapsed
+        percent = (self.done / self.total * 100) if self.total else 100.0
+        _log(f"\r{self.label}... {percent:5.1f}% "
+             f"({format_bytes(self.done)} @ {format_bytes(rate)}/s)   ",
+             end="\n" if final else "")
+
+
+class _HashingReader:
+    """File wrapper that hashes everything tarfile reads through it"""
+
+    def __init__(self, fileobj, progress):
+        self.fileobj = fileobj
+        self.progress = progress
+        self.hash = hashlib.sha256()
+
+    def read(self, size=-1):
+        chunk = self.fileobj.read(size)
+        self.hash.update(chunk)
+        self.progress.add(len(chunk))
+        return chunk
+
+
+def _is_excluded(rel_path, exclude_logs, exclude_caches):
+    if rel_path in RUNTIME_FILES:
+        return True
+    dirs = []
+    if exclude_logs:
+        dirs.extend(LOG_DIRS)
+    if exclude_caches:
+        dirs.extend(CACHE_DIRS)
+    return any(rel_path == d or rel_path.startswith(d + os.sep) for d in dirs)
+
+
+def _scan_server(server_path, exclude_logs, exclude_caches):
+    """Return (dirs, files) relative to the server folder, files as (rel, size)"""
+    dirs, files = [], []
+    for root, dirnames, filenames in os.walk(server_path):
+        rel_root = os.path.relpath(root, server_path)
+        rel_root = "" if rel_root == "." else rel_root
+
+        kept = []
+        for d in sorted(dirnames):
+            rel = os.path.join(rel_root, d)
+            if not _is_excluded(rel, exclude_logs, exclude_caches):
+                kept.append(d)
+                dirs.append(rel)
+        dirnames[:] = kept
+
+        for name in sorted(filenames):
+            rel = os.path.join(rel_root, name)
+            if _is_excluded(rel, exclude_logs, exclude_caches):
+                continue
+            files.append((rel, os.path.getsize(os.path.join(root, name))))
+    return dirs, files
+
+
+def _resolve_refetchable(server_path, server, files):
+    """
+    Work out which JARs can be re-downloaded on the other side
+    instead of being shipped. Returns {rel_path: refetch_record}.
+    """
+    refetch = {}
+    file_set = {rel for rel, _ in files}
+
+    # Server jar - re-downloaded from the same type/version
+    jar = server.get("jar", "server.jar")
+    if server.get("type") in SERVER_DOWNLOADERS and jar in file_set:
+        refetch[jar] = {
+            "source": "server",
+            "type": server["type"],
+            "version": server["version"],
+            "sha256": hash_file(os.path.join(server_path, jar)),
+        }
+
+    # Plugins/mods - only the ones Modrinth recognises by hash
+    candidates = {}
+    for rel in file_set:
+        parent = os.path.dirname(rel)
+        if parent in ("plugins", "mods") and rel.endswith(".jar"):
+            candidates[hash_file(os.path.join(server_path, rel), "sha1")] = rel
+
+    if candidates:
+        try:
+            r = requests.post(
+                "https://api.modrinth.com/v2/version_files",
+                json={"hashes": list(candidates), "algorithm": "sha1"},
+                timeout=15
+            )
+            r.raise_for_status()
+            for sha1, version_data in r.json().items():
+                for file in version_data.get("files", []):
+                    if file.get("hashes", {}).get("sha1") == sha1 and sha1 in candidates:
+                        refetch[candidates[sha1]] = {
+                            "source": "modrinth",
+                            "url": file["url"],
+                            "sha1": sha1,
+                        }
+                        break
+        except Exception as e:
+            _log(f"⚠ Modrinth lookup failed, shipping all plugin/mod jars: {e}")
+
+    return refetch
+
+
+def _open_package_writer(out):
+    """Wrap the output stream in a zstd (multithreaded) or gzip tar stream"""
+    if HAS_ZSTD:
+        cctx = zstandard.ZstdCompressor(level=3, threads=-1)
+        compressor = cctx.stream_writer(out, closefd=False)
+        return tarfile.open(fileobj=compressor, mode="w|"), compressor
+    return tarfile.open(fileobj=out, mode="w|gz"), None
+
+
+def _add_json(tar, name, payload):
+    raw = json.dumps(payload, indent=4).encode("utf-8")
+    info = tarfile.TarInfo(name)
+    info.size = len(raw)
+    info.mtime = int(time.time())
+    tar.addfile(info, _BytesReader(raw))
+
+
+class _BytesReader:
+    def __init__(self, raw):
+        self.raw = raw
+        self.pos = 0
+
+    def read(self, size=-1):
+        if size < 0:
+            size = len(self.raw) - self.pos
+        chunk = self.raw[self.pos:self.pos + size]
+        self.pos += len(chunk)
+        return chunk
+
+
+def default_package_path(server_name):
+    ext = ".pchub.tar.zst" if HAS_ZSTD else ".pchub.tar.gz"
+    return os.path.join(EXPORT_DIR, server_name + ext)
+
+
+def export_server(server_name, output, exclude_logs=True, exclude_caches=True, refetch_jars=True):
+    """
+    Stream a server into a package.
+
+    Args:
+        server_name: Server to export
+        output: File path, or "-" to write the package to stdout
+        exclude_logs: Leave out logs/ and crash-reports/
+        exclude_caches: Leave out caches that are rebuilt on first boot
+        refetch_jars: Record re-downloadable JARs by hash instead of shipping them
+    """
+    data = load_data()
+    server = data.get(server_name)
+    if not server:
+        raise RuntimeError(f"Server '{server_name}' not found")
+
+    server_path = get_server_path(server_name)
+    if not os.path.isdir(server_path):
+        raise RuntimeError(f"Server folder missing: {server_path}")
+
+    if is_server_running(server_name):
+        raise RuntimeError("Stop the server before exporting it")
+
+    # Forge rebuilds nothing by itself - its libraries/ must travel with it
+    exclude_caches = exclude_caches and server.get("type") != "forge"
+
+    _log(f"📦 Scanning '{server_name}'...")
+    dirs, files = _scan_server(server_path, exclude_logs, exclude_caches)
+
+    refetch = {}
+    if refetch_jars:
+        refetch = _resolve_refetchable(server_path, server, files)
+        if refetch:
+            _log(f"🔗 {len(refetch)} JAR(s) will be re-downloaded on import instead of shipped")
+
+    shipped = [(rel, size) for rel, size in files if rel not in refetch]
+    total_bytes = sum(size for _, size in shipped)
+
+    manifest = {
+        "format": PACKAGE_FORMAT,
+        "server_name": server_name,
+        "server": server,
+        "created": time.strftime("%Y-%m-%d %H:%M:%S"),
+        "compression": "zstd" if HAS_ZSTD else "gzip",
+        "excluded": {"logs": exclude_logs, "caches": exclude_caches},
+        "file_count": len(shipped),
+        "total_bytes": total_bytes,
+        "refetch": {rel.replace(os.sep, "/"): rec for rel, rec in refetch.items()},
+    }
+
+    to_stdout = output == "-"
+    if to_stdout:
+        out = sys.stdout.buffer
+    else:
+        os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+        out = open(output, "wb")
+
+    progress = _Progress("📤 Exporting", total_bytes)
+    hashes = {}
+
+    try:
+        tar, compressor = _open_package_writer(out)
+        _add_json(tar, MANIFEST_NAME, manifest)
+
+        for rel in dirs:
+            info = tar.gettarinfo(os.path.join(server_path, rel), SERVER_PREFIX + rel.replace(os.sep, "/"))
+            tar.addfile(info)
+
+        for rel, _ in shipped:
+            abs_file = os.path.join(server_path, rel)
+            arcname = SERVER_PREFIX + rel.replace(os.sep, "/")
+            info = tar.gettarinfo(abs_file, arcname)
+            with open(abs_file, "rb") as f:
+                reader = _HashingReader(f, progress)
+                tar.addfile(info, reader)
+            hashes[rel.replace(os.sep, "/")] = reader.hash.hexdigest()
+
+        _add_json(tar, HASHES_NAME, hashes)
+        tar.close()
+        if compressor:
+            compressor.flush(zstandard.FLUSH_FRAME)
+            compressor.close()
+        out.flush()
+    finally:
+        if not to_stdout:
+            out.close()
+
+    progress.show(final=True)
+    _log(f"✔ Exported '{server_name}' ({len(shipped)} files, {format_bytes(total_bytes)})")
+
+
+def _open_package_reader(src):
+    """Detect compression from the magic bytes and open a streaming tar reader"""
+    magic = src.peek(4)[:4]
+    if magic == ZSTD_MAGIC:
+        if not HAS_ZSTD:
+            raise RuntimeError("Package is zstd compressed - install it with: pip install zstandard")
+        reader = zstandard.ZstdDecompressor().stream_reader(src, read_across_frames=True)
+        return tarfile.open(fileobj=reader, mode="r|")
+    if magic[:2] == GZIP_MAGIC:
+        return tarfile.open(fileobj=src, mode="r|gz")
+    raise RuntimeError("Not a PyCraftHub server package")
+
+
+def _safe_member_path(staging, name):
+    rel = name[len(SERVER_PREFIX):]
+    dest = os.path.abspath(os.path.join(staging, rel))
+    if not dest.startswith(os.path.abspath(staging) + os.sep):
+        raise RuntimeError(f"Refusing unsafe path in package: {name}")
+    return rel, dest
+
+
+def _restore_mode(dest, mode):
+    """Permission bits as exported - run.sh and other scripts keep their exec bit"""
+    if os.name != "nt":
+        os.chmod(dest, mode & 0o777)
+
+
+def _write_small_file(dest, payload, mtime, mode):
+    with open(dest, "wb") as f:
+        f.write(payload)
+    os.utime(dest, (mtime, mtime))
+    _restore_mode(dest, mode)
+    return hashlib.sha256(payload).hexdigest()
+
+
+def _refetch_file(staging, rel, record):
+    """Re-download a JAR recorded in the manifest; returns a warning or None"""
+    dest = os.path.join(staging, *rel.split("/"))
+    os.makedirs(os.path.dirname(dest), exist_ok=True)
+
+    if record["source"] == "server":
+        # Downloaders always write server.jar into the folder they're given
+        tmp_dir = os.path.join(staging, ".refetch")
+        os.makedirs(tmp_dir, exist_ok=True)
+        SERVER_DOWNLOADERS[record["type"]](record["version"], tmp_dir)
+        shutil.move(os.path.join(tmp_dir, "server.jar"), dest)
+        # Keep what the shared build linked in (export leaves these out)
+        for entry in PATCH_OUTPUTS:
+            linked = os.path.join(tmp_dir, entry)
+            if entry != "server.jar" and os.path.exists(linked) \
+                    and not os.path.exists(os.path.join(staging, entry)):
+                os.rename(linked, os.path.join(staging, entry))
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        if hash_file(dest) != record["sha256"]:
+            return f"{rel}: a newer {record['type']} build was downloaded than the one exported"
+        return None
+
+    with requests.get(record["url"], stream=True, timeout=60) as r:
+        r.raise_for_status()
+        with open(dest, "wb") as f:
+            for chunk in r.iter_content(65536):
+                f.write(chunk)
+    if hash_file(dest, "sha1") != record["sha1"]:
+        raise RuntimeError(f"Hash mismatch for re-downloaded {rel}")
+    return None
+
+
+def _set_property(props_file, key, value):
+    if not os.path.exists(props_file):
+        return
+    with open(props_file, "r") as f:
+        lines = f.readlines()
+    with open(props_file, "w") as f:
+        found = False
+        for line in lines:
+            if line.startswith(f"{key}="):
+                f.write(f"{key}={value}\n")
+                found = True
+            else:
+                f.write(line)
+        if not found:
+            f.write(f"{key}={value}\n")
+
+
+def import_server_package(source, new_name=None, workers=None):
+    """
+    Unpack a package and register the server in one step.
+
+    Args:
+        source: Package path, or "-" to read it from stdin
+        new_name: Register under a different name than the exported one
+        workers: Writer threads (defaults to CPU count)
+    """
+    workers = workers or min(16, (os.cpu_count() or 4) * 2)
+    src = sys.stdin.buffer if source == "-" else open(source, "rb")
+
+    staging = None
+    try:
+        tar = _open_package_reader(src)
+
+        first = tar.next()
+        if first is None or first.name != MANIFEST_NAME:
+            raise RuntimeError("Package manifest missing")
+        manifest = json.loads(tar.extractfile(first).read())
+        if manifest.get("format", 0) > PACKAGE_FORMAT:
+            raise RuntimeError("Package was made by a newer PyCraftHub")
+
+        name = new_name or manifest["server_name"]
+        if name in load_data() or os.path.exists(get_server_path(name)):
+            raise RuntimeError(f"Server '{name}' already exists")
+
+        # Staged on the chosen root so the final rename stays on one volume
+        storage_root = choose_root()
+        final_path = path_on_root(storage_root, name)
+        staging = path_on_root(storage_root, f".{name}.importing")
+        if os.path.exists(staging):
+            shutil.rmtree(staging)
+        os.makedirs(staging)
+
+        _log(f"📥 Importing '{name}' ({manifest['file_count']} files, "
+             f"{format_bytes(manifest['total_bytes'])})")
+
+        progress = _Progress("📥 Unpacking", manifest["total_bytes"])
+        computed = {}
+        expected = None
+        # Caps how many small files sit in memory waiting for a writer
+        slots = threading.BoundedSemaphore(workers * 4)
+
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            job = current_job()
+
+            def refetch(rel, rec):
+                with bind_job(job):
+                    return _refetch_file(staging, rel, rec)
+
+            refetch_jobs = {
+                pool.submit(refetch, rel, rec): rel
+                for rel, rec in manifest.get("refetch", {}).items()
+            }
+            write_jobs = {}
+
+            def release(_future):
+                slots.release()
+
+            for member in tar:
+                if member.name == HASHES_NAME:
+                    expected = json.loads(tar.extractfile(member).read())
+                    continue
+                if not member.name.startswith(SERVER_PREFIX):
+                    continue
+
+                rel, dest = _safe_member_path(staging, member.name)
+                if member.isdir():
+                    os.makedirs(dest, exist_ok=True)
+                    continue
+                if not member.isfile():
+                    continue
+
+                os.makedirs(os.path.dirname(dest), exist_ok=True)
+                fileobj = tar.extractfile(member)
+
+                if member.size <= SMALL_FILE_LIMIT:
+                    payload = fileobj.read()
+                    slots.acquire()
+                    future = pool.submit(_write_small_file, dest, payload, member.mtime, member.mode)
+                    future.add_done_callback(release)
+                    write_jobs[future] = rel
+                    progress.add(member.size)
+                else:
+                    h = hashlib.sha256()
+                    with open(dest, "wb") as f:
+                        for chunk in iter(lambda: fileobj.read(1024 * 1024), b""):
+                            h.update(chunk)
+                            f.write(chunk)
+                            progress.add(len(chunk))
+                    os.utime(dest, (member.mtime, member.mtime))
+                    _restore_mode(dest, member.mode)
+                    computed[rel] = h.hexdigest()
+
+            for future, rel in write_jobs.items():
+                computed[rel] = future.result()
+
+            progress.show(final=True)
+
+            warnings = []
+            for future, rel in refetch_jobs.items():
+                try:
+                    warning = future.result()
+                    if warning:
+                        warnings.append(warning)
+                    _log(f"✔ Re-downloaded {rel}")
+                except Exception as e:
+                    raise RuntimeError(f"Could not re-download {rel}: {e}")
+
+        if expected is None:
+            raise RuntimeError("Package is truncated (hash list missing)")
+        bad = [rel for rel, digest in expected.items() if computed.get(rel) != digest]
+        if bad:
+            raise RuntimeError(f"{len(bad)} file(s) failed hash verification, e.g. {bad[0]}")
+
+        for warning in warnings:
+            _log(f"⚠ {warning}")
+
+        # ---------------- REGISTER ----------------
+        server = dict(manifest["server"])
+        # Creation jobs may be writing servers.json at the same time
+        with _registry_lock:
+            data = load_data()
+            if name in data:
+                raise RuntimeError(f"Server '{name}' already exists")
+            used_ports = {s.get("port") for s in data.values()}
+            if server.get("port") in used_ports:
+                server["port"] = get_free_port()
+                _set_property(os.path.join(staging, "server.properties"), "server-port", server["port"])
+                _log(f"⚠ Port in use, moved to {server['port']}")
+
+            os.rename(staging, final_path)
+            staging = None
+            server["storage_root"] = storage_root
+            data[name] = server
+            save_data(data)
+
+        _log(f"✔ Server '{name}' imported and registered")
+        return name
+
+    finally:
+        if source != "-":
+            src.close()
+        if staging and os.path.exists(staging):
+            shutil.rmtree(staging, ignore_errors=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(prog="python -m core.server_package")
+    sub = parser.add_subparsers(dest="action", required=True)
+
+    exp = sub.add_parser("export", help="Export a server package")
+    exp.add_argument("server")
+    exp.add_argument("output", nargs="?", help="Package path, or - for stdout")
+    exp.add_argument("--keep-logs", action="store_true")
+    exp.add_argument("--keep-caches", action="store_true")
+    exp.add_argument("--ship-jars", action="store_true", help="Ship JARs instead of re-downloading them")
+
+    imp = sub.add_parser("import", help="Import a server package")
+    imp.add_argument("source", help="Package path, or - for stdin")
+    imp.add_argument("--name", help="Register under a different name")
+
+    args = parser.parse_args()
+
+    try:
+        if args.action == "export":
+            export_server(
+                args.server,
+                args.output or default_package_path(args.server),
+                exclude_logs=not args.keep_logs,
+                exclude_caches=not args.keep_caches,
+                refetch_jars=not args.ship_jars
+            )
+        else:
+            import_server_package(args.source, new_name=args.name)
+    except Exception as e:
+        _log(f"❌ {e}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
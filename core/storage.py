@@ -0,0 +1,334 @@
+"""
+Storage Roots for PyCraftHub
+Servers can live on several disks (e.g. a fast NVMe and a bulk HDD).
+
+- The default root is settings["server_directory"], extra roots come
+  from settings["storage_roots"] as {"name": ..., "path": ...}
+- A server's root is recorded as "storage_root" in its servers.json entry
+  and get_server_path() resolves it - nothing else should build server paths
+- New servers go to the root with the most free space that isn't busy
+- migrate_server() moves a stopped server to another root
+"""
+import os
+import json
+import time
+import threading
+
+from settings_module import load_settings, SETTINGS_FILE
+from core.fast_copy import sync_tree
+from utils.lazy import lazy_import
+
+psutil = lazy_import("psutil")
+
+DATA_FILE = os.path.join("data", "servers.json")
+DEFAULT_ROOT = "default"
+
+# Roots with less than this free are never picked for new servers
+MIN_FREE_BYTES = 2 * 1024 ** 3
+# How long placement watches the disks to measure how busy they are
+IO_SAMPLE_SECONDS = 0.5
+
+_lock = threading.Lock()
+# (servers.json mtime, settings.json mtime) -> resolved roots and registry
+_resolved = {"key": None, "roots": {}, "servers": {}}
+
+
+# -------------------- Roots --------------------
+
+def _mtime(path):
+    try:
+        return os.stat(path).st_mtime_ns
+    except OSError:
+        return None
+
+
+def _refresh():
+    """Re-read settings and the registry only when one of them changed on disk"""
+    key = (_mtime(DATA_FILE), _mtime(SETTINGS_FILE))
+    if key == _resolved["key"]:
+        return _resolved
+
+    settings = load_settings()
+    roots = {DEFAULT_ROOT: settings.get("server_directory") or "servers"}
+    for root in settings.get("storage_roots", []):
+        if root.get("name") and root.get("path"):
+            roots[root["name"]] = root["path"]
+
+    servers = {}
+    try:
+        with open(DATA_FILE, "r") as f:
+            for name, info in json.load(f).items():
+                servers[name] = info.get("storage_root")
+    except (OSError, ValueError):
+        pass
+
+    _resolved.update(key=key, roots=roots, servers=servers)
+    return _resolved
+
+
+def get_roots():
+    """{root name: root path}, the default root first"""
+    with _lock:
+        return dict(_refresh()["roots"])
+
+
+def root_of(server_name):
+    """Name of the root a server lives on"""
+    with _lock:
+        state = _refresh()
+        root = state["servers"].get(server_name)
+        if root in state["roots"]:
+            return root
+
+        # Not registered yet (mid-creation) or registered before roots existed
+        for name, path in state["roots"].items():
+            if os.path.isdir(os.path.join(path, server_name)):
+                return name
+        return DEFAULT_ROOT
+
+
+def get_server_path(server_name):
+    """Folder of a server, whichever root it lives on"""
+    roots = get_roots()
+    return os.path.join(roots.get(root_of(server_name), roots[DEFAULT_ROOT]), server_name)
+
+
+def path_on_root(root_name, server_name):
+    """Where a server would live on the given root"""
+    return os.path.join(get_roots()[root_name], server_name)
+
+
+# -------------------- Placement --------------------
+
+def _device_name(path):
+    """Block device holding path, as named by psutil.disk_io_counters (Linux only)"""
+    path = os.path.abspath(path)
+    best = None
+    try:
+        for part in psutil.disk_partitions(all=False):
+            mount = part.mountpoint
+            if path == mount or path.startswith(mount.rstrip(os.sep) + os.sep):
+                if best is None or len(mount) > len(best.mountpoint):
+                    best = part
+    except Exception:
+        return None
+    if best is None or not best.device.startswith("/dev/"):
+        return None
+    return os.path.basename(os.path.realpath(best.device))
+
+
+def _io_utilization(devices):
+    """Fraction of time each device was busy over a short sample (None if unknown)"""
+    wanted = {d for d in devices if d}
+    if not wanted:
+        return {}
+    try:
+        before = psutil.disk_io_counters(perdisk=True)
+        time.sleep(IO_SAMPLE_SECONDS)
+        after = psutil.disk_io_counters(perdisk=True)
+    except Exception:
+        return {}
+
+    util = {}
+    for dev in wanted:
+        if dev not in before or dev not in after:
+            continue
+        a, b = before[dev], after[dev]
+        if hasattr(b, "busy_time"):
+            busy = b.busy_time - a.busy_time
+        else:
+            busy = (b.read_time - a.read_time) + (b.write_time - a.write_time)
+        util[dev] = min(1.0, busy / (IO_SAMPLE_SECONDS * 1000))
+    return util
+
+
+def root_stats():
+    """
+    Free space and I/O load of every root.
+
+    Returns a list of dicts: name, path, free, total, util (0-1 or None),
+    servers (how many live there) and available (path exists).
+    """
+    roots = get_roots()
+    with _lock:
+        placed = list(_refresh()["servers"])
+    counts = {}
+    for server in placed:
+        root = root_of(server)
+        counts[root] = counts.get(root, 0) + 1
+
+    stats = []
+    for name, path in roots.items():
+        if name == DEFAULT_ROOT:
+            os.makedirs(path, exist_ok=True)
+        entry = {"name": name, "path": path, "free": 0, "total": 0, "util": None,
+                 "servers": counts.get(name, 0), "available": os.path.isdir(path)}
+        if entry["available"]:
+            disk = psutil.disk_usage(os.path.abspath(path))
+            entry.update(free=disk.free, total=disk.total)
+        entry["device"] = _device_name(path) if entry["available"] else None
+        stats.append(entry)
+
+    util = _io_utilization([s["device"] for s in stats])
+    for s in stats:
+        s["util"] = util.get(s["device"])
+    return stats
+
+
+def choose_root():
+    """
+    Pick the root for a new server: most free space, discounted by how
+    busy its disk is right now. Falls back to the default root.
+    """
+    best, best_score = DEFAULT_ROOT, None
+    for s in root_stats():
+        if not s["available"] or s["free"] < MIN_FREE_BYTES:
+            continue
+        score = s["free"] * (1.0 - 0.8 * (s["util"] or 0.0))
+        if best_score is None or score > best_score:
+            best, best_score = s["name"], score
+    return best
+
+
+def set_server_root(server_name, root_name):
+    """Record a server's root in servers.json"""
+    from core.server_manager import load_data, save_data
+
+    data = load_data()
+    if server_name in data:
+        data[server_name]["storage_root"] = root_name
+        save_data(data)
+
+
+# -------------------- Migration --------------------
+
+def _set_migrating(server_name, migrating):
+    """
+    Flag a server as being migrated in servers.json - start_server refuses
+    to launch it meanwhile, from this process or any other
+    """
+    from core.server_manager import load_data, save_data, _registry_lock
+
+    with _registry_lock:
+        data = load_data()
+        if server_name not in data:
+            return
+        if migrating:
+            data[server_name]["migrating"] = True
+        else:
+            data[server_name].pop("migrating", None)
+        save_data(data)
+
+
+def migrate_server(server_name, target_root, workers=None):
+    """
+    Move a stopped server to another storage root.
+
+    The copy runs in parallel into a hidden staging folder on the target,
+    is renamed into place, the registry is switched over and the old copy
+    is reclaimed in the background. The server can't be started until the
+    move is done. Returns the new path.
+    """
+    roots = get_roots()
+    if target_root not in roots:
+        raise ValueError(f"Unknown storage root '{target_root}'")
+
+    # Flagged before the running check, so a start can't slip in between
+    _set_migrating(server_name, True)
+    try:
+        return _migrate(server_name, target_root, roots, workers)
+    finally:
+        _set_migrating(server_name, False)
+
+
+def _migrate(server_name, target_root, roots, workers):
+    from core.server_manager import is_server_running
+    from core.trash import schedule_deletion
+
+    if is_server_running(server_name):
+        raise RuntimeError("Stop the server before migrating it")
+
+    src = get_server_path(server_name)
+    if not os.path.isdir(src):
+        raise FileNotFoundError(src)
+    if root_of(server_name) == target_root:
+        return src
+
+    os.makedirs(roots[target_root], exist_ok=True)
+    dst = os.path.join(roots[target_root], server_name)
+    if os.path.exists(dst):
+        raise FileExistsError(dst)
+
+    if os.stat(src).st_dev == os.stat(roots[target_root]).st_dev:
+        # Same volume - a rename is instant
+        os.rename(src, dst)
+        set_server_root(server_name, target_root)
+        return dst
+
+    staging = os.path.join(roots[target_root], f".{server_name}.migrating")
+    # Resumes an interrupted migration - unchanged files are skipped
+    stats = sync_tree(src, staging, workers=workers, label=f"Migrating {server_name}")
+    print(f"✔ Copied {stats.done_bytes / 1024 ** 2:.1f} MB")
+
+    os.rename(staging, dst)
+    set_server_root(server_name, target_root)
+    schedule_deletion(server_name, src)
+    return dst
+
+
+# -------------------- Root management --------------------
+
+def add_root(name, path):
+    """Register an extra storage root in settings"""
+    from settings_module import save_settings
+
+    if name in get_roots():
+        raise ValueError(f"Storage root '{name}' already exists")
+    os.makedirs(path, exist_ok=True)
+    settings = load_settings()
+    settings.setdefault("storage_roots", []).append({"name": name, "path": path})
+    save_settings(settings)
+
+
+def remove_root(name):
+    """Unregister a storage root that no server lives on"""
+    from settings_module import save_settings
+
+    if name == DEFAULT_ROOT:
+        raise ValueError("The default root can't be removed")
+    with _lock:
+        placed = list(_refresh()["servers"])
+    users = [s for s in placed if root_of(s) == name]
+    if users:
+        raise RuntimeError(f"Still used by: {', '.join(users)} - migrate them first")
+    settings = load_settings()
+    settings["storage_roots"] = [r for r in settings.get("storage_roots", []) if r.get("name") != name]
+    save_settings(settings)
+
+
+def set_default_root(path):
+    """
+    Point the default root somewhere else. Servers already on the old
+    default keep working: the old folder becomes a named root of its own.
+    """
+    from settings_module import save_settings
+    from core.server_manager import load_data, save_data
+
+    old_path = get_roots()[DEFAULT_ROOT]
+    data = load_data()
+    on_old = [name for name in data if root_of(name) == DEFAULT_ROOT
+              and os.path.isdir(os.path.join(old_path, name))]
+
+    settings = load_settings()
+    if on_old and os.path.abspath(old_path) != os.path.abspath(path):
+        legacy = os.path.basename(os.path.abspath(old_path)) or "legacy"
+        while legacy in get_roots():
+            legacy += "-old"
+        settings.setdefault("storage_roots", []).append({"name": legacy, "path": old_path})
+        for name in on_old:
+            data[name]["storage_root"] = legacy
+        save_data(data)
+
+    os.makedirs(path, exist_ok=True)
+    settings["server_directory"] = path
+    save_settings(settings)
@@ -0,0 +1,270 @@
+"""
+Live Streams for PyCraftHub
+Per-server metric samples and console lines for the control API's
+Server-Sent Events and WebSocket endpoints.
+
+- One sampler thread serves every followed server: it tails each
+  logs/latest.log and samples the JVM with psutil every SAMPLE_INTERVAL,
+  so the cost depends on how many servers are followed, never on how
+  many clients follow them. Nothing is asked of the JVM itself.
+- Each server has one bounded ring buffer of events. Subscribers read
+  it at their own pace through a cursor; a client that falls more than
+  BUFFER_SIZE events behind is dropped instead of holding the producer.
+- Servers nobody follows are not sampled at all.
+"""
+import os
+import time
+import asyncio
+import threading
+from collections import deque
+
+from core.storage import get_server_path
+from utils.lazy import lazy_import
+
+psutil = lazy_import("psutil")
+
+SAMPLE_INTERVAL = 2.0
+TAIL_INTERVAL = 0.5
+# Events kept per server for slow readers
+BUFFER_SIZE = 1024
+# Log bytes read per server per tick - a burst is spread over several ticks
+# rather than overrunning the buffer for every reader at once
+TAIL_READ_BYTES = 32 * 1024
+# Console lines replayed to a new subscriber
+RECENT_LINES = 100
+# Bytes read back from an existing log when a server is first followed
+TAIL_START_BYTES = 16 * 1024
+
+_lock = threading.Lock()
+_channels = {}
+_sampler = [None]
+
+
+class Dropped(Exception):
+    """The subscriber fell too far behind and lost events"""
+
+
+# -------------------- Per-server channel --------------------
+
+class Channel:
+    """Ring buffer of one server's events plus what is needed to produce them"""
+
+    def __init__(self, name):
+        self.name = name
+        self.path = get_server_path(name)
+        self.log_path = os.path.join(self.path, "logs", "latest.log")
+        self.buffer = deque(maxlen=BUFFER_SIZE)
+        self.next_seq = 0
+        self.recent = deque(maxlen=RECENT_LINES)
+        self.last_metrics = None
+        self.subscribers = 0
+        self.waiters = set()
+        self.next_sample = 0.0
+        self._log_id = None
+        self._log_pos = 0
+        self._partial = b""
+        self._proc = None
+        self._start_log()
+
+    # ---------- producing ----------
+
+    def _start_log(self):
+        """Begin near the end of the current log so old history isn't replayed"""
+        try:
+            st = os.stat(self.log_path)
+        except OSError:
+            return
+        self._log_id = (st.st_dev, st.st_ino)
+        self._log_pos = max(0, st.st_size - TAIL_START_BYTES)
+        lines = self._read_log()
+        # Starting mid-file cuts the first line in half
+        for line in lines[1:] if st.st_size > TAIL_START_BYTES else lines:
+            self.recent.append({"type": "console", "server": self.name, "time": time.time(), "line": line})
+
+    def _read_log(self):
+        try:
+            st = os.stat(self.log_path)
+        except OSError:
+            return []
+        log_id = (st.st_dev, st.st_ino)
+        if log_id != self._log_id or st.st_size < self._log_pos:
+            # Rotated on restart
+            self._log_id, self._log_pos, self._partial = log_id, 0, b""
+        if st.st_size == self._log_pos:
+            return []
+
+        with open(self.log_path, "rb") as f:
+            f.seek(self._log_pos)
+            data = self._partial + f.read(TAIL_READ_BYTES)
+            self._log_pos = f.tell()
+        *lines, self._partial = data.split(b"\n")
+        return [line.rstrip(b"\r").decode("utf-8", errors="replace") for line in lines if line.strip()]
+
+    def tail(self, now):
+        return [{"type": "console", "server": self.name, "time": now, "line": line}
+                for line in self._read_log()]
+
+    def sample(self, now):
+        """CPU / memory of the server's JVM (the PID PyCraftHub recorded)"""
+        pid = None
+        try:
+            with open(os.path.join(self.path, "running.txt"), "r") as f:
+                pid = int(f.read().strip())
+        except (OSError, ValueError):
+            pass
+
+        metrics = {"type": "metrics", "server": self.name, "time": now, "running": False, "pid": pid}
+        if pid is None:
+            self._proc = None
+            return metrics
+        try:
+            if self._proc is None or self._proc.pid != pid:
+                self._proc = psutil.Process(pid)
+                # The first reading only primes the counter
+                self._proc.cpu_percent(None)
+            with self._proc.oneshot():
+                memory = self._proc.memory_info()
+                metrics.update(
+                    running=True,
+                    cpu_percent=self._proc.cpu_percent(None),
+                    memory_rss=memory.rss,
+                    threads=self._proc.num_threads(),
+                    uptime=now - self._proc.create_time(),
+                )
+        except (psutil.NoSuchProcess, psutil.AccessDenied):
+            self._proc = None
+        return metrics
+
+    def publish(self, events):
+        """Append events and wake everyone waiting (call with _lock held)"""
+        for event in events:
+            event["seq"] = self.next_seq
+            self.next_seq += 1
+            self.buffer.append(event)
+            if event["type"] == "console":
+                self.recent.append(event)
+            else:
+                self.last_metrics = event
+        waiters, self.waiters = self.waiters, set()
+        for loop, future in waiters:
+            loop.call_soon_threadsafe(_wake, future)
+
+    # ---------- reading ----------
+
+    def since(self, cursor):
+        """Events from cursor on (call with _lock held), raises Dropped if they're gone"""
+        oldest = self.next_seq - len(self.buffer)
+        if cursor < oldest:
+            raise Dropped(f"fell more than {BUFFER_SIZE} events behind on {self.name}")
+        return list(self.buffer)[cursor - oldest:]
+
+
+def _wake(future):
+    if not future.done():
+        future.set_result(None)
+
+
+# -------------------- Sampler --------------------
+
+def _run_sampler():
+    while True:
+        with _lock:
+            channels = list(_channels.values())
+            if not channels:
+                _sampler[0] = None
+                return
+
+        now = time.time()
+        for channel in channels:
+            try:
+                events = channel.tail(now)
+                if now >= channel.next_sample:
+                    channel.next_sample = now + SAMPLE_INTERVAL
+                    events.append(channel.sample(now))
+            except OSError:
+                continue
+            if events:
+                with _lock:
+                    channel.publish(events)
+        time.sleep(TAIL_INTERVAL)
+
+
+def _ensure_sampler():
+    """Start the sampler thread if it isn't running (call with _lock held)"""
+    if _sampler[0] is None:
+        _sampler[0] = threading.Thread(target=_run_sampler, name="stream-sampler", daemon=True)
+        _sampler[0].start()
+
+
+# -------------------- Subscriptions --------------------
+
+class Subscription:
+    """One client following one or more servers - use from an asyncio loop"""
+
+    def __init__(self, server_names, recent=RECENT_LINES):
+        self.cursors = {}
+        self.snapshot = []
+        with _lock:
+            # A name given twice would subscribe twice but be closed once
+            for name in dict.fromkeys(server_names):
+                channel = _channels.get(name)
+                if channel is None:
+                    channel = _channels[name] = Channel(name)
+                channel.subscribers += 1
+                self.cursors[name] = channel.next_seq
+                if channel.last_metrics:
+                    self.snapshot.append(channel.last_metrics)
+                if recent:
+                    self.snapshot += list(channel.recent)[-recent:]
+            _ensure_sampler()
+
+    async def next(self, timeout):
+        """
+        Events published since the last call, oldest first. Returns [] after
+        timeout seconds without any; raises Dropped when events were lost.
+        """
+        if self.snapshot:
+            events, self.snapshot = self.snapshot, []
+            return events
+
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        with _lock:
+            events = self._collect()
+            if events:
+                return events
+            for name in self.cursors:
+                _channels[name].waiters.add((loop, future))
+        try:
+            await asyncio.wait_for(future, timeout)
+        except asyncio.TimeoutError:
+            pass
+        with _lock:
+            for name in self.cursors:
+                _channels[name].waiters.discard((loop, future))
+            return self._collect()
+
+    def _collect(self):
+        events = []
+        for name, cursor in self.cursors.items():
+            new = _channels[name].since(cursor)
+            if new:
+                self.cursors[name] = new[-1]["seq"] + 1
+                events += new
+        return events
+
+    def close(self):
+        with _lock:
+            for name in self.cursors:
+                channel = _channels.get(name)
+                if channel:
+                    channel.subscribers -= 1
+                    if channel.subscribers <= 0:
+                        del _channels[name]
+            self.cursors = {}
+
+
+def stream_stats():
+    """Followed servers and their subscriber counts"""
+    with _lock:
+        return {name: channel.subscribers for name, channel in _channels.items()}
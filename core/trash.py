@@ -0,0 +1,302 @@
+"""
+Background Deletion for PyCraftHub
+Deleted servers are renamed into a .trash folder next to them (instant,
+same volume) and a background "delete" job reclaims the space at idle I/O
+priority. Pending deletions are journaled in data/pending_deletions.json
+so they resume the next time PyCraftHub starts.
+
+A folder that can't be renamed yet (still locked) is never deleted in
+place: only the rename is retried, and only while the same folder is
+there. Until then its name stays reserved. After MAX_ATTEMPTS the
+deletion is marked failed and shown as such; the next start retries it.
+"""
+import os
+import json
+import stat
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait
+
+from core.jobs import run_in_background, current_job, JobCancelled
+from utils.helpers import lower_thread_io_priority
+
+TRASH_DIR_NAME = ".trash"
+JOURNAL_FILE = os.path.join("data", "pending_deletions.json")
+
+REMOVE_WORKERS = 8
+REMOVE_BATCH = 256
+# Failed tries before a deletion is given up on for this session
+MAX_ATTEMPTS = 20
+RETRY_DELAY = 5
+
+_lock = threading.Lock()
+_worker = None
+# (name, queued) -> live progress of the deletion being worked on
+_progress = {}
+
+
+# -------------------- Journal --------------------
+
+def _load_journal():
+    if not os.path.exists(JOURNAL_FILE):
+        return []
+    try:
+        with open(JOURNAL_FILE, "r") as f:
+            return json.load(f)
+    except:
+        return []
+
+
+def _save_journal(entries):
+    os.makedirs("data", exist_ok=True)
+    tmp = JOURNAL_FILE + ".tmp"
+    with open(tmp, "w") as f:
+        json.dump(entries, f, indent=4)
+    os.replace(tmp, JOURNAL_FILE)
+
+
+# -------------------- Scheduling --------------------
+
+def move_to_trash(path, name, retries=10):
+    """
+    Atomically rename a folder into the trash next to it.
+    Returns the new path, or None if the folder is still locked.
+    """
+    trash_root = os.path.join(os.path.dirname(os.path.abspath(path)), TRASH_DIR_NAME)
+    os.makedirs(trash_root, exist_ok=True)
+    target = os.path.join(trash_root, f"{name}-{int(time.time() * 1000)}")
+
+    for _ in range(retries):
+        try:
+            os.rename(path, target)
+            return target
+        except PermissionError:
+            # Windows keeps folders locked for a moment after a process dies
+            time.sleep(0.2)
+    return None
+
+
+def _identity(path):
+    st = os.stat(path)
+    return [st.st_dev, st.st_ino]
+
+
+def schedule_deletion(name, path):
+    """Move a server folder out of the way and queue it for background removal"""
+    identity = _identity(path)
+    target = move_to_trash(path, name)
+
+    entry = {
+        "name": name,
+        "path": target or os.path.abspath(path),
+        "renamed": target is not None,
+        "queued": time.strftime("%Y-%m-%d %H:%M:%S"),
+    }
+    if target is None:
+        # Only this folder may be renamed later, not whatever takes its place
+        entry["identity"] = identity
+
+    with _lock:
+        entries = _load_journal()
+        entries.append(entry)
+        _save_journal(entries)
+        _ensure_worker()
+
+    return entry
+
+
+def resume_pending_deletions():
+    """Restart the worker for deletions left over from a previous run (failed ones get another go)"""
+    with _lock:
+        entries = _load_journal()
+        if entries:
+            for e in entries:
+                e.pop("failed", None)
+                e["attempts"] = 0
+            _save_journal(entries)
+            _ensure_worker()
+
+
+def is_name_reserved(name):
+    """True while a deleted server of this name still sits at its old path"""
+    with _lock:
+        return any(e["name"] == name and not e.get("renamed") for e in _load_journal())
+
+
+def get_deletion_status():
+    """Pending deletions with progress (percent is None until scanned)"""
+    status = []
+    with _lock:
+        for entry in _load_journal():
+            prog = _progress.get(_key(entry))
+            percent = None
+            if prog and prog["files"]:
+                percent = prog["removed"] / prog["files"] * 100
+            elif prog:
+                percent = 0.0
+            status.append({
+                "name": entry["name"],
+                "percent": percent,
+                "freed": prog["freed"] if prog else 0,
+                "total": prog["bytes"] if prog else 0,
+                "path": entry["path"],
+                "renamed": entry.get("renamed", True),
+                "failed": entry.get("error") if entry.get("failed") else None,
+            })
+    return status
+
+
+# -------------------- Worker --------------------
+
+def _ensure_worker():
+    """Start the reclaim job if it isn't running (call with _lock held)"""
+    global _worker
+    if _worker is None or _worker.done:
+        _worker = run_in_background("Reclaim deleted servers", _worker_loop, job_type="delete")
+
+
+def _worker_loop():
+    global _worker
+    lower_thread_io_priority()
+
+    while True:
+        with _lock:
+            entries = _load_journal()
+            pending = [e for e in entries if not e.get("failed")]
+            if not pending:
+                _worker = None
+                failed = [e["name"] for e in entries if e.get("failed")]
+                if failed:
+                    raise RuntimeError(f"Could not delete: {', '.join(failed)} (retried on next start)")
+                return
+            entry = pending[0]
+
+        try:
+            _reclaim(entry)
+        except JobCancelled:
+            # Left in the journal, resumed on the next start
+            with _lock:
+                _progress.pop(_key(entry), None)
+            raise
+        except Exception as e:
+            # Move it to the back of the queue and retry later, up to MAX_ATTEMPTS
+            with _lock:
+                _progress.pop(_key(entry), None)
+                entries = _load_journal()
+                failed = [x for x in entries if _key(x) == _key(entry)]
+                for x in failed:
+                    x["attempts"] = x.get("attempts", 0) + 1
+                    x["error"] = str(e)
+                    if x["attempts"] >= MAX_ATTEMPTS:
+                        x["failed"] = True
+                _save_journal([x for x in entries if _key(x) != _key(entry)] + failed)
+            time.sleep(RETRY_DELAY)
+            continue
+
+        with _lock:
+            _save_journal([e for e in _load_journal() if _key(e) != _key(entry)])
+            _progress.pop(_key(entry), None)
+
+
+def _key(entry):
+    return entry["name"], entry["queued"]
+
+
+def _scan(path):
+    files, dirs, total = [], [], 0
+    stack = [path]
+    while stack:
+        current = stack.pop()
+        dirs.append(current)
+        try:
+            with os.scandir(current) as it:
+                for e in it:
+                    if e.is_dir(follow_symlinks=False):
+                        stack.append(e.path)
+                    else:
+                        try:
+                            total += e.stat(follow_symlinks=False).st_size
+                        except OSError:
+                            pass
+                        files.append(e.path)
+        except FileNotFoundError:
+            pass
+    return files, dirs, total
+
+
+def _remove_batch(paths, prog):
+    freed = 0
+    for p in paths:
+        try:
+            size = os.lstat(p).st_size
+            try:
+                os.remove(p)
+            except PermissionError:
+                # Read-only files can't be deleted on Windows
+                os.chmod(p, stat.S_IWRITE)
+                os.remove(p)
+            freed += size
+        except FileNotFoundError:
+            pass
+    with _lock:
+        prog["removed"] += len(paths)
+        prog["freed"] += freed
+
+
+def _reclaim(entry):
+    path = entry["path"]
+
+    # Folder was locked when deleted - only ever delete it once it's out of the way
+    if not entry.get("renamed"):
+        try:
+            identity = _identity(path)
+        except OSError:
+            return
+        if entry.get("identity") and identity != entry["identity"]:
+            # Something else lives there now
+            return
+        target = move_to_trash(path, entry["name"], retries=50)
+        if not target:
+            raise RuntimeError(f"{path} is still locked")
+        with _lock:
+            entries = _load_journal()
+            for e in entries:
+                if _key(e) == _key(entry):
+                    e["path"], e["renamed"] = target, True
+            _save_journal(entries)
+        path = target
+
+    if not os.path.exists(path):
+        return
+
+    files, dirs, total = _scan(path)
+    prog = {"files": len(files), "removed": 0, "bytes": total, "freed": 0}
+    with _lock:
+        _progress[_key(entry)] = prog
+
+    job = current_job()
+    if job:
+        job.update(done_bytes=0, total_bytes=total, done_files=0, total_files=len(files))
+
+    with ThreadPoolExecutor(max_workers=REMOVE_WORKERS, initializer=lower_thread_io_priority) as pool:
+        pending = {
+            pool.submit(_remove_batch, files[i:i + REMOVE_BATCH], prog)
+            for i in range(0, len(files), REMOVE_BATCH)
+        }
+        while pending:
+            _, pending = wait(pending, timeout=0.5)
+            if job:
+                job.update(done_bytes=prog["freed"], done_files=prog["removed"])
+                if job.cancelled:
+                    for f in pending:
+                        f.cancel()
+                    job.check_cancelled()
+
+    for d in sorted(dirs, key=len, reverse=True):
+        try:
+            os.rmdir(d)
+        except OSError:
+            pass
+
+    if os.path.exists(path):
+        raise RuntimeError(f"Could not fully remove {path}")
@@ -0,0 +1,318 @@
+"""
+Version Catalog for PyCraftHub
+One locally cached table of which Minecraft versions every server type
+supports, so a version can be checked (and corrected) while the user is
+still typing instead of after a failed download.
+
+Sources merged into data/version_catalog.json:
+- vanilla: Mojang version manifest (plus each version's metadata URL)
+- paper / purpur: their API version lists, latest builds of recent versions
+- fabric: supported game versions, latest loader and installer
+- forge: promotions (recommended / latest build per version)
+
+Lookups only read the cache. refresh_catalog() runs in the background when
+the cache is older than CATALOG_MAX_AGE, and a source that can't be reached
+keeps its previous data.
+"""
+import os
+import re
+import json
+import time
+import difflib
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from utils.lazy import lazy_import
+from core.jobs import run_in_background
+
+requests = lazy_import("requests")
+
+CATALOG_FILE = os.path.join("data", "version_catalog.json")
+CATALOG_MAX_AGE = 6 * 3600
+
+SERVER_TYPES = ("paper", "purpur", "vanilla", "fabric", "forge")
+
+# Latest builds are looked up for this many of the newest Paper/Purpur versions
+BUILD_PREFETCH = 8
+
+MOJANG_MANIFEST = "https://launchermeta.mojang.com/mc/game/version_manifest.json"
+PAPER_API = "https://api.papermc.io/v2/projects/paper"
+PURPUR_API = "https://api.purpurmc.org/v2/purpur"
+FABRIC_META = "https://meta.fabricmc.net/v2/versions"
+FORGE_PROMOS = "https://files.minecraftforge.net/net/minecraftforge/forge/promotions_slim.json"
+
+_lock = threading.Lock()
+_refreshing = threading.Lock()
+# Loaded catalog plus {version: [types]} built from it
+_state = {"mtime": None, "catalog": {}, "index": {}}
+
+
+# -------------------- Ordering --------------------
+
+def version_key(version):
+    """Sort key putting 1.21.10 after 1.21.9 and releases after their pre-releases"""
+    match = re.match(r"(\d+(?:\.\d+)*)(.*)", version)
+    if not match:
+        return ((), 0, version)
+    numbers = tuple(int(n) for n in match.group(1).split("."))
+    # "" (release) sorts after "-pre1" / "-rc1"
+    return (numbers, 0 if match.group(2) else 1, match.group(2))
+
+
+def _newest_first(versions):
+    return sorted(set(versions), key=version_key, reverse=True)
+
+
+# -------------------- Fetching --------------------
+
+def _get_json(url):
+    r = requests.get(url, timeout=15)
+    r.raise_for_status()
+    return r.json()
+
+
+def _fetch_vanilla():
+    manifest = _get_json(MOJANG_MANIFEST)
+    versions = [v["id"] for v in manifest["versions"]]
+    return {
+        "versions": versions,
+        "snapshots": [v["id"] for v in manifest["versions"] if v["type"] != "release"],
+        "urls": {v["id"]: v["url"] for v in manifest["versions"]},
+        "latest": manifest["latest"]["release"],
+    }
+
+
+def _fetch_paper():
+    versions = _newest_first(_get_json(PAPER_API)["versions"])
+    builds = {}
+    for version in versions[:BUILD_PREFETCH]:
+        version_builds = _get_json(f"{PAPER_API}/versions/{version}").get("builds")
+        if version_builds:
+            builds[version] = max(version_builds)
+    return {"versions": versions, "builds": builds}
+
+
+def _fetch_purpur():
+    versions = _newest_first(_get_json(PURPUR_API)["versions"])
+    builds = {}
+    for version in versions[:BUILD_PREFETCH]:
+        latest = (_get_json(f"{PURPUR_API}/{version}").get("builds") or {}).get("latest")
+        if latest:
+            builds[version] = latest
+    return {"versions": versions, "builds": builds}
+
+
+def _fetch_fabric():
+    games = _get_json(f"{FABRIC_META}/game")
+    return {
+        "versions": [g["version"] for g in games],
+        "snapshots": [g["version"] for g in games if not g.get("stable")],
+        "loader": _get_json(f"{FABRIC_META}/loader")[0]["version"],
+        "installer": _get_json(f"{FABRIC_META}/installer")[0]["version"],
+    }
+
+
+def _fetch_forge():
+    promos = _get_json(FORGE_PROMOS)["promos"]
+    latest, recommended = {}, {}
+    for key, build in promos.items():
+        version, _, kind = key.rpartition("-")
+        if kind == "recommended":
+            recommended[version] = build
+        elif kind == "latest":
+            latest[version] = build
+    return {
+        "versions": _newest_first(latest.keys() | recommended.keys()),
+        "builds": latest,
+        "recommended": recommended,
+    }
+
+
+FETCHERS = {
+    "vanilla": _fetch_vanilla,
+    "paper": _fetch_paper,
+    "purpur": _fetch_purpur,
+    "fabric": _fetch_fabric,
+    "forge": _fetch_forge,
+}
+
+
+# -------------------- Cache --------------------
+
+def _mtime():
+    try:
+        return os.stat(CATALOG_FILE).st_mtime_ns
+    except OSError:
+        return None
+
+
+def _build_index(catalog):
+    index = {}
+    for server_type in SERVER_TYPES:
+        for version in catalog.get(server_type, {}).get("versions", []):
+            index.setdefault(version, []).append(server_type)
+    return index
+
+
+def _load():
+    """Current catalog, re-read only when the file changed"""
+    mtime = _mtime()
+    if mtime != _state["mtime"]:
+        try:
+            with open(CATALOG_FILE, "r") as f:
+                catalog = json.load(f)
+        except (OSError, ValueError):
+            catalog = {}
+        _state.update(mtime=mtime, catalog=catalog, index=_build_index(catalog))
+    return _state
+
+
+def _save(catalog):
+    os.makedirs("data", exist_ok=True)
+    tmp = CATALOG_FILE + ".tmp"
+    with open(tmp, "w") as f:
+        json.dump(catalog, f)
+    os.replace(tmp, CATALOG_FILE)
+
+
+def refresh_catalog(sources=None):
+    """
+    Fetch the given sources (all by default) in parallel and merge them
+    into the cache. Returns {source: error} for the ones that failed.
+    """
+    sources = sources or list(FETCHERS)
+    with ThreadPoolExecutor(max_workers=len(sources)) as pool:
+        futures = {s: pool.submit(FETCHERS[s]) for s in sources}
+
+    errors = {}
+    with _lock:
+        catalog = dict(_load()["catalog"])
+        updated = dict(catalog.get("updated", {}))
+        for source, future in futures.items():
+            try:
+                catalog[source] = future.result()
+                updated[source] = time.time()
+            except Exception as e:
+                errors[source] = e
+        catalog["updated"] = updated
+        _save(catalog)
+        _state.update(mtime=_mtime(), catalog=catalog, index=_build_index(catalog))
+    return errors
+
+
+def catalog_age():
+    """Seconds since the oldest source was refreshed (None if never)"""
+    with _lock:
+        updated = _load()["catalog"].get("updated", {})
+    if not all(s in updated for s in FETCHERS):
+        return None
+    return time.time() - min(updated.values())
+
+
+def start_catalog_refresh(force=False):
+    """Refresh a stale catalog without blocking the caller"""
+    age = catalog_age()
+    if not force and age is not None and age < CATALOG_MAX_AGE:
+        return
+
+    def run():
+        # One refresh at a time
+        if _refreshing.acquire(blocking=False):
+            try:
+                refresh_catalog()
+            finally:
+                _refreshing.release()
+
+    run_in_background("Version catalog refresh", run, job_type="refresh")
+
+
+# -------------------- Lookups --------------------
+
+def has_data(server_type):
+    with _lock:
+        return bool(_load()["catalog"].get(server_type, {}).get("versions"))
+
+
+def types_for(version):
+    """Server types that support a Minecraft version"""
+    with _lock:
+        return list(_load()["index"].get(version, []))
+
+
+def versions_for(server_type, snapshots=False):
+    """Versions a server type supports, newest first"""
+    with _lock:
+        source = _load()["catalog"].get(server_type, {})
+    excluded = set() if snapshots else set(source.get("snapshots", []))
+    return [v for v in source.get("versions", []) if v not in excluded]
+
+
+def latest_version(server_type):
+    """Newest release a server type supports (None if unknown)"""
+    versions = [v for v in versions_for(server_type) if re.fullmatch(r"[\d.]+", v)]
+    return versions[0] if versions else None
+
+
+def latest_build(server_type, version):
+    """
+    Cached latest build for a version: Paper/Purpur build number, Forge
+    version (recommended before latest), Fabric loader. None if not cached.
+    """
+    with _lock:
+        source = _load()["catalog"].get(server_type, {})
+    if server_type == "forge":
+        return source.get("recommended", {}).get(version) or source.get("builds", {}).get(version)
+    if server_type == "fabric":
+        return source.get("loader") if version in source.get("versions", []) else None
+    return source.get("builds", {}).get(version)
+
+
+def fabric_installer():
+    with _lock:
+        return _load()["catalog"].get("fabric", {}).get("installer")
+
+
+def vanilla_metadata_url(version):
+    """Mojang per-version metadata URL, saves fetching the whole manifest"""
+    with _lock:
+        return _load()["catalog"].get("vanilla", {}).get("urls", {}).get(version)
+
+
+def suggest(version, server_type=None, limit=3):
+    """Closest valid versions to what was typed"""
+    if server_type:
+        candidates = versions_for(server_type)
+    else:
+        with _lock:
+            candidates = list(_load()["index"])
+    close = difflib.get_close_matches(version, candidates, n=limit, cutoff=0.6)
+    # "1.21" -> its newest patch releases
+    prefixed = [v for v in candidates if v.startswith(version + ".")][:limit]
+    return list(dict.fromkeys(prefixed + close))[:limit]
+
+
+def validate_version(server_type, version):
+    """
+    Check a version against the catalog.
+
+    Returns (ok, message). Unknown is treated as ok when the catalog has no
+    data for the type yet (first run offline) - the download will tell.
+    """
+    if not version:
+        return False, "No version entered"
+    if not has_data(server_type):
+        return True, None
+    if version in versions_for(server_type, snapshots=True):
+        return True, None
+
+    name = server_type.capitalize()
+    others = types_for(version)
+    if others:
+        message = f"{name} doesn't support {version} (available on: {', '.join(others)})"
+    else:
+        message = f"'{version}' isn't a known Minecraft version"
+
+    suggestions = suggest(version, server_type)
+    if suggestions:
+        message += f". Did you mean: {', '.join(suggestions)}?"
+    return False, message
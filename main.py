@@ -1,5 +1,13 @@
 import os
 import sys
+import threading
+
+# Must come before the heavy imports it is meant to time
+from utils.startup_profile import PROFILE_FLAG, enable_profiling, profiling, startup_step, print_report
+if PROFILE_FLAG in sys.argv:
+    enable_profiling()
+from utils.action_profile import enable_from_env, profiled
+enable_from_env(sys.argv[1:])
 
 # Try to import colorama, fallback to no colors if not available
 try:
@@ -27,6 +35,14 @@ from core.server_manager import (
     stop_server, restart_server, delete_server,
     list_servers, load_data, list_installed_mods
 )
+from core.trash import resume_pending_deletions, get_deletion_status
+from core.disk_usage import (
+    refresh_all, start_background_refresh, get_usage,
+    growth_rate, forecast_volumes
+)
+from core.version_catalog import start_catalog_refresh
+from core.jobs import run_in_background, list_jobs, get_job, cancel_job, clear_finished
+from utils.helpers import format_bytes, format_eta
 
 # Import settings module
 try:
@@ -46,6 +62,26 @@ except ImportError:
         running_file = os.path.join(path, "running.txt")
         return os.path.exists(running_file)
 
+# Running servers for the statistics line - scanned in the background
+# because finding a server's process can take a while
+_running = {"names": None, "scanning": False}
+_running_lock = threading.Lock()
+
+def start_status_scan(names):
+    """Check which servers are running without holding up the menu"""
+    with _running_lock:
+        if _running["scanning"]:
+            return
+        _running["scanning"] = True
+
+    def scan():
+        try:
+            _running["names"] = {name for name in names if is_server_running(name)}
+        finally:
+            _running["scanning"] = False
+
+    threading.Thread(target=scan, name="status-scan", daemon=True).start()
+
 def clear_screen():
     """Clear the console screen"""
     os.system('cls' if os.name == 'nt' else 'clear')
@@ -100,6 +136,17 @@ def print_server_card(name, info, index):
     mode_color = Fore.BLUE if online_mode == "true" else Fore.MAGENTA
     print(f"{THEME_COLOR}│ {mode_color}{mode_text:<67}{THEME_COLOR}│")
     
+    usage = get_usage(name)
+    if usage:
+        print(f"{THEME_COLOR}│ {Fore.YELLOW}Disk:{Fore.WHITE} {format_bytes(usage['total']):<10} "
+              f"{Fore.YELLOW}World:{Fore.WHITE} {format_bytes(usage['world']):<10} "
+              f"{Fore.YELLOW}Logs:{Fore.WHITE} {format_bytes(usage['logs']):<10} "
+              f"{Fore.YELLOW}Plugins:{Fore.WHITE} {format_bytes(usage['plugins']):<10}{THEME_COLOR}│")
+        rate = growth_rate(name)
+        growth = f"{'+' if rate >= 0 else '-'}{format_bytes(abs(rate))}/day" if rate is not None else "collecting..."
+        print(f"{THEME_COLOR}│ {Fore.YELLOW}Backups:{Fore.WHITE} {format_bytes(usage['backups']):<10} "
+              f"{Fore.YELLOW}Growth:{Fore.WHITE} {growth:<40}{THEME_COLOR}│")
+    
     print(f"{THEME_COLOR}└" + "─" * 70 + "┘")
 
 def show_quick_actions():
@@ -126,9 +173,11 @@ def server_management_menu():
             return
         
         server_list = list(data.keys())
+        refresh_all(server_list)
         for i, name in enumerate(server_list, 1):
             print_server_card(name, data[name], i)
         
+        print_pending_deletions()
         show_quick_actions()
         
         choice = input(f"\n{THEME_COLOR}Action: {Fore.WHITE}").strip().lower()
@@ -147,17 +196,17 @@ def server_management_menu():
         server_name = server_list[int(sel) - 1]
         
         if choice == 's':
-            start_server(server_name)
+            profiled(f"start {server_name}", start_server, server_name)
         elif choice == 'x':
-            stop_server(server_name)
+            profiled(f"stop {server_name}", stop_server, server_name)
         elif choice == 'r':
-            restart_server(server_name)
+            profiled(f"restart {server_name}", restart_server, server_name)
         elif choice == 'e':
-            edit_server()
+            profiled("edit server", edit_server)
         elif choice == 'd':
             confirm = input(f"\n{Fore.RED}⚠️  Delete '{server_name}'? This cannot be undone! (yes/no): {Fore.WHITE}")
             if confirm.lower() == 'yes':
-                delete_server(server_name)
+                profiled(f"delete {server_name}", delete_server, server_name)
         else:
             print(f"{Fore.RED}❌ Invalid action")
         
@@ -177,6 +226,8 @@ def server_tools_menu():
         print(f"{THEME_COLOR}│  {Fore.GREEN}4.{Fore.WHITE} 🗑️  Clean Server Cache/Logs                                     {THEME_COLOR}│")
         print(f"{THEME_COLOR}│  {Fore.GREEN}5.{Fore.WHITE} 📤 Export Server                                                 {THEME_COLOR}│")
         print(f"{THEME_COLOR}│  {Fore.GREEN}6.{Fore.WHITE} 📥 Import Server Package                                         {THEME_COLOR}│")
+        print(f"{THEME_COLOR}│  {Fore.GREEN}7.{Fore.WHITE} 🗺️  World Analyzer, Pruner & Optimizer                           {THEME_COLOR}│")
+        print(f"{THEME_COLOR}│  {Fore.GREEN}8.{Fore.WHITE} 💽 Storage Roots & Migration                                     {THEME_COLOR}│")
         print(f"{THEME_COLOR}│  {Fore.GREEN}0.{Fore.WHITE} 🔙 Back to Main Menu                                             {THEME_COLOR}│")
         print(f"{THEME_COLOR}│                                                                        │")
         print(f"{THEME_COLOR}╰" + "─" * 75 + "╯")
@@ -198,22 +249,232 @@ def server_tools_menu():
             print(f"{Fore.WHITE}Restore your server from a previous backup")
             print(f"{Fore.CYAN}🚧 Coming in v4.0 update!(along with a major drop)")
         elif choice == "4":
-            print(f"\n{Fore.YELLOW}🗑️  Clean Server Cache/Logs")
-            print(f"{Fore.WHITE}Clear old logs and cache files to free up space")
-            print(f"{Fore.CYAN}🚧 Coming in v4.0 update!(along with a major drop)")
+            clean_servers_menu()
         elif choice == "5":
-            print(f"\n{Fore.YELLOW}📤 Export Server")
-            print(f"{Fore.WHITE}Package your server for sharing or migration")
-            print(f"{Fore.CYAN}🚧 Coming in v4.0 update!(along with a major drop)")
+            export_server_menu()
         elif choice == "6":
-            print(f"\n{Fore.YELLOW}📥 Import Server Package")
-            print(f"{Fore.WHITE}Import a server from a .zip package")
-            print(f"{Fore.CYAN}🚧 Coming in v4.0 update!(along with a major drop)")
+            import_server_package_menu()
+        elif choice == "7":
+            world_tools_menu()
+        elif choice == "8":
+            storage_menu()
         else:
             print(f"{Fore.RED}❌ Invalid option")
         
         input(f"\n{Fore.GREEN}Press ENTER to continue...")
 
+def clean_servers_menu():
+    """Run the log/cache cleaner"""
+    from core.cleaner import (
+        clean_all_servers, clean_server, print_cleanup_report, compression_state
+    )
+
+    print(f"\n{Fore.YELLOW}🗑️  Clean Server Cache/Logs")
+    print(f"{Fore.WHITE}Clear old logs and cache files to free up space")
+
+    if compression_state["pending"] or compression_state["done"]:
+        print(f"{Fore.CYAN}🗜 Background compression: {compression_state['done']} done, "
+              f"{compression_state['pending']} pending")
+
+    policy = settings.get("cleanup_policy", {})
+    print(f"\n{Fore.WHITE}Policy: keep last {policy.get('keep_last_logs', 10)}, "
+          f"max age {policy.get('max_log_age_days', 14)} days, "
+          f"max {policy.get('max_log_total_mb', 512)} MB per folder")
+
+    print(f"\n{THEME_COLOR}1.{Fore.WHITE} Clean all servers")
+    print(f"{THEME_COLOR}2.{Fore.WHITE} Preview (nothing is deleted)")
+    print(f"{THEME_COLOR}3.{Fore.WHITE} Clean one server")
+    print(f"{THEME_COLOR}0.{Fore.WHITE} Back")
+
+    sub = input(f"\n{THEME_COLOR}» {Fore.WHITE}").strip()
+
+    if sub == "1":
+        print_cleanup_report(clean_all_servers())
+    elif sub == "2":
+        print_cleanup_report(clean_all_servers(dry_run=True))
+    elif sub == "3":
+        name = input(f"\n{Fore.YELLOW}Server name: {Fore.WHITE}").strip()
+        data = load_data() or {}
+        if name not in data:
+            print(f"{Fore.RED}❌ Server not found")
+            return
+        print_cleanup_report([clean_server(name, data[name])])
+
+def storage_menu():
+    """Manage storage roots and move servers between them"""
+    from core.storage import root_stats, add_root, remove_root, migrate_server
+
+    print(f"\n{Fore.YELLOW}💽 Storage Roots & Migration")
+    print(f"{Fore.WHITE}Keep busy worlds on fast disks and the rest on bulk storage")
+
+    print(f"\n{'Root':<14} {'Path':<30} {'Free':>10} {'Busy':>6} {'Servers':>8}")
+    print("─" * 72)
+    for s in root_stats():
+        busy = f"{s['util'] * 100:.0f}%" if s["util"] is not None else "?"
+        free = format_bytes(s["free"]) if s["available"] else "missing"
+        print(f"{s['name']:<14} {s['path'][:30]:<30} {free:>10} {busy:>6} {s['servers']:>8}")
+
+    print(f"\n{THEME_COLOR}1.{Fore.WHITE} Add storage root")
+    print(f"{THEME_COLOR}2.{Fore.WHITE} Remove storage root")
+    print(f"{THEME_COLOR}3.{Fore.WHITE} Migrate server (server must be stopped)")
+    print(f"{THEME_COLOR}0.{Fore.WHITE} Back")
+
+    sub = input(f"\n{THEME_COLOR}» {Fore.WHITE}").strip()
+
+    try:
+        if sub == "1":
+            name = input(f"\n{Fore.YELLOW}Root name (e.g. nvme): {Fore.WHITE}").strip()
+            path = input(f"{Fore.YELLOW}Folder: {Fore.WHITE}").strip()
+            if name and path:
+                add_root(name, path)
+                print(f"{Fore.GREEN}✔ Storage root '{name}' added")
+        elif sub == "2":
+            name = input(f"\n{Fore.YELLOW}Root name: {Fore.WHITE}").strip()
+            remove_root(name)
+            print(f"{Fore.GREEN}✔ Storage root '{name}' removed")
+        elif sub == "3":
+            server_name = input(f"\n{Fore.YELLOW}Server name: {Fore.WHITE}").strip()
+            if server_name not in (load_data() or {}):
+                print(f"{Fore.RED}❌ Server not found")
+                return
+            target = input(f"{Fore.YELLOW}Move to root: {Fore.WHITE}").strip()
+            job = run_in_background(f"Migrate {server_name} to {target}", migrate_server,
+                                    server_name, target, job_type="migrate")
+            print(f"{Fore.GREEN}📋 Migration queued as job #{job.id} - follow it in the Jobs menu")
+            print(f"{Fore.CYAN}🗑 The old copy is removed in the background once it's done")
+    except Exception as e:
+        print(f"{Fore.RED}❌ {e}")
+
+def world_tools_menu():
+    """Analyze a server's worlds and prune never-visited chunks"""
+    from core.region_tools import (
+        analyze_world, prune_world, print_world_report, print_prune_report, read_spawn,
+        optimize_world, print_optimize_report, codec_available
+    )
+    from core.storage import get_server_path
+
+    print(f"\n{Fore.YELLOW}🗺️  World Analyzer & Chunk Pruner")
+    print(f"{Fore.WHITE}See how much of your world was actually played and trim the rest")
+
+    server_name = input(f"\n{Fore.YELLOW}Server name: {Fore.WHITE}").strip()
+    if server_name not in (load_data() or {}):
+        print(f"{Fore.RED}❌ Server not found")
+        return
+
+    print(f"\n{THEME_COLOR}1.{Fore.WHITE} Analyze worlds")
+    print(f"{THEME_COLOR}2.{Fore.WHITE} Prune chunks (server must be stopped)")
+    print(f"{THEME_COLOR}3.{Fore.WHITE} Compact & recompress region files (server must be stopped)")
+    print(f"{THEME_COLOR}0.{Fore.WHITE} Back")
+
+    sub = input(f"\n{THEME_COLOR}» {Fore.WHITE}").strip()
+
+    if sub == "1":
+        print(f"\n{Fore.YELLOW}🔍 Reading region files...")
+        print_world_report(analyze_world(server_name))
+
+    elif sub == "2":
+        minutes = input(f"\n{Fore.YELLOW}Prune chunks players spent less than N minutes in (ENTER to skip): {Fore.WHITE}").strip()
+        blocks = input(f"{Fore.YELLOW}Prune chunks further than N blocks from spawn (ENTER to skip): {Fore.WHITE}").strip()
+
+        try:
+            min_inhabited = int(float(minutes) * 60 * 20) if minutes else None
+            radius = int(blocks) // 16 if blocks else None
+        except ValueError:
+            print(f"{Fore.RED}❌ Invalid number")
+            return
+
+        if min_inhabited is None and radius is None:
+            print(f"{Fore.YELLOW}Nothing to prune")
+            return
+
+        if radius is not None:
+            spawn = read_spawn(get_server_path(server_name))
+            print(f"{Fore.WHITE}Spawn chunk: {spawn[0]}, {spawn[1]}")
+
+        try:
+            print(f"\n{Fore.YELLOW}🔍 Preview:")
+            report, elapsed = prune_world(server_name, min_inhabited, radius, dry_run=True)
+            print_prune_report(report, elapsed, dry_run=True)
+
+            confirm = input(f"\n{Fore.RED}⚠️  Prune these chunks? Back up first - this cannot be undone! (yes/no): {Fore.WHITE}")
+            if confirm.lower() != "yes":
+                print(f"{Fore.YELLOW}Prune cancelled")
+                return
+
+            report, elapsed = prune_world(server_name, min_inhabited, radius)
+            print_prune_report(report, elapsed, dry_run=False)
+        except Exception as e:
+            print(f"{Fore.RED}❌ Prune failed: {e}")
+
+    elif sub == "3":
+        print(f"\n{Fore.YELLOW}Chunk compression (region-file-compression, Minecraft 1.20.5+):")
+        print(f"{THEME_COLOR}1.{Fore.WHITE} Keep current (compact only)")
+        print(f"{THEME_COLOR}2.{Fore.WHITE} LZ4 - fastest chunk loading, slightly bigger"
+              + ("" if codec_available("lz4") else f" {Fore.RED}(pip install lz4 xxhash)"))
+        print(f"{THEME_COLOR}3.{Fore.WHITE} Deflate - Minecraft default, smallest")
+        print(f"{THEME_COLOR}4.{Fore.WHITE} None - no compression, biggest")
+
+        codec = {"1": None, "2": "lz4", "3": "deflate", "4": "none"}.get(
+            input(f"\n{THEME_COLOR}» {Fore.WHITE}").strip(), None
+        )
+
+        confirm = input(f"\n{Fore.RED}⚠️  Rewrite every region file? Back up first! (yes/no): {Fore.WHITE}")
+        if confirm.lower() != "yes":
+            print(f"{Fore.YELLOW}Cancelled")
+            return
+
+        try:
+            print(f"\n{Fore.YELLOW}🔧 Rewriting region files...")
+            totals, elapsed = optimize_world(server_name, codec)
+            print_optimize_report(totals, elapsed, codec)
+        except Exception as e:
+            print(f"{Fore.RED}❌ Optimize failed: {e}")
+
+def export_server_menu():
+    """Export a server as a streaming package"""
+    from core.server_package import export_server, default_package_path, HAS_ZSTD
+
+    print(f"\n{Fore.YELLOW}📤 Export Server")
+    print(f"{Fore.WHITE}Package your server for sharing or migration")
+    if not HAS_ZSTD:
+        print(f"{Fore.YELLOW}⚠ zstandard not installed - using slower gzip (pip install zstandard)")
+
+    server_name = input(f"\n{Fore.YELLOW}Server name: {Fore.WHITE}").strip()
+    if server_name not in (load_data() or {}):
+        print(f"{Fore.RED}❌ Server not found")
+        return
+
+    default_path = default_package_path(server_name)
+    output = input(f"{Fore.YELLOW}Output file [{default_path}]: {Fore.WHITE}").strip() or default_path
+
+    exclude_logs = input(f"{Fore.YELLOW}Leave out logs & crash reports? (y/n): {Fore.WHITE}").strip().lower() != "n"
+    exclude_caches = input(f"{Fore.YELLOW}Leave out rebuildable caches? (y/n): {Fore.WHITE}").strip().lower() != "n"
+    refetch_jars = input(f"{Fore.YELLOW}Re-download JARs on import instead of shipping them? (y/n): {Fore.WHITE}").strip().lower() != "n"
+
+    job = run_in_background(f"Export {server_name}", export_server, server_name, output,
+                            exclude_logs, exclude_caches, refetch_jars, job_type="export")
+    print(f"{Fore.GREEN}📋 Export queued as job #{job.id}, package goes to {output}")
+    print(f"{Fore.CYAN}💡 To copy straight to another host:")
+    print(f"   python -m core.server_package export {server_name} - | ssh HOST \"cd PyCraftHub && python -m core.server_package import -\"")
+
+def import_server_package_menu():
+    """Import a server package and register it"""
+    from core.server_package import import_server_package
+
+    print(f"\n{Fore.YELLOW}📥 Import Server Package")
+    print(f"{Fore.WHITE}Import a server from a PyCraftHub package")
+
+    source = input(f"\n{Fore.YELLOW}Package file: {Fore.WHITE}").strip().strip('"')
+    if not os.path.isfile(source):
+        print(f"{Fore.RED}❌ File not found")
+        return
+
+    new_name = input(f"{Fore.YELLOW}Server name (ENTER to keep original): {Fore.WHITE}").strip() or None
+
+    job = run_in_background(f"Import {os.path.basename(source)}", import_server_package,
+                            source, new_name=new_name, job_type="import")
+    print(f"{Fore.GREEN}📋 Import queued as job #{job.id} - the server appears once it's done")
+
 def show_about():
     """Show about/credits screen"""
     clear_screen()
@@ -466,11 +727,11 @@ def settings_menu():
             new_dir = input(f"{THEME_COLOR}» {Fore.WHITE}").strip()
             
             if new_dir:
-                settings['server_directory'] = new_dir
-                save_settings(settings)
+                from core.storage import set_default_root
                 
-                # Create directory if it doesn't exist
-                os.makedirs(new_dir, exist_ok=True)
+                # Existing servers keep their folder as a named storage root
+                set_default_root(new_dir)
+                settings = load_settings()
                 
                 print(f"\n{Fore.GREEN}✔ Server directory set to: {new_dir}")
             else:
@@ -680,23 +941,135 @@ def settings_menu():
             
             input(f"\n{Fore.YELLOW}Press ENTER to continue...")
 
+def print_jobs_table(jobs):
+    """One line per job: ID, type, status, progress, rate, ETA"""
+    colors = {"queued": Fore.YELLOW, "running": Fore.CYAN, "done": Fore.GREEN,
+              "failed": Fore.RED, "cancelled": Fore.MAGENTA}
+    print(f"\n{'ID':>4}  {'Type':<9} {'Name':<30} {'Status':<10} {'Progress':>9} {'Rate':>11} {'ETA':>8}")
+    print("─" * 88)
+    for job in jobs:
+        status = job.status
+        percent = f"{job.percent:.1f}%" if job.percent is not None else "-"
+        if job.total_files and not job.total_bytes:
+            percent = f"{job.done_files}/{job.total_files}"
+        rate = f"{format_bytes(job.rate)}/s" if job.done_bytes else "-"
+        print(f"{colors.get(status, Fore.WHITE)}{job.id:>4}  {job.type:<9} {job.name[:30]:<30} {status:<10} "
+              f"{percent:>9} {rate:>11} {format_eta(job.eta):>8}")
+
+def jobs_menu():
+    """Background jobs: progress, output and cancellation"""
+    while True:
+        clear_screen()
+        print_header("Background Jobs")
+
+        jobs = list_jobs()
+        if jobs:
+            print_jobs_table(jobs)
+        else:
+            print(f"\n{Fore.WHITE}No background jobs yet")
+
+        print(f"\n{THEME_COLOR}1.{Fore.WHITE} Refresh")
+        print(f"{THEME_COLOR}2.{Fore.WHITE} Show job output")
+        print(f"{THEME_COLOR}3.{Fore.WHITE} Cancel job")
+        print(f"{THEME_COLOR}4.{Fore.WHITE} Clear finished jobs")
+        print(f"{THEME_COLOR}0.{Fore.WHITE} Back")
+
+        choice = input(f"\n{THEME_COLOR}» {Fore.WHITE}").strip()
+
+        if choice == "0":
+            return
+        elif choice == "1":
+            continue
+        elif choice in ("2", "3"):
+            job_id = input(f"{Fore.YELLOW}Job ID: {Fore.WHITE}").strip()
+            job = get_job(int(job_id)) if job_id.isdigit() else None
+            if not job:
+                print(f"{Fore.RED}❌ No such job")
+            elif choice == "2":
+                print(f"\n{Fore.CYAN}#{job.id} {job.name} ({job.status}, {job.elapsed:.1f}s)")
+                for line in job.lines(40) or ["(no output)"]:
+                    print(f"{Fore.WHITE}   {line}")
+                if job.error:
+                    print(f"{Fore.RED}❌ {job.error}")
+            elif cancel_job(job.id):
+                print(f"{Fore.GREEN}✔ Cancel requested for job #{job.id}")
+            else:
+                print(f"{Fore.YELLOW}⚠ Job #{job.id} already finished")
+        elif choice == "4":
+            clear_finished()
+            continue
+        else:
+            print(f"{Fore.RED}❌ Invalid option")
+
+        input(f"\n{Fore.GREEN}Press ENTER to continue...")
+
+def print_pending_deletions():
+    """Show servers whose files are still being removed in the background"""
+    for d in get_deletion_status():
+        if d["failed"]:
+            print(f"{Fore.RED}❌ Could not delete '{d['name']}': {d['failed']} - remove {d['path']} by hand "
+                  f"or restart PyCraftHub to retry")
+            continue
+        if not d["renamed"]:
+            print(f"{Fore.MAGENTA}🗑 '{d['name']}' is still locked, waiting to remove it...")
+            continue
+        progress = "scanning..." if d["percent"] is None else f"{d['percent']:.0f}%"
+        print(f"{Fore.MAGENTA}🗑 Deleting '{d['name']}' in background: {progress}")
+
+def print_disk_warnings():
+    """Warn about volumes that are nearly full or will be soon at the current growth rate"""
+    for vol in forecast_volumes():
+        if not vol["warn"]:
+            continue
+        msg = f"⚠ Disk {vol['mount']} is {vol['percent']:.0f}% full ({format_bytes(vol['free'])} free)"
+        if vol["days_left"] is not None:
+            msg += f", full in ~{vol['days_left']:.0f} day(s) at {format_bytes(vol['growth'])}/day"
+        print(f"{Fore.RED}{msg}")
+
 def main_menu():
     """Main menu"""
-    if settings.get('show_splash', True):
+    if settings.get('show_splash', True) and not profiling():
         splash()
+
+    # Pick up deletions interrupted by the last exit
+    with startup_step("resume pending deletions"):
+        resume_pending_deletions()
+    with startup_step("start disk usage refresh"):
+        start_background_refresh()
+    # Version checks in the create wizard read this cache, never the network
+    with startup_step("start version catalog refresh"):
+        start_catalog_refresh()
+    if settings.get("api_enabled"):
+        with startup_step("start control API"):
+            from core.api_server import start_api_in_background
+            start_api_in_background()
+    if settings.get("mirror_serve"):
+        with startup_step("start LAN mirror"):
+            from core.artifact_mirror import start_mirror_in_background
+            start_mirror_in_background()
     
     while True:
         clear_screen()
         print_header("PyCraftHub - Main Menu")
         
-        data = load_data()
-        total_servers = len(data) if data else 0
-        running_servers = sum(1 for name in (data or {}) if is_server_running(name))
+        with startup_step("load server list"):
+            data = load_data() or {}
+        total_servers = len(data)
+        if _running["names"] is None:
+            running_text = "checking..."
+        else:
+            running_text = f"{len(_running['names'] & set(data))}/{total_servers}"
         
         print(f"\n{THEME_COLOR}╭─ Statistics " + "─" * 62 + "╮")
         print(f"{THEME_COLOR}│ {Fore.WHITE}Total Servers: {Fore.YELLOW}{total_servers:<10} "
-              f"{Fore.WHITE}Running: {Fore.GREEN}{running_servers}/{total_servers:<20}{THEME_COLOR}│")
+              f"{Fore.WHITE}Running: {Fore.GREEN}{running_text:<22}{THEME_COLOR}│")
         print(f"{THEME_COLOR}╰" + "─" * 75 + "╯")
+        print_pending_deletions()
+        with startup_step("disk warnings"):
+            print_disk_warnings()
+        active_jobs = len(list_jobs(active_only=True))
+        if active_jobs:
+            print(f"{Fore.CYAN}⏳ {active_jobs} background job(s) running - press J to see them")
         
         print(f"\n{THEME_COLOR}╭─ Menu Options " + "─" * 60 + "╮")
         print(f"{THEME_COLOR}│                                                                        │")
@@ -705,21 +1078,28 @@ def main_menu():
         print(f"{THEME_COLOR}│  {Fore.GREEN}5.{Fore.WHITE} 📦 List Mods/Plugins          {Fore.GREEN}6.{Fore.WHITE} 🔧 Server Tools           {THEME_COLOR}│")
         print(f"{THEME_COLOR}│  {Fore.GREEN}7.{Fore.WHITE} ℹ️  About PyCraftHub           {Fore.GREEN}8.{Fore.WHITE} 📖 Documentation          {THEME_COLOR}│")
         print(f"{THEME_COLOR}│  {Fore.GREEN}9.{Fore.WHITE} ⚙️  Settings                  {Fore.GREEN}0.{Fore.WHITE} 🚪 Exit                   {THEME_COLOR}│")
+        print(f"{THEME_COLOR}│  {Fore.GREEN}J.{Fore.WHITE} ⏳ Background Jobs                                               {THEME_COLOR}│")
         print(f"{THEME_COLOR}│                                                                        │")
         print(f"{THEME_COLOR}╰" + "─" * 75 + "╯")
+
+        # Ready for next time the menu is drawn
+        start_status_scan(list(data))
+        if profiling():
+            print_report()
+            return
         
         choice = input(f"\n{THEME_COLOR}» {Fore.WHITE}").strip()
         
         if choice == "1":
             clear_screen()
             print_header("Create New Server")
-            create_server()
+            profiled("create server", create_server)
             input(f"\n{Fore.GREEN}Press ENTER to continue...")
             
         elif choice == "2":
             clear_screen()
             print_header("Edit Server")
-            edit_server()
+            profiled("edit server", edit_server)
             input(f"\n{Fore.GREEN}Press ENTER to continue...")
             
         elif choice == "3":
@@ -728,14 +1108,14 @@ def main_menu():
         elif choice == "4":
             clear_screen()
             print_header("All Servers")
-            list_servers()
+            profiled("list servers", list_servers)
             input(f"\n{Fore.GREEN}Press ENTER to continue...")
             
         elif choice == "5":
             clear_screen()
             print_header("List Mods/Plugins")
             server = input(f"\n{Fore.YELLOW}Server name: {Fore.WHITE}").strip()
-            list_installed_mods(server)
+            profiled(f"list mods {server}", list_installed_mods, server)
             input(f"\n{Fore.GREEN}Press ENTER to continue...")
             
         elif choice == "6":
@@ -750,6 +1130,9 @@ def main_menu():
         elif choice == "9":
             settings_menu()
             
+        elif choice.lower() == "j":
+            jobs_menu()
+            
         elif choice == "0":
             clear_screen()
             print(f"\n{THEME_COLOR}╔" + "═" * 50 + "╗")
@@ -2,11 +2,14 @@
 Notification System for PyCraftHub
 Sends Discord notifications for server events
 """
-import requests
 import json
 import os
 from datetime import datetime
 
+from utils.lazy import lazy_import
+
+requests = lazy_import("requests")
+
 def load_settings():
     """Load settings to get webhook URL"""
     settings_file = "data/settings.json"
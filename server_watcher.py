@@ -23,7 +23,11 @@ print(f"Server Name: {server_name}")
 print(f"Server PID: {server_pid}")
 
 # Setup paths
-server_path = f"servers/{server_name}"
+try:
+    from core.storage import get_server_path
+    server_path = get_server_path(server_name)
+except ImportError:
+    server_path = f"servers/{server_name}"
 command_file = os.path.join(server_path, "command.txt")
 running_file = os.path.join(server_path, "running.txt")
 
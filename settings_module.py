@@ -10,6 +10,7 @@ SETTINGS_FILE = "data/settings.json"
 DEFAULT_SETTINGS = {
     "theme": "cyan",  # cyan, green, blue, magenta, red
     "server_directory": "servers",
+    "storage_roots": [],  # extra disks: [{"name": "nvme", "path": "D:/mc-servers"}]
     "notifications_enabled": True,
     "discord_webhook": "",
     "auto_backup": False,
@@ -19,7 +20,29 @@ DEFAULT_SETTINGS = {
     "auto_update_check": True,
     "show_splash": True,
     "default_ram": "2G",
-    "default_difficulty": "normal"
+    "default_difficulty": "normal",
+    "disk_warn_days": 14,  # warn when a volume fills within this many days
+    "disk_warn_percent": 90,
+    "appcds": True,  # class data sharing archives for faster boots (Java 13+)
+    "job_limits": {},  # per job type, e.g. {"download": 2} (see core/jobs.py)
+    "api_enabled": False,  # local HTTP/JSON control API (see core/api_server.py)
+    "api_host": "127.0.0.1",
+    "api_port": 8765,
+    "api_socket": "",  # Unix socket path, used instead of host/port when set
+    "api_token": "",  # generated on first start
+    "tracing_enabled": True,  # timed spans in data/traces (see utils/tracing.py)
+    "mirror_serve": False,  # serve downloaded artifacts to LAN hosts (see core/artifact_mirror.py)
+    "mirror_host": "0.0.0.0",
+    "mirror_port": 8766,
+    "mirror_peers": [],  # mirrors to try before upstream, e.g. ["http://192.168.1.20:8766"]
+    "mirror_keep_days": 30,  # the cleaner drops artifacts unused this long, 0 = keep
+    "cleanup_policy": {
+        "max_log_age_days": 14,  # 0 = no age limit
+        "max_log_total_mb": 512,  # per folder, 0 = no size limit
+        "keep_last_logs": 10,  # always kept, whatever the limits say
+        "compress_logs": True,
+        "clear_caches": True
+    }
 }
 
 def load_settings():
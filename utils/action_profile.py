@@ -0,0 +1,286 @@
+"""
+Action profiling for PyCraftHub
+
+    PYCRAFTHUB_PROFILE=1 python main.py
+    python main.py --profile-actions=sample
+    python cli.py stop survival --profile-actions
+
+Opt-in: every action run from the main menu, the server management menu
+or the command line is profiled on its own and written to profiles/:
+    cprofile  (default) deterministic, the action's own thread only,
+              saved as .pstats (python -m pstats / snakeviz)
+    sample    samples stacks every SAMPLE_INTERVAL, including threads
+              the action starts (jobs, boot watchers); saved as
+              .speedscope.json (https://www.speedscope.app)
+After each action the slowest functions are printed along with how much
+of the time went to time.sleep, network waits, psutil and input prompts.
+"""
+import os
+import re
+import sys
+import json
+import time
+import linecache
+import threading
+from contextlib import contextmanager
+
+PROFILE_ENV = "PYCRAFTHUB_PROFILE"
+PROFILE_FLAG = "--profile-actions"
+MODES = ("cprofile", "sample")
+PROFILE_DIR = "profiles"
+SAMPLE_INTERVAL = 0.005
+TOP = 15
+
+_state = {"mode": None}
+# cProfile can only profile one action at a time
+_cprofile_lock = threading.Lock()
+
+# Standard library / client modules whose frames mean "waiting on the network"
+NETWORK_FILES = re.compile(r"[\\/](socket|ssl|selectors|http[\\/]client|urllib3[\\/].*|requests[\\/].*)\.py$")
+NETWORK_BUILTINS = re.compile(r"_socket\.|_ssl\.|select\.(select|poll|epoll)|getaddrinfo|gethostbyname")
+NETWORK_CALLS = re.compile(r"\.(recv|recv_into|recvfrom|accept|connect|sendall|create_connection)\(|requests\.(get|post|head)\(")
+
+
+def enable(mode="cprofile"):
+    if mode not in MODES:
+        raise ValueError(f"Unknown profiling mode: {mode} (use {' or '.join(MODES)})")
+    _state["mode"] = mode
+
+
+def enable_from_env(argv=None):
+    """Turn profiling on from PYCRAFTHUB_PROFILE or --profile-actions[=mode] in argv"""
+    value = os.environ.get(PROFILE_ENV, "").strip().lower()
+    if value and value not in ("0", "false", "no", "off"):
+        enable(value if value in MODES else "cprofile")
+    for arg in argv or ():
+        if arg == PROFILE_FLAG:
+            enable("cprofile")
+        elif arg.startswith(PROFILE_FLAG + "="):
+            enable(arg.split("=", 1)[1])
+
+
+def profiling_mode():
+    """"cprofile", "sample" or None when off"""
+    return _state["mode"]
+
+
+def _output_path(action, extension):
+    os.makedirs(PROFILE_DIR, exist_ok=True)
+    slug = re.sub(r"[^A-Za-z0-9_.-]+", "-", action).strip("-") or "action"
+    return os.path.join(PROFILE_DIR, f"{time.strftime('%Y%m%d-%H%M%S')}-{slug}{extension}")
+
+
+def _print_waits(action, total, waits):
+    parts = [f"{label} {seconds:.2f}s" for label, seconds in waits.items() if seconds >= 0.005]
+    print(f"\n⏱ {action}: {total:.2f}s" + (f" - {', '.join(parts)}" if parts else ""))
+
+
+# -------------------- cProfile --------------------
+
+def _builtin_category(name):
+    if name == "<built-in method time.sleep>":
+        return "sleep"
+    if name == "<built-in method builtins.input>":
+        return "input"
+    if NETWORK_BUILTINS.search(name):
+        return "network"
+    return None
+
+
+def _report_cprofile(action, profile, total):
+    import pstats
+
+    stats = pstats.Stats(profile)
+    waits = {"sleep": 0.0, "network": 0.0, "psutil": 0.0, "input": 0.0}
+    for (file, line, name), (_, _, own, inclusive, callers) in stats.stats.items():
+        category = _builtin_category(name) if file == "~" else None
+        if category:
+            waits[category] += own
+        if "psutil" in file:
+            # Time entering psutil from outside counts once, however deep it goes
+            waits["psutil"] += sum(caller[3] for key, caller in callers.items() if "psutil" not in key[0])
+    _print_waits(action, total, waits)
+
+    print(f"{'own s':>8} {'total s':>8} {'calls':>8}  function")
+    ranked = sorted(stats.stats.items(), key=lambda item: item[1][2], reverse=True)
+    for (file, line, name), (_, calls, own, inclusive, _) in ranked[:TOP]:
+        where = name if file == "~" else f"{name} ({os.path.basename(file)}:{line})"
+        print(f"{own:>8.3f} {inclusive:>8.3f} {calls:>8}  {where}")
+
+
+@contextmanager
+def _cprofile(action):
+    import cProfile
+
+    if not _cprofile_lock.acquire(blocking=False):
+        print(f"⚠ Another action is being profiled - '{action}' runs unprofiled (try --profile-actions=sample)")
+        yield
+        return
+    profile = cProfile.Profile()
+    start = time.perf_counter()
+    profile.enable()
+    try:
+        yield
+    finally:
+        profile.disable()
+        _cprofile_lock.release()
+        # Written even when the action failed - that's often when it's wanted
+        path = _output_path(action, ".pstats")
+        profile.dump_stats(path)
+        _report_cprofile(action, profile, time.perf_counter() - start)
+        print(f"📄 Profile: {path}")
+
+
+# -------------------- Sampling --------------------
+
+def _sample_category(stack):
+    """Category of one sampled stack (root first): psutil, network, sleep, input or None"""
+    files = [code.co_filename for code, _ in stack]
+    if any("psutil" in f for f in files):
+        return "psutil"
+    if NETWORK_FILES.search(files[-1]):
+        return "network"
+    # Builtins don't show up in a stack - the line calling them does
+    code, line = stack[-1]
+    text = linecache.getline(code.co_filename, line)
+    if NETWORK_CALLS.search(text):
+        return "network"
+    if "sleep(" in text or ".wait(" in text:
+        return "sleep"
+    if "input(" in text:
+        return "input"
+    return None
+
+
+class _Sampler(threading.Thread):
+    """
+    Records, every SAMPLE_INTERVAL, the stack of the thread running the
+    action, of every thread started after it and of the job pool threads
+    while they run a job the action queued (directly or through another
+    job) - threads that were already idling in the background, or
+    running someone else's job, aren't part of the action.
+    """
+
+    def __init__(self):
+        super().__init__(name="action-profiler", daemon=True)
+        self.samples = {}  # thread name -> [(stack, weight)]
+        self._skip = {t.ident for t in threading.enumerate()} - {threading.get_ident()}
+        self._since = time.time()
+        self._stop_event = threading.Event()
+
+    def _job_threads(self):
+        """Threads running a job that traces back to the action"""
+        from core.jobs import list_jobs
+
+        idents = set()
+        for job in list_jobs(active_only=True):
+            root = job
+            while root.parent is not None:
+                root = root.parent
+            if job.thread and root.created >= self._since and root.queued_by not in self._skip:
+                idents.add(job.thread)
+        return idents
+
+    def run(self):
+        last = time.perf_counter()
+        while not self._stop_event.wait(SAMPLE_INTERVAL):
+            now = time.perf_counter()
+            weight, last = now - last, now
+            names = {t.ident: t.name for t in threading.enumerate()}
+            jobs = self._job_threads()
+            for ident, frame in sys._current_frames().items():
+                if ident == self.ident:
+                    continue
+                # Pool threads come and go with jobs - only the action's jobs count
+                if ident not in jobs and (ident in self._skip or names.get(ident, "").startswith("job-")):
+                    continue
+                stack = []
+                while frame is not None:
+                    stack.append((frame.f_code, frame.f_lineno))
+                    frame = frame.f_back
+                stack.reverse()
+                self.samples.setdefault(names.get(ident, str(ident)), []).append((stack, weight))
+
+    def stop(self):
+        self._stop_event.set()
+        self.join()
+
+
+def _write_speedscope(action, samples, path):
+    frames, index = [], {}
+    profiles = []
+    for thread, entries in samples.items():
+        stacks, weights = [], []
+        for stack, weight in entries:
+            ids = []
+            for code, _ in stack:
+                key = (code.co_name, code.co_filename, code.co_firstlineno)
+                if key not in index:
+                    index[key] = len(frames)
+                    frames.append({"name": code.co_name, "file": code.co_filename, "line": code.co_firstlineno})
+                ids.append(index[key])
+            stacks.append(ids)
+            weights.append(weight)
+        profiles.append({"type": "sampled", "name": thread, "unit": "seconds", "startValue": 0,
+                         "endValue": sum(weights), "samples": stacks, "weights": weights})
+
+    with open(path, "w") as f:
+        json.dump({"$schema": "https://www.speedscope.app/file-format-schema.json", "name": action,
+                   "exporter": "PyCraftHub", "shared": {"frames": frames}, "profiles": profiles}, f)
+
+
+def _report_samples(action, samples, total):
+    waits = {"sleep": 0.0, "network": 0.0, "psutil": 0.0, "input": 0.0}
+    own, inclusive = {}, {}
+    for entries in samples.values():
+        for stack, weight in entries:
+            if not stack:
+                continue
+            category = _sample_category(stack)
+            if category:
+                waits[category] += weight
+            leaf = stack[-1][0]
+            own[leaf] = own.get(leaf, 0.0) + weight
+            for code in {code for code, _ in stack}:
+                inclusive[code] = inclusive.get(code, 0.0) + weight
+    # Summed over threads, so waits can add up to more than the wall time
+    _print_waits(action, total, waits)
+
+    print(f"{'own s':>8} {'total s':>8}  function (all threads)")
+    for code, seconds in sorted(own.items(), key=lambda item: item[1], reverse=True)[:TOP]:
+        print(f"{seconds:>8.3f} {inclusive[code]:>8.3f}  "
+              f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+
+
+@contextmanager
+def _sample(action):
+    sampler = _Sampler()
+    start = time.perf_counter()
+    sampler.start()
+    try:
+        yield
+    finally:
+        sampler.stop()
+        path = _output_path(action, ".speedscope.json")
+        _write_speedscope(action, sampler.samples, path)
+        _report_samples(action, sampler.samples, time.perf_counter() - start)
+        print(f"📄 Profile: {path}")
+
+
+# -------------------- Entry points --------------------
+
+@contextmanager
+def profile_action(action):
+    """Profile the block as one action (no-op unless profiling is on)"""
+    mode = _state["mode"]
+    if mode is None:
+        yield
+        return
+    with (_cprofile(action) if mode == "cprofile" else _sample(action)):
+        yield
+
+
+def profiled(action, func, *args, **kwargs):
+    """func(*args, **kwargs), profiled as `action` when profiling is on"""
+    with profile_action(action):
+        return func(*args, **kwargs)
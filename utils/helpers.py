@@ -1,5 +1,12 @@
 import os
-import psutil
+import sys
+import stat
+import hashlib
+import threading
+
+from utils.lazy import lazy_import
+
+psutil = lazy_import("psutil")
 
 def get_system_ram():
     total = psutil.virtual_memory().total // (1024 ** 2)
@@ -12,3 +19,53 @@ def clear():
 
 def pause():
     input("\nPress Enter to continue...")
+
+
+def format_bytes(bytes_value):
+    """Format bytes to human readable"""
+    for unit in ['B', 'KB', 'MB', 'GB', 'TB']:
+        if abs(bytes_value) < 1024.0:
+            return f"{bytes_value:.1f} {unit}"
+        bytes_value /= 1024.0
+    return f"{bytes_value:.1f} PB"
+
+
+def format_eta(seconds):
+    """Seconds left as mm:ss or h:mm:ss ("--:--" when unknown)"""
+    if seconds is None:
+        return "--:--"
+    minutes, seconds = divmod(int(seconds), 60)
+    return f"{minutes // 60}:{minutes % 60:02d}:{seconds:02d}" if minutes >= 60 else f"{minutes:02d}:{seconds:02d}"
+
+
+def hash_file(path, algorithm="sha256"):
+    """Hex digest of a file, read in 1 MB chunks"""
+    h = hashlib.new(algorithm)
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def lower_thread_io_priority():
+    """
+    Drop the CALLING THREAD to idle I/O priority so background disk work
+    doesn't compete with running servers. Use as a pool initializer.
+    """
+    try:
+        if sys.platform.startswith("linux"):
+            # Linux tracks I/O priority per thread - a thread id works as a pid here
+            psutil.Process(threading.get_native_id()).ionice(psutil.IOPRIO_CLASS_IDLE)
+        elif os.name == "nt":
+            import ctypes
+            THREAD_MODE_BACKGROUND_BEGIN = 0x00010000
+            kernel32 = ctypes.windll.kernel32
+            kernel32.SetThreadPriority(kernel32.GetCurrentThread(), THREAD_MODE_BACKGROUND_BEGIN)
+    except Exception:
+        pass
+
+
+def remove_readonly(func, path, _):
+    """shutil.rmtree onerror: read-only files can't be deleted on Windows"""
+    os.chmod(path, stat.S_IWRITE)
+    func(path)
@@ -0,0 +1,35 @@
+import sys
+import types
+import threading
+import importlib
+import importlib.util
+
+_lock = threading.RLock()
+
+
+class _LazyModule(types.ModuleType):
+    """Stands in for a module until one of its attributes is used"""
+
+    def __getattr__(self, attr):
+        real = self.__dict__.get("_real")
+        if real is None:
+            # Several threads may reach for it at once during startup
+            with _lock:
+                real = self.__dict__.get("_real")
+                if real is None:
+                    real = importlib.import_module(self.__name__)
+                    self.__dict__["_real"] = real
+        return getattr(real, attr)
+
+
+def lazy_import(name):
+    """
+    Module object that is only really imported on first attribute access,
+    so heavy dependencies (requests, psutil) don't slow down startup.
+    A module that isn't installed still fails here, at import time.
+    """
+    if name in sys.modules:
+        return sys.modules[name]
+    if importlib.util.find_spec(name) is None:
+        raise ImportError(f"No module named '{name}'", name=name)
+    return _LazyModule(name)
@@ -0,0 +1,100 @@
+"""
+Startup profiling for PyCraftHub
+
+    python main.py --startup-profile
+
+Times every module import (own time and including what it imported) and
+every startup step up to the first menu render, prints the slowest and
+exits. Has to be enabled before anything heavy is imported.
+"""
+import sys
+import time
+from contextlib import contextmanager
+
+PROFILE_FLAG = "--startup-profile"
+
+_state = {"enabled": False, "started": None}
+_imports = {}  # module -> [inclusive seconds, own seconds]
+_steps = []  # (step, seconds)
+_stack = []
+
+
+class _TimedLoader:
+    """Wraps a module's loader to time its execution"""
+
+    def __init__(self, loader, name):
+        self._loader = loader
+        self._name = name
+
+    def create_module(self, spec):
+        return self._loader.create_module(spec)
+
+    def exec_module(self, module):
+        _stack.append(0.0)
+        start = time.perf_counter()
+        try:
+            self._loader.exec_module(module)
+        finally:
+            total = time.perf_counter() - start
+            children = _stack.pop()
+            _imports[self._name] = [total, total - children]
+            if _stack:
+                _stack[-1] += total
+
+    def __getattr__(self, attr):
+        return getattr(self._loader, attr)
+
+
+class _TimingFinder:
+    """Meta path hook handing every found module a timed loader"""
+
+    def find_spec(self, name, path=None, target=None):
+        for finder in sys.meta_path:
+            if finder is self or not hasattr(finder, "find_spec"):
+                continue
+            spec = finder.find_spec(name, path, target)
+            if spec is not None:
+                if spec.loader is not None and hasattr(spec.loader, "exec_module"):
+                    spec.loader = _TimedLoader(spec.loader, name)
+                return spec
+        return None
+
+
+def enable_profiling():
+    if not _state["enabled"]:
+        _state.update(enabled=True, started=time.perf_counter())
+        sys.meta_path.insert(0, _TimingFinder())
+
+
+def profiling():
+    return _state["enabled"]
+
+
+@contextmanager
+def startup_step(name):
+    """Time one startup step (no-op unless profiling)"""
+    if not _state["enabled"]:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        _steps.append((name, time.perf_counter() - start))
+
+
+def print_report(top=25):
+    """Slowest imports and startup steps, and the time to the first menu"""
+    total = time.perf_counter() - _state["started"]
+    print(f"\n⏱ Startup profile - menu ready after {total * 1000:.1f} ms\n")
+
+    print(f"{'Module':<40} {'total ms':>10} {'own ms':>10}")
+    ranked = sorted(_imports.items(), key=lambda item: item[1][0], reverse=True)
+    for name, (inclusive, own) in ranked[:top]:
+        print(f"{name:<40} {inclusive * 1000:>10.1f} {own * 1000:>10.1f}")
+    imported = sum(own for _, own in _imports.values())
+    print(f"{len(_imports)} modules imported in {imported * 1000:.1f} ms")
+
+    print(f"\n{'Startup step':<40} {'ms':>10}")
+    for name, seconds in _steps:
+        print(f"{name:<40} {seconds * 1000:>10.1f}")
@@ -0,0 +1,247 @@
+"""
+Tracing for PyCraftHub
+Nested, timed spans for the server lifecycle and the install pipelines,
+appended as one JSON line each to data/traces/spans.jsonl (rotated at
+MAX_BYTES, KEEP_FILES kept) so `python cli.py trace summary` can show
+where provisioning and start/stop time goes across runs.
+
+    with span("server.stop", server=name) as s:
+        ...
+        s.set(exit_reason="terminated")
+
+    @traced("download.paper", "version")
+    def download_paper(version, path): ...
+
+A span nests under the span open on the same thread; background jobs
+nest under the span that queued them. Turn off with
+"tracing_enabled": false in data/settings.json.
+"""
+import os
+import json
+import time
+import uuid
+import functools
+import threading
+from contextlib import contextmanager
+
+TRACE_DIR = os.path.join("data", "traces")
+TRACE_FILE = "spans.jsonl"
+MAX_BYTES = 5 * 1024 * 1024
+KEEP_FILES = 5
+
+_local = threading.local()
+_write_lock = threading.Lock()
+_enabled = [None]
+
+
+class Span:
+    """One timed operation and its attributes"""
+
+    def __init__(self, name, parent=None, attrs=None, start=None):
+        self.name = name
+        self.id = uuid.uuid4().hex[:16]
+        self.trace = parent.trace if parent else uuid.uuid4().hex[:16]
+        self.parent = parent.id if parent else None
+        self.start = start or time.time()
+        self.attrs = dict(attrs or {})
+        self.status = "ok"
+
+    def set(self, **attrs):
+        self.attrs.update(attrs)
+
+    def add(self, **amounts):
+        """Add to numeric attributes (bytes, files...)"""
+        for key, value in amounts.items():
+            self.attrs[key] = self.attrs.get(key, 0) + value
+
+    def to_dict(self, end):
+        return {"trace": self.trace, "span": self.id, "parent": self.parent, "name": self.name,
+                "start": round(self.start, 3), "duration": round(end - self.start, 4),
+                "status": self.status, "attrs": self.attrs}
+
+
+# -------------------- Writing --------------------
+
+def tracing_enabled():
+    if _enabled[0] is None:
+        try:
+            from settings_module import load_settings
+            _enabled[0] = bool(load_settings().get("tracing_enabled", True))
+        except Exception:
+            _enabled[0] = True
+    return _enabled[0]
+
+
+def _rotate(path):
+    for n in range(KEEP_FILES - 1, 0, -1):
+        older = f"{path}.{n}"
+        if os.path.exists(older):
+            os.replace(older, f"{path}.{n + 1}")
+    os.replace(path, f"{path}.1")
+
+
+def _write(record):
+    if not tracing_enabled():
+        return
+    line = json.dumps(record, default=str) + "\n"
+    path = os.path.join(TRACE_DIR, TRACE_FILE)
+    try:
+        with _write_lock:
+            os.makedirs(TRACE_DIR, exist_ok=True)
+            try:
+                if os.path.getsize(path) + len(line) > MAX_BYTES:
+                    _rotate(path)
+            except OSError:
+                pass
+            # One write per line so other PyCraftHub processes can append too
+            with open(path, "a", encoding="utf-8") as f:
+                f.write(line)
+    except OSError:
+        pass
+
+
+# -------------------- Spans --------------------
+
+def _stack():
+    stack = getattr(_local, "stack", None)
+    if stack is None:
+        stack = _local.stack = []
+    return stack
+
+
+def current_span():
+    """Innermost open span on this thread (None if there is none)"""
+    stack = _stack()
+    return stack[-1] if stack else None
+
+
+@contextmanager
+def span(name, parent=None, **attrs):
+    """Time the block as a span - an exception marks it failed and is re-raised"""
+    s = Span(name, parent or current_span(), attrs)
+    stack = _stack()
+    stack.append(s)
+    try:
+        yield s
+    except BaseException as e:
+        s.status = "error"
+        s.attrs.setdefault("error", str(e) or type(e).__name__)
+        raise
+    finally:
+        stack.remove(s)
+        _write(s.to_dict(time.time()))
+
+
+@contextmanager
+def attach(parent):
+    """Make spans on this thread nest under parent (a span from another thread)"""
+    if parent is None:
+        yield
+        return
+    stack = _stack()
+    stack.append(parent)
+    try:
+        yield
+    finally:
+        stack.remove(parent)
+
+
+def traced(name, *arg_names):
+    """Decorator: run the function as a span, recording its first positional args under arg_names"""
+    def decorate(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with span(name, **dict(zip(arg_names, args))):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorate
+
+
+def annotate(**attrs):
+    """Set attributes on the current span (no-op outside spans)"""
+    s = current_span()
+    if s:
+        s.set(**attrs)
+
+
+def count(**amounts):
+    """Add to numeric attributes of the current span (no-op outside spans)"""
+    s = current_span()
+    if s:
+        s.add(**amounts)
+
+
+def record_span(name, start, end=None, parent=None, status="ok", **attrs):
+    """Write a span that was timed elsewhere (e.g. a boot followed by another thread)"""
+    s = Span(name, parent, attrs, start=start)
+    s.status = status
+    _write(s.to_dict(end or time.time()))
+
+
+# -------------------- Reading --------------------
+
+def read_spans(since=None):
+    """Every stored span, oldest file first; since is an epoch time"""
+    path = os.path.join(TRACE_DIR, TRACE_FILE)
+    files = [f"{path}.{n}" for n in range(KEEP_FILES, 0, -1)] + [path]
+    for file in files:
+        try:
+            with open(file, "r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        continue
+                    if since is None or record.get("start", 0) >= since:
+                        yield record
+        except OSError:
+            continue
+
+
+def _percentile(values, q):
+    """Linear interpolation between closest ranks (values sorted)"""
+    if len(values) == 1:
+        return values[0]
+    pos = (len(values) - 1) * q
+    low = int(pos)
+    high = min(low + 1, len(values) - 1)
+    return values[low] + (values[high] - values[low]) * (pos - low)
+
+
+def summarize(spans, prefix=None):
+    """
+    Per span name: count, errors, p50/p95/max/total seconds and the share
+    of its traces' root span (e.g. server.create) it took, sorted by total.
+    """
+    spans = list(spans)
+    roots = {s["trace"]: s for s in spans if not s.get("parent")}
+    groups = {}
+    for s in spans:
+        if prefix and not s["name"].startswith(prefix):
+            continue
+        group = groups.setdefault(s["name"], {"durations": [], "errors": 0, "roots": {}})
+        group["durations"].append(s["duration"])
+        if s.get("status") == "error":
+            group["errors"] += 1
+        root = roots.get(s["trace"])
+        if root and root is not s:
+            group["roots"][root["span"]] = root
+
+    rows = []
+    for name, group in groups.items():
+        durations = sorted(group["durations"])
+        total = sum(durations)
+        row = {"name": name, "count": len(durations), "errors": group["errors"],
+               "p50": round(_percentile(durations, 0.5), 3), "p95": round(_percentile(durations, 0.95), 3),
+               "max": round(durations[-1], 3), "total": round(total, 3),
+               "root": None, "share_of_root": None}
+        root_spans = list(group["roots"].values())
+        if root_spans:
+            names = {r["name"] for r in root_spans}
+            root_total = sum(r["duration"] for r in root_spans)
+            row["root"] = names.pop() if len(names) == 1 else "(several)"
+            # Parallel downloads can add up to more than 100%
+            row["share_of_root"] = round(total / root_total, 3) if root_total else None
+        rows.append(row)
+    rows.sort(key=lambda r: r["total"], reverse=True)
+    return rows